@@ -1,15 +1,39 @@
 import os
 import json
+import asyncio
+import argparse
+import shutil
 import tempfile
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+import time
+import zipfile
+from io import BytesIO
+from typing import List
+from urllib.parse import quote
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import HTMLResponse
 from dotenv import load_dotenv
-from crew_app.file_tools.file_loader import detect_and_extract
-from crew_app.crew import run_pipeline
-from crew_app.utils import txt_to_docx_bytes, txt_to_pdf_bytes
+from crew_app.file_tools.file_loader import detect_and_extract, source_size, ExtractionError, MAX_UPLOAD_BYTES
+from crew_app.crew import run_pipeline, clean_resume, parse_evaluation, EVALUATOR_MODES, PIPELINE_MODES
+from crew_app.tasks import PARSE_CHAR_LIMIT
+from crew_app.prompt_budget import prompt_stats
+from crew_app.llm_backends import get_backend
+from crew_app.llm_scheduler import scheduler as llm_scheduler
+from crew_app.jobs import JobManager, SharedJob, QueueFullError, ShuttingDownError, FAILED
+from crew_app.shared_state import shared_state, kv_stats, resolve_workers
+from crew_app.result_store import create_result_store, RESULT_FIELDS
+from crew_app.batch import run_batch_job
+from crew_app.search_index import ResumeIndex
+from crew_app.doc_pool import doc_pool
+from crew_app.cache import stage_cache, render_cache, render_key
+from crew_app.ats_scorer import extract_keywords
+from crew_app.job_profiles import get_profile, lookup_profile, profile_text, job_profile_cache
+from crew_app.telemetry import telemetry, span
+from crew_app.document_model import parse_document
+from crew_app.utils import DOCUMENT_RENDERERS
 import uvicorn
 
 # Load environment variables
@@ -43,32 +67,190 @@ async def root():
         return FileResponse("build/index.html")
     return {"message": "ATS Resume Optimization API is running"}
 
+ENDPOINTS = [
+    "/process-resume", "/jobs/{job_id}", "/jobs/{job_id}/events", "/batch",
+    "/resume-index", "/resume-index/search", "/job-profiles",
+    "/download-pdf", "/download-docx", "/download-txt", "/export",
+    "/results/{result_id}", "/results/{result_id}/download", "/metrics",
+]
+
+def _health() -> dict:
+    # The shared state, result store and disk caches can block, so this runs off the event loop
+    health = {"status": "draining" if job_manager.draining else "healthy"}
+    health["workers"] = kv_stats(shared_state)
+    health["jobs"] = job_manager.stats()
+    health["batches"] = batch_manager.stats()
+    health["stage_cache"] = stage_cache.stats()
+    health["prompts"] = prompt_stats.stats()
+    health["llm"] = get_backend().describe()
+    health["documents"] = doc_pool.stats()
+    health["render_cache"] = render_cache.stats()
+    health["results"] = result_store.stats()
+    health["jd_cache"] = extract_keywords.cache_info()._asdict()
+    health["job_profiles"] = job_profile_cache.stats()
+    health["llm_scheduler"] = llm_scheduler.stats()
+    health["endpoints"] = ENDPOINTS
+    return health
+
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "endpoints": ["/process-resume", "/download-pdf", "/download-docx", "/download-txt"]}
+    return await run_in_threadpool(_health)
+
+def _metrics_text() -> str:
+    # Stats calls may wait on cache and store locks held during disk I/O, so this runs off the event loop
+    jobs = job_manager.stats()
+    cache = stage_cache.stats()
+    gauges = {
+        ("ats_jobs_queued", ()): jobs["queued"],
+        ("ats_jobs_running", ()): jobs["running"],
+        ("ats_stage_cache_lookups", (("result", "hit"),)): cache["hits"] + cache["disk_hits"] + cache["shared_hits"],
+        ("ats_stage_cache_lookups", (("result", "miss"),)): cache["misses"],
+        ("ats_stage_cache_entries", ()): cache["entries"],
+        ("ats_render_cache_bytes", ()): render_cache.stats()["bytes"],
+    }
+    for key, state in llm_scheduler.stats()["keys"].items():
+        gauges[("ats_llm_queued", (("key", key),))] = state["queued"]
+        gauges[("ats_llm_in_flight", (("key", key),))] = state["in_flight"]
+    return telemetry.render(gauges)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus scrape endpoint: span histograms, LLM token/cost counters and queue gauges."""
+    return PlainTextResponse(await run_in_threadpool(_metrics_text), media_type="text/plain; version=0.0.4")
+
+# Extraction stops once the parse stage has all the text it will send to the LLM
+MAX_EXTRACT_CHARS = int(os.getenv("MAX_EXTRACT_CHARS", str(PARSE_CHAR_LIMIT)))
+
+def _spill_upload(upload: UploadFile) -> str:
+    """Copy the spooled upload to a named temp file that a worker process can memory-map."""
+    suffix = os.path.splitext(upload.filename or "")[1]
+    upload.file.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp_file:
+        shutil.copyfileobj(upload.file, tmp_file)
+        return tmp_file.name
+
+def validate_modes(evaluator: str = None, pipeline_mode: str = None):
+    if evaluator and evaluator not in EVALUATOR_MODES:
+        raise HTTPException(status_code=400, detail=f"evaluator must be one of: {', '.join(EVALUATOR_MODES)}")
+    if pipeline_mode and pipeline_mode not in PIPELINE_MODES:
+        raise HTTPException(status_code=400, detail=f"pipeline_mode must be one of: {', '.join(PIPELINE_MODES)}")
+
+async def extract_upload(upload: UploadFile):
+    """Extract text in the document process pool, never reading the upload into memory."""
+    try:
+        size = source_size(upload.file)
+        if size > MAX_UPLOAD_BYTES:
+            raise ExtractionError(f"File is {size} bytes; the limit is {MAX_UPLOAD_BYTES}")
+        with span("upload.read") as attributes:
+            path = await run_in_threadpool(_spill_upload, upload)
+            attributes["bytes"] = size
+        try:
+            ext = os.path.splitext(upload.filename or "")[1].lstrip(".").lower() or "unknown"
+            with span("document.extract", format=ext):
+                return await doc_pool.run(detect_and_extract, upload.filename, path, MAX_EXTRACT_CHARS)
+        finally:
+            os.unlink(path)
+    except ExtractionError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=422, detail="Timed out extracting text from the file")
+
+def run_resume_job(raw_text: str, job_title: str, job_description: str, evaluator: str = None, pipeline_mode: str = None, cancel_event=None, on_stage=None):
+    """Worker-thread entry point: run the pipeline and shape the API results."""
+    def report_stage(event):
+        if on_stage is None:
+            return
+        if event["field"] == "evaluation":
+            event = dict(event, output=parse_evaluation(event["output"]))
+        on_stage(event)
 
-@app.post("/process-resume")
+    cleaned, rewritten, final_resume, evaluation = run_pipeline(
+        raw_resume_text=raw_text,
+        job_title=job_title,
+        job_description=job_description,
+        cancel_event=cancel_event,
+        on_stage=report_stage,
+        evaluator=evaluator,
+        mode=pipeline_mode
+    )
+    if INDEX_PROCESSED_RESUMES:
+        resume_index.add(cleaned)
+    return {
+        "cleaned": cleaned,
+        "rewritten": rewritten,
+        "final": final_resume,
+        "evaluation": parse_evaluation(evaluation)
+    }
+
+# Corpus of cleaned resumes for job-description matching; every worker opens the same directory and
+# the index serialises their writes with a file lock
+resume_index = ResumeIndex(os.getenv("RESUME_INDEX_DIR", "data/resume_index"))
+INDEX_PROCESSED_RESUMES = os.getenv("INDEX_PROCESSED_RESUMES", "false").lower() == "true"
+
+# Finished results by job id, so downloads don't need the text posted back
+result_store = create_result_store()
+
+# Bounded worker pool so the blocking pipeline never runs on the event loop
+job_manager = JobManager(
+    runner=run_resume_job,
+    max_workers=int(os.getenv("PIPELINE_WORKERS", "2")),
+    max_queue=int(os.getenv("PIPELINE_QUEUE_SIZE", "16")),
+    retention_seconds=int(os.getenv("JOB_RETENTION_SECONDS", "3600")),
+    result_store=result_store,
+    state=shared_state
+)
+
+# Batches get their own queue (per process, like job_manager's) so a large matrix never crowds out
+# interactive jobs; all their pairs share the pipeline pool in crew_app.batch. Events stream from
+# the job, so retention only needs to outlast the stream
+batch_manager = JobManager(
+    runner=run_batch_job,
+    max_workers=int(os.getenv("BATCH_WORKERS", "2")),
+    max_queue=int(os.getenv("BATCH_QUEUE_SIZE", "4")),
+    retention_seconds=0
+)
+
+# Seconds a stopping worker gives in-flight pipelines (and their event streams) to finish
+DRAIN_SECONDS = float(os.getenv("DRAIN_SECONDS", "60"))
+
+# How often the event stream checks a job for new stage events, and when it sends a keep-alive
+SSE_POLL_SECONDS = 0.25
+SSE_KEEPALIVE_SECONDS = 15.0
+
+@app.on_event("shutdown")
+def shutdown_job_manager():
+    deadline = time.monotonic() + DRAIN_SECONDS
+    cut_short = job_manager.drain(DRAIN_SECONDS)
+    # Batches kept running meanwhile; they get whatever is left of the same drain window
+    cut_short += batch_manager.drain(max(0.0, deadline - time.monotonic()))
+    if cut_short:
+        print(f"Cancelled {cut_short} job(s) still running after {DRAIN_SECONDS:.0f}s")
+    doc_pool.shutdown()
+    resume_index.close()
+    result_store.close()
+
+@app.post("/process-resume", status_code=202)
 async def process_resume(
     file: UploadFile = File(...),
     job_title: str = Form(...),
-    job_description: str = Form(...)
+    job_description: str = Form(...),
+    evaluator: str = Form(None),
+    pipeline_mode: str = Form(None)
 ):
+    """Validate the upload and enqueue a pipeline job. Poll /jobs/{job_id} for the result."""
     try:
-        # Check environment variables
-        openai_key = os.getenv("OPENAI_API_KEY")
-        openai_model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
-        
-        print(f"OpenAI API Key present: {bool(openai_key)}")
-        print(f"OpenAI Model: {openai_model}")
+        # Check the LLM backend is configured (OpenAI needs a key; local and replay backends don't)
+        backend = get_backend()
+        print(f"LLM backend: {backend.describe()}")
         
-        if not openai_key:
-            raise HTTPException(status_code=500, detail="OpenAI API key not found. Please check environment variables.")
+        missing = backend.missing_configuration()
+        if missing:
+            raise HTTPException(status_code=500, detail=missing)
         
-        # Read file content
-        file_content = await file.read()
+        validate_modes(evaluator, pipeline_mode)
         
         # Extract text from uploaded file
-        file_ext, raw_text = detect_and_extract(file.filename, file_content)
+        file_ext, raw_text = await extract_upload(file)
         
         if not raw_text.strip():
             raise HTTPException(status_code=400, detail="Could not extract text from the file")
@@ -76,47 +258,26 @@ async def process_resume(
         print(f"Processing resume for job: {job_title}")
         print(f"Resume text length: {len(raw_text)}")
         
-        # Set OpenAI API key for CrewAI
-        import os
-        if openai_key:
-            os.environ["OPENAI_API_KEY"] = openai_key
-        
-        # Run the CrewAI pipeline with timeout protection
         try:
-            cleaned, rewritten, final_resume, evaluation = run_pipeline(
-                raw_resume_text=raw_text,
+            # Publishing the job writes to the shared state, which may block on another worker's write
+            job = await run_in_threadpool(
+                job_manager.submit,
+                raw_text=raw_text,
                 job_title=job_title.strip(),
-                job_description=job_description.strip()
-            )
-        except Exception as pipeline_error:
-            print(f"Pipeline error: {str(pipeline_error)}")
-            raise HTTPException(
-                status_code=500, 
-                detail=f"AI processing error: {str(pipeline_error)}. Please try again with a shorter resume or job description."
+                job_description=job_description.strip(),
+                evaluator=evaluator,
+                pipeline_mode=pipeline_mode
             )
+        except QueueFullError as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+        except ShuttingDownError as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
         
-        # Try to parse evaluation as JSON
-        parsed_evaluation = None
-        try:
-            # Clean up the evaluation text for JSON parsing
-            eval_text = evaluation.strip()
-            # Replace single quotes with double quotes for JSON compatibility
-            eval_text = eval_text.replace("'", '"')
-            parsed_evaluation = json.loads(eval_text)
-        except Exception:
-            # If JSON parsing fails, return as string
-            parsed_evaluation = evaluation
-        
-        return {
-            "success": True,
-            "results": {
-                "cleaned": cleaned,
-                "rewritten": rewritten,
-                "final": final_resume,
-                "evaluation": parsed_evaluation
-            }
-        }
+        print(f"Queued job {job.id}")
+        return {"success": True, "job_id": job.id, "status": job.status}
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error processing resume: {str(e)}")
         print(f"Error type: {type(e).__name__}")
@@ -124,71 +285,410 @@ async def process_resume(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=f"Processing failed: {str(e)}")
 
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Return job status, and the pipeline results once it has completed"""
+    job = await run_in_threadpool(job_manager.get, job_id)
+    if job is not None:
+        return job.to_dict()
+    # Pruned from memory (or from before a restart): completed results live on in the store
+    record = await run_in_threadpool(result_store.get, job_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return {
+        "job_id": job_id,
+        "status": "completed",
+        "created_at": record["created_at"],
+        "result_id": job_id,
+        "results": {field: record.get(field) for field in RESULT_FIELDS + ("evaluation",)},
+    }
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str):
+    """Server-sent events: one `stage` event per finished stage, then a final `done` event"""
+    job = await run_in_threadpool(job_manager.get, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+
+    remote = isinstance(job, SharedJob)
+
+    async def event_stream():
+        current = job
+        sent = 0
+        idle = 0.0
+        while True:
+            if remote:
+                # Run by another worker: a fresh snapshot from the shared state each poll
+                current = await run_in_threadpool(job_manager.get, job_id) or current
+            # Snapshot `finished` before draining so no event slips in after the final check
+            finished = current.finished
+            events = await run_in_threadpool(current.events_since, sent) if remote else current.events_since(sent)
+            for event in events:
+                yield _sse("stage", event)
+                sent += 1
+                idle = 0.0
+            if finished:
+                done = current.to_dict()
+                done.pop("results", None)
+                yield _sse("done", done)
+                return
+            if idle >= SSE_KEEPALIVE_SECONDS:
+                yield ": keep-alive\n\n"
+                idle = 0.0
+            await asyncio.sleep(SSE_POLL_SECONDS)
+            idle += SSE_POLL_SECONDS
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running job"""
+    job = await run_in_threadpool(job_manager.cancel, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.post("/resume-index")
+async def index_resume(
+    file: UploadFile = File(...),
+    doc_id: str = Form(None)
+):
+    """Clean a resume (stage 1) and add it to the search index"""
+    file_ext, raw_text = await extract_upload(file)
+    if not raw_text.strip():
+        raise HTTPException(status_code=400, detail="Could not extract text from the file")
+    try:
+        cleaned = await run_in_threadpool(clean_resume, raw_text)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"AI processing error: {str(e)}")
+    doc_id = await run_in_threadpool(resume_index.add, cleaned, doc_id, file.filename)
+    return {"success": True, "doc_id": doc_id}
+
+@app.delete("/resume-index/{doc_id}")
+async def delete_indexed_resume(doc_id: str):
+    """Remove a resume from the search index"""
+    if not await run_in_threadpool(resume_index.delete, doc_id):
+        raise HTTPException(status_code=404, detail="Resume not found in index")
+    return {"success": True, "doc_id": doc_id}
+
+@app.post("/resume-index/search")
+async def search_resumes(
+    job_title: str = Form(...),
+    job_description: str = Form(...),
+    top_k: int = Form(10)
+):
+    """BM25 top-k of indexed resumes for a job description"""
+    matches = await run_in_threadpool(resume_index.search, job_title.strip(), job_description.strip(), max(1, min(top_k, 1000)))
+    return {"success": True, "matches": matches, "index": await run_in_threadpool(resume_index.stats)}
+
+BATCH_MAX_RESUMES = int(os.getenv("BATCH_MAX_RESUMES", "500"))
+BATCH_MAX_JOBS = int(os.getenv("BATCH_MAX_JOBS", "100"))
+
+def parse_jobs_field(jobs: str) -> list:
+    """A JSON list of {"job_title", "job_description"} form field, as stripped dicts."""
+    try:
+        job_list = json.loads(jobs)
+        if not isinstance(job_list, list) or not job_list:
+            raise ValueError("expected a non-empty list")
+        return [
+            {"job_title": str(j["job_title"]).strip(), "job_description": str(j["job_description"]).strip()}
+            for j in job_list
+        ]
+    except (ValueError, KeyError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid jobs field: {str(e)}")
+
+@app.post("/job-profiles")
+async def prewarm_job_profiles(jobs: str = Form(...)):
+    """Build (or fetch) the cached profile of each posting, e.g. to prewarm popular ones.
+
+    `jobs` is a JSON list of {"job_title": ..., "job_description": ...}, as for /batch.
+    """
+    job_list = parse_jobs_field(jobs)
+    if len(job_list) > BATCH_MAX_JOBS:
+        raise HTTPException(status_code=413, detail=f"Limited to {BATCH_MAX_JOBS} job descriptions")
+    profiles = []
+    for job in job_list:
+        profile = await run_in_threadpool(get_profile, job["job_title"], job["job_description"])
+        profiles.append(dict(profile, text=profile_text(profile)))
+    return {"success": True, "profiles": profiles, "cache": await run_in_threadpool(job_profile_cache.stats)}
+
+@app.get("/job-profiles/{profile_id}")
+async def get_job_profile(profile_id: str):
+    profile = await run_in_threadpool(lookup_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Job profile not found or expired")
+    return dict(profile, text=profile_text(profile))
+
+@app.post("/batch")
+async def batch(
+    request: Request,
+    files: List[UploadFile] = File(...),
+    jobs: str = Form(...),
+    optimize: bool = Form(True),
+    evaluator: str = Form(None),
+    pipeline_mode: str = Form(None)
+):
+    """Run a resume x job-description matrix and stream NDJSON events ending in a ranked summary.
+
+    `jobs` is a JSON list of {"job_title": ..., "job_description": ...}. With
+    optimize=false each pair is only scored, which is enough to rank resumes.
+    Batches queue like jobs (429 when full), and one whose client disconnects
+    is cancelled.
+    """
+    job_list = parse_jobs_field(jobs)
+    if len(files) > BATCH_MAX_RESUMES or len(job_list) > BATCH_MAX_JOBS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch limited to {BATCH_MAX_RESUMES} resumes and {BATCH_MAX_JOBS} job descriptions"
+        )
+    validate_modes(evaluator, pipeline_mode)
+    missing = get_backend().missing_configuration()
+    if optimize and missing:
+        raise HTTPException(status_code=500, detail=missing)
+
+    # Extract every resume once up front
+    resumes = []
+    for upload in files:
+        file_ext, raw_text = await extract_upload(upload)
+        if not raw_text.strip():
+            raise HTTPException(status_code=400, detail=f"Could not extract text from {upload.filename}")
+        resumes.append((upload.filename, raw_text))
+
+    try:
+        job = await run_in_threadpool(
+            batch_manager.submit,
+            resumes=resumes,
+            jobs=job_list,
+            optimize=optimize,
+            evaluator=evaluator,
+            mode=pipeline_mode
+        )
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "30"})
+    except ShuttingDownError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    print(f"Batch {job.id}: {len(resumes)} resumes x {len(job_list)} job descriptions")
+
+    async def event_lines():
+        sent = 0
+        try:
+            while True:
+                # Snapshot `finished` before draining so no event slips in after the final check
+                finished = job.finished
+                for event in job.events_since(sent):
+                    yield json.dumps(event) + "\n"
+                    sent += 1
+                if finished:
+                    if job.status == FAILED:
+                        yield json.dumps({"type": "error", "error": job.error}) + "\n"
+                    return
+                if await request.is_disconnected():
+                    print(f"Batch {job.id}: client disconnected")
+                    return
+                await asyncio.sleep(SSE_POLL_SECONDS)
+        finally:
+            # Nobody is left to read the results, so stop the batch's pipelines
+            if not job.finished:
+                batch_manager.cancel(job.id)
+
+    return StreamingResponse(event_lines(), media_type="application/x-ndjson")
+
+async def render_document(fmt: str, content: str, document=None) -> bytes:
+    """Render one format from the parsed resume, serving repeated downloads of the same text from the render cache."""
+    if fmt == "txt":
+        # The text as posted: cheaper than a cache lookup, and never a stale normalised copy
+        return content.encode("utf-8")
+    key = render_key(fmt, content)
+    # With several workers the cache's second tier is the shared state, a blocking store
+    cached = await run_in_threadpool(render_cache.get, key)
+    if cached is not None:
+        telemetry.count("ats_render_cache_hits_total", format=fmt)
+        return cached
+    if document is None:
+        document = parse_document(content)
+    with span("document.render", format=fmt):
+        rendered = await doc_pool.run(DOCUMENT_RENDERERS[fmt], document)
+    await run_in_threadpool(render_cache.set, key, rendered)
+    return rendered
+
+DOCX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+MEDIA_TYPES = {"pdf": "application/pdf", "docx": DOCX_MEDIA_TYPE, "txt": "text/plain", "zip": "application/zip"}
+
+def _content_disposition(filename: str) -> str:
+    quoted = quote(filename)
+    if quoted != filename:
+        return f"attachment; filename*=utf-8''{quoted}"
+    return f'attachment; filename="{filename}"'
+
+def _etag(fmt: str, content: str) -> str:
+    # Weak: a re-render after cache eviction is equivalent but not byte-identical (PDF timestamps)
+    return f'W/"{render_key(fmt, content)}"'
+
+def _not_modified(request: Request, etag: str):
+    """304 when the client already holds this rendering (If-None-Match), else None.
+
+    The download endpoints are POSTs carrying the text, so the check runs
+    before rendering instead of through a GET cache validator.
+    """
+    if_none_match = request.headers.get("if-none-match", "")
+    candidates = {tag.strip() for tag in if_none_match.split(",")}
+    if "*" in candidates or etag in candidates or etag[2:] in candidates:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+def download_response(body: bytes, filename: str, media_type: str, etag: str) -> Response:
+    """The rendered bytes straight from memory; Response sets Content-Length."""
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"Content-Disposition": _content_disposition(filename), "ETag": etag, "Cache-Control": "private, no-cache"},
+    )
+
 @app.post("/download-txt")
-async def download_txt(content: str = Form(...), filename: str = Form("resume.txt")):
+async def download_txt(request: Request, content: str = Form(...), filename: str = Form("resume.txt")):
     """Generate and return a TXT file download"""
+    etag = _etag("txt", content)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', encoding='utf-8') as tmp_file:
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
-        
-        return FileResponse(
-            path=tmp_file_path,
-            filename=filename,
-            media_type='text/plain'
-        )
+        return download_response(content.encode("utf-8"), filename, "text/plain", etag)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
 @app.post("/download-docx")
-async def download_docx(content: str = Form(...), filename: str = Form("resume.docx")):
+async def download_docx(request: Request, content: str = Form(...), filename: str = Form("resume.docx")):
     """Generate and return a DOCX file download"""
+    etag = _etag("docx", content)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
     try:
         # Convert text to DOCX bytes
-        docx_bytes = txt_to_docx_bytes(content)
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.docx') as tmp_file:
-            tmp_file.write(docx_bytes)
-            tmp_file_path = tmp_file.name
-        
-        return FileResponse(
-            path=tmp_file_path,
-            filename=filename,
-            media_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-        )
+        docx_bytes = await render_document("docx", content)
+        return download_response(docx_bytes, filename, DOCX_MEDIA_TYPE, etag)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Download failed: {str(e)}")
 
 @app.post("/download-pdf")
-async def download_pdf(content: str = Form(...), filename: str = Form("resume.pdf")):
+async def download_pdf(request: Request, content: str = Form(...), filename: str = Form("resume.pdf")):
     """Generate and return a PDF file download"""
+    etag = _etag("pdf", content)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
     try:
         print(f"PDF Generation: Starting PDF generation for {filename}")
         print(f"PDF Generation: Content length: {len(content)} characters")
         
         # Convert text to PDF bytes
-        pdf_bytes = txt_to_pdf_bytes(content)
+        pdf_bytes = await render_document("pdf", content)
         print(f"PDF Generation: Generated PDF size: {len(pdf_bytes)} bytes")
-        
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as tmp_file:
-            tmp_file.write(pdf_bytes)
-            tmp_file_path = tmp_file.name
-        
-        print(f"PDF Generation: Temporary file created at {tmp_file_path}")
-        
-        return FileResponse(
-            path=tmp_file_path,
-            filename=filename,
-            media_type='application/pdf'
-        )
+        return download_response(pdf_bytes, filename, "application/pdf", etag)
     except Exception as e:
         print(f"PDF Generation Error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"PDF generation failed: {str(e)}")
 
+def _zip_files(files: dict) -> bytes:
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        for name, data in files.items():
+            # PDF streams and DOCX packages are already compressed
+            compression = zipfile.ZIP_DEFLATED if name.endswith(".txt") else zipfile.ZIP_STORED
+            archive.writestr(name, data, compress_type=compression)
+    return buffer.getvalue()
+
+async def export_response(request: Request, content: str, formats: str, filename: str, archive: bool) -> Response:
+    """Parse the text once and render the requested formats concurrently; several formats (or archive) come back as a zip."""
+    requested = list(dict.fromkeys(fmt.strip().lower() for fmt in formats.split(",") if fmt.strip()))
+    unknown = [fmt for fmt in requested if fmt not in DOCUMENT_RENDERERS]
+    if not requested or unknown:
+        raise HTTPException(status_code=400, detail=f"formats must be a comma-separated subset of: {', '.join(DOCUMENT_RENDERERS)}")
+    as_zip = archive or len(requested) > 1
+    stem = os.path.splitext(filename)[0] or "resume"
+    etag = _etag("zip:" + ",".join(requested) if as_zip else requested[0], content)
+    not_modified = _not_modified(request, etag)
+    if not_modified is not None:
+        return not_modified
+    try:
+        document = parse_document(content)
+        rendered = await asyncio.gather(*(render_document(fmt, content, document) for fmt in requested))
+        if not as_zip:
+            return download_response(rendered[0], f"{stem}.{requested[0]}", MEDIA_TYPES[requested[0]], etag)
+        files = {f"{stem}.{fmt}": data for fmt, data in zip(requested, rendered)}
+        return download_response(await run_in_threadpool(_zip_files, files), f"{stem}.zip", MEDIA_TYPES["zip"], etag)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+
+@app.post("/export")
+async def export_resume(
+    request: Request,
+    content: str = Form(...),
+    formats: str = Form("pdf,docx,txt"),
+    filename: str = Form("resume"),
+    archive: bool = Form(False),
+):
+    """Render any of pdf/docx/txt from posted text in one pass"""
+    return await export_response(request, content, formats, filename, archive)
+
+async def _stored_result(result_id: str) -> dict:
+    record = await run_in_threadpool(result_store.get, result_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail="Result not found or expired")
+    return record
+
+@app.get("/results/{result_id}")
+async def get_result(result_id: str):
+    """Stored outputs of a finished job"""
+    return await _stored_result(result_id)
+
+@app.get("/results/{result_id}/download")
+async def download_result(
+    request: Request,
+    result_id: str,
+    field: str = "final",
+    formats: str = "pdf",
+    filename: str = None,
+    archive: bool = False,
+):
+    """Render a stored result by id, so the client never re-uploads the text"""
+    if field not in RESULT_FIELDS:
+        raise HTTPException(status_code=400, detail=f"field must be one of: {', '.join(RESULT_FIELDS)}")
+    record = await _stored_result(result_id)
+    return await export_response(request, record[field], formats, filename or f"{field}_resume", archive)
+
+@app.delete("/results/{result_id}")
+async def delete_result(result_id: str):
+    if not await run_in_threadpool(result_store.delete, result_id):
+        raise HTTPException(status_code=404, detail="Result not found")
+    return {"deleted": result_id}
+
 if __name__ == "__main__":
-    import os
+    parser = argparse.ArgumentParser(description="ATS Resume Optimization API server")
+    parser.add_argument("--workers", nargs="?", const="auto", default=os.environ.get("WORKERS", "1"),
+                        help="worker processes; bare --workers or 'auto' means one per core (default: WORKERS or 1)")
+    args = parser.parse_args()
     port = int(os.environ.get("PORT", 8000))
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
+    workers = resolve_workers(args.workers)
+    if workers == 1:
+        uvicorn.run(app, host="0.0.0.0", port=port, log_level="info", timeout_graceful_shutdown=DRAIN_SECONDS)
+    else:
+        # Worker processes import the app afresh and inherit these: each takes its share of the LLM
+        # rate limits and document workers, and all of them share job state and caches
+        os.environ["WORKERS"] = str(workers)
+        os.environ.setdefault("KV_BACKEND", "sqlite")
+        if os.environ["KV_BACKEND"] == "memory" or os.environ.get("RESULT_STORE") == "memory":
+            print("Warning: with several workers, KV_BACKEND=memory or RESULT_STORE=memory keeps state per process")
+        print(f"Starting {workers} workers (shared state: {os.environ['KV_BACKEND']})")
+        # Importing crewai takes a while, longer still with several workers starting on few cores
+        uvicorn.run("api_server:app", host="0.0.0.0", port=port, log_level="info", workers=workers,
+                    timeout_graceful_shutdown=DRAIN_SECONDS,
+                    timeout_worker_healthcheck=int(os.environ.get("WORKER_STARTUP_SECONDS", "60")))
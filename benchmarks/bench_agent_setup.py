@@ -0,0 +1,91 @@
+"""Per-request setup overhead: building agents on every call versus the per-thread registry.
+
+Times the non-LLM work a pipeline request does before its first round-trip:
+constructing the four stage agents (each with its LLM and OpenAI client) and
+the single-task crews. No network is used; a dummy API key is set if none is
+configured so the OpenAI clients are built exactly as in production:
+
+    python -m benchmarks.bench_agent_setup --requests 200
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+
+from crewai import Crew, Process
+
+from crew_app import agents
+from crew_app.tasks import parse_resume_task, rewrite_for_ats_task, refine_bullets_task, evaluate_ats_task
+from benchmarks.corpus import JOB_DESCRIPTION, JOB_TITLE, synthetic_resume
+
+STAGE_AGENTS = ("parser", "writer", "refiner", "evaluator")
+
+
+def fresh_agents() -> dict:
+    """What every request used to do: new agents, each with a new LLM and HTTP client."""
+    built = {}
+    for name in STAGE_AGENTS:
+        agents.shared_llm.cache_clear()
+        built[name] = agents.AGENT_BUILDERS[name]()
+    return built
+
+
+def registry_agents() -> dict:
+    return {name: agents.get_agent(name) for name in STAGE_AGENTS}
+
+
+def build_crews(stage_agents: dict, resume: str) -> list:
+    tasks = [
+        *parse_resume_task(stage_agents["parser"], resume),
+        *rewrite_for_ats_task(stage_agents["writer"], resume, JOB_TITLE, JOB_DESCRIPTION),
+        *refine_bullets_task(stage_agents["refiner"], resume),
+        evaluate_ats_task(stage_agents["evaluator"], resume, JOB_TITLE, JOB_DESCRIPTION),
+    ]
+    return [Crew(agents=[task.agent], tasks=[task], process=Process.sequential, verbose=False) for task in tasks]
+
+
+def measure(get_agents, resume: str, requests: int) -> dict:
+    agent_ms = []
+    crew_ms = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        stage_agents = get_agents()
+        built = time.perf_counter()
+        build_crews(stage_agents, resume)
+        agent_ms.append((built - started) * 1000)
+        crew_ms.append((time.perf_counter() - built) * 1000)
+    total = [a + c for a, c in zip(agent_ms, crew_ms)]
+    return {
+        "agents_ms": round(statistics.mean(agent_ms), 3),
+        "crews_ms": round(statistics.mean(crew_ms), 3),
+        "setup_ms_mean": round(statistics.mean(total), 3),
+        "setup_ms_p95": round(sorted(total)[int(len(total) * 0.95) - 1], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200, help="simulated requests per variant")
+    args = parser.parse_args()
+
+    resume = synthetic_resume(jobs=3, bullets_per_job=4, seed=1)
+    # Warm imports and pydantic schema caches so neither variant pays one-off costs
+    build_crews(fresh_agents(), resume)
+    agents.shared_llm.cache_clear()
+
+    before = measure(fresh_agents, resume, args.requests)
+    after = measure(registry_agents, resume, args.requests)
+    report = {
+        "per_request_build": before,
+        "registry": after,
+        "llm_clients_alive": agents.shared_llm.cache_info().currsize,
+        "setup_saved_pct": round(100 * (1 - after["setup_ms_mean"] / before["setup_ms_mean"]), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
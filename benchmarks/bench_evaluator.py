@@ -0,0 +1,68 @@
+"""Latency of the local ATS scorer versus the LLM evaluator stage.
+
+    python -m benchmarks.bench_evaluator                 # local scorer only
+    python -m benchmarks.bench_evaluator --llm 3         # also time 3 LLM evaluations (needs OPENAI_API_KEY)
+"""
+import argparse
+import json
+import os
+import statistics
+import time
+
+from crew_app.ats_scorer import score_resume
+from benchmarks.corpus import JOB_DESCRIPTION, JOB_TITLE, resume_corpus
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+        "p50_ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 3),
+    }
+
+
+def time_local(resumes: list, rounds: int) -> dict:
+    samples = []
+    for _ in range(rounds):
+        for resume in resumes:
+            started = time.perf_counter()
+            score_resume(resume, JOB_TITLE, JOB_DESCRIPTION)
+            samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def time_llm(resumes: list, runs: int) -> dict:
+    # Imported lazily so the local benchmark works without crewai installed
+    from crew_app.crew import evaluate_resume
+    from crew_app.cache import stage_cache
+
+    samples = []
+    for resume in resumes[:runs]:
+        stage_cache.clear()
+        started = time.perf_counter()
+        evaluate_resume(resume, JOB_TITLE, JOB_DESCRIPTION, evaluator="llm")
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--resumes", type=int, default=50, help="size of the synthetic corpus")
+    parser.add_argument("--rounds", type=int, default=20, help="passes over the corpus for the local scorer")
+    parser.add_argument("--llm", type=int, default=0, help="number of LLM evaluations to time")
+    args = parser.parse_args()
+
+    resumes = resume_corpus(args.resumes)
+    report = {"local": time_local(resumes, args.rounds)}
+    if args.llm:
+        if not os.getenv("OPENAI_API_KEY"):
+            parser.error("--llm needs OPENAI_API_KEY")
+        report["llm"] = time_llm(resumes, args.llm)
+        report["speedup"] = round(report["llm"]["mean_ms"] / report["local"]["mean_ms"], 1)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
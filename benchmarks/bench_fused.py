@@ -0,0 +1,66 @@
+"""Latency and token comparison of the standard four-stage flow versus the fused rewrite + refine mode.
+
+Runs both pipeline modes against a recorded-response stub LLM, so no API key
+or network is needed:
+
+    python -m benchmarks.bench_fused --runs 5 --time-scale 0.1
+"""
+import argparse
+import json
+import statistics
+import time
+
+from crew_app import crew as pipeline
+from crew_app.cache import stage_cache
+from benchmarks.corpus import JOB_DESCRIPTION, JOB_TITLE, resume_corpus
+from benchmarks.stub_llm import RecordedLLM
+
+
+def run_mode(llm: RecordedLLM, mode: str, resumes: list) -> dict:
+    wall = []
+    modeled = []
+    prompt_tokens = []
+    completion_tokens = []
+    llm_calls = []
+    for resume in resumes:
+        stage_cache.clear()
+        llm.reset()
+        started = time.perf_counter()
+        pipeline.run_pipeline(resume, JOB_TITLE, JOB_DESCRIPTION, mode=mode)
+        wall.append(time.perf_counter() - started)
+        modeled.append(sum(call["latency"] for call in llm.calls))
+        prompt_tokens.append(sum(call["prompt_tokens"] for call in llm.calls))
+        completion_tokens.append(sum(call["completion_tokens"] for call in llm.calls))
+        llm_calls.append(len(llm.calls))
+    return {
+        "llm_calls": statistics.mean(llm_calls),
+        "modeled_llm_latency_s": round(statistics.mean(modeled), 3),
+        "wall_clock_s": round(statistics.mean(wall), 3),
+        "prompt_tokens": round(statistics.mean(prompt_tokens), 1),
+        "completion_tokens": round(statistics.mean(completion_tokens), 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="resumes per mode")
+    parser.add_argument("--time-scale", type=float, default=0.1, help="multiply simulated latency (0 = no sleeping)")
+    args = parser.parse_args()
+
+    llm = RecordedLLM(time_scale=args.time_scale).install()
+    try:
+        resumes = resume_corpus(args.runs)
+        report = {mode: run_mode(llm, mode, resumes) for mode in pipeline.PIPELINE_MODES}
+    finally:
+        llm.uninstall()
+
+    standard, fused = report["standard"], report["fused"]
+    report["fused_vs_standard"] = {
+        "latency_saved_pct": round(100 * (1 - fused["modeled_llm_latency_s"] / standard["modeled_llm_latency_s"]), 1),
+        "prompt_tokens_saved_pct": round(100 * (1 - fused["prompt_tokens"] / standard["prompt_tokens"]), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Rule-based resume normalizer: throughput and fidelity on PDF extractions.
+
+Synthetic resumes are rendered to PDF, extracted with pypdf and given the
+artifacts real-world files carry (running headers/footers, page numbers,
+ligatures, hyphenation, wrapped lines, letter-spaced headings). Fidelity
+compares the raw extraction and the normalized text with the source resume:
+line similarity (difflib) and word-level F1, plus the residual artifacts the
+normalizer left behind.
+
+    python -m benchmarks.bench_normalizer --docs 40
+"""
+import argparse
+import difflib
+import json
+import re
+import time
+from collections import Counter
+
+from crew_app.file_tools.normalizer import BULLET_RE, PAGE_BREAK, normalize_resume
+from benchmarks.corpus import pdf_extraction_corpus
+
+ARTIFACTS = {
+    "page_numbers": re.compile(r"^page \d+ of \d+$", re.IGNORECASE | re.MULTILINE),
+    "running_headers": re.compile(r"curriculum vitae", re.IGNORECASE),
+    "ligatures": re.compile("[ﬀ-ﬆ]"),
+    "hyphen_breaks": re.compile(r"[a-z]-\n[a-z]"),
+    "spaced_letters": re.compile(r"^(?:[A-Z] ){3,}", re.MULTILINE),
+    "control_chars": re.compile("[\x00-\x08\x0b\x0e-\x1f\x7f]"),
+}
+
+
+def canonical_lines(text: str) -> list:
+    """Non-blank lines with bullets unified, so only content differences count."""
+    lines = []
+    for line in text.replace(PAGE_BREAK, "\n").splitlines():
+        line = " ".join(line.split())
+        if not line:
+            continue
+        bullet = BULLET_RE.match(line)
+        lines.append(f"• {line[bullet.end():].strip()}" if bullet else line)
+    return lines
+
+
+def word_f1(truth: list, candidate: list) -> float:
+    expected = Counter(" ".join(truth).split())
+    found = Counter(" ".join(candidate).split())
+    overlap = sum((expected & found).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(found.values())
+    recall = overlap / sum(expected.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def fidelity(pairs: list, texts: list) -> dict:
+    line_ratio = f1 = 0.0
+    for (source, _), text in zip(pairs, texts):
+        truth, candidate = canonical_lines(source), canonical_lines(text)
+        line_ratio += difflib.SequenceMatcher(None, truth, candidate, autojunk=False).ratio()
+        f1 += word_f1(truth, candidate)
+    return {
+        "line_similarity": round(line_ratio / len(pairs), 3),
+        "word_f1": round(f1 / len(pairs), 3),
+        "artifacts": {name: sum(len(pattern.findall(text)) for text in texts) for name, pattern in ARTIFACTS.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=40, help="resumes in the corpus")
+    parser.add_argument("--rounds", type=int, default=20, help="normalizer passes over the corpus for timing")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    pairs = pdf_extraction_corpus(args.docs, seed=args.seed)
+    extracted = [raw for _, raw in pairs]
+    started = time.perf_counter()
+    for _ in range(args.rounds):
+        normalized = [normalize_resume(raw) for raw in extracted]
+    elapsed = time.perf_counter() - started
+
+    megabytes = args.rounds * sum(len(raw.encode()) for raw in extracted) / 1e6
+    report = {
+        "docs": args.docs,
+        "pages": sum(raw.count(PAGE_BREAK) + 1 for raw in extracted),
+        "throughput": {
+            "docs_per_s": round(args.rounds * args.docs / elapsed, 1),
+            "mb_per_s": round(megabytes / elapsed, 2),
+            "ms_per_doc": round(elapsed * 1000 / (args.rounds * args.docs), 3),
+        },
+        "raw": fidelity(pairs, extracted),
+        "normalized": fidelity(pairs, normalized),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
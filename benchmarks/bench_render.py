@@ -0,0 +1,78 @@
+"""Download rendering throughput: fresh renders versus the render cache.
+
+"render" renders every resume once per format; "cached" replays the UI's
+pattern of downloading the same final resume several times per format through
+a RenderCache, so repeats skip ReportLab/python-docx entirely. Runs in-process,
+without the document pool, to isolate renderer cost.
+
+    python -m benchmarks.bench_render --docs 30 --repeats 3
+"""
+import argparse
+import json
+import time
+
+from crew_app.cache import RenderCache, render_key
+from crew_app.document_model import classify_lines
+from crew_app.utils import txt_to_docx_bytes, txt_to_pdf_bytes
+from benchmarks.corpus import resume_corpus
+
+RENDERERS = {"pdf": txt_to_pdf_bytes, "docx": txt_to_docx_bytes}
+
+
+def throughput(count: int, elapsed: float) -> float:
+    return round(count / elapsed, 1) if elapsed else 0.0
+
+
+def time_render(resumes: list) -> dict:
+    report = {}
+    for fmt, renderer in RENDERERS.items():
+        started = time.perf_counter()
+        sizes = [len(renderer(resume)) for resume in resumes]
+        report[fmt] = {"docs_per_s": throughput(len(resumes), time.perf_counter() - started), "avg_bytes": sum(sizes) // len(sizes)}
+    return report
+
+
+def time_cached(resumes: list, repeats: int) -> dict:
+    report = {}
+    for fmt, renderer in RENDERERS.items():
+        cache = RenderCache()
+        started = time.perf_counter()
+        for resume in resumes:
+            for _ in range(repeats):
+                key = render_key(fmt, resume)
+                if cache.get(key) is None:
+                    cache.set(key, renderer(resume))
+        report[fmt] = {"docs_per_s": throughput(len(resumes) * repeats, time.perf_counter() - started), **cache.stats()}
+    return report
+
+
+def time_classifier(resumes: list, rounds: int = 20) -> dict:
+    documents = [[line.strip() for line in resume.splitlines()] for resume in resumes]
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for lines in documents:
+            classify_lines(lines)
+    elapsed = time.perf_counter() - started
+    return {"lines_per_s": throughput(rounds * sum(len(lines) for lines in documents), elapsed)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--docs", type=int, default=30, help="distinct resumes")
+    parser.add_argument("--repeats", type=int, default=3, help="downloads of each resume per format in the cached run")
+    args = parser.parse_args()
+
+    resumes = resume_corpus(args.docs)
+    # Warm-up: first-call costs (font metrics, style sheet) are paid once per worker process
+    for renderer in RENDERERS.values():
+        renderer(resumes[0])
+    report = {
+        "render": time_render(resumes),
+        "cached": time_cached(resumes, args.repeats),
+        "classifier": time_classifier(resumes),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""LLM scheduler under a rate-limited, slow-tailed provider.
+
+Starts benchmarks.fake_llm_server with a requests-per-minute limit and a slow
+tail, then fires a burst of concurrent completions, half of them at batch
+priority, in three modes against a fresh server each:
+
+- direct: the plain crewai LLM with the OpenAI SDK's own retries (the old path);
+- scheduled: ScheduledLLM with the server's limit, SDK retries off;
+- hedged: scheduled, plus a duplicate for calls slower than --hedge-after.
+
+Reports successes, failures, 429s the server sent, latency percentiles per
+priority and wall time as JSON.
+
+    python -m benchmarks.bench_scheduler --requests 120 --rpm 600
+    python -m benchmarks.bench_scheduler --requests 120 --rpm 600 --arrival-rate 6
+"""
+import argparse
+import json
+import threading
+import time
+
+from crewai import LLM
+
+from crew_app.llm_backends import MODEL
+from crew_app.llm_scheduler import LLMScheduler, ScheduledLLM, llm_priority
+from benchmarks.fake_llm_server import FakeLLM, start_server
+from benchmarks.load_test import percentile
+
+MODES = ("direct", "scheduled", "hedged")
+
+
+def make_llm(mode: str, base_url: str, args):
+    if mode == "direct":
+        return LLM(model=MODEL, base_url=base_url, api_key="not-needed", provider="openai", temperature=0.0)
+    inner = LLM(model=MODEL, base_url=base_url, api_key="not-needed", provider="openai", temperature=0.0, max_retries=0)
+    scheduler = LLMScheduler(rpm=args.rpm, tpm=0, max_concurrency=args.max_concurrency, burst_seconds=args.burst,
+                             hedge_after=args.hedge_after if mode == "hedged" else 0)
+    return ScheduledLLM(model=inner.model, temperature=0.0, inner=inner, scheduler=scheduler, key=f"{base_url}/{inner.model}")
+
+
+def run_mode(mode: str, args) -> dict:
+    fake = FakeLLM(rpm=args.rpm, burst=args.burst, latency=args.latency, slow_rate=args.slow_rate,
+                   slow_latency=args.slow_latency, error_rate=args.error_rate, seed=args.seed)
+    server = start_server(fake)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}/v1"
+    llm = make_llm(mode, base_url, args)
+    latencies = {"interactive": [], "batch": []}
+    failures = []
+    lock = threading.Lock()
+
+    def one(i: int):
+        priority = "batch" if i % 2 else "interactive"
+        messages = [{"role": "user", "content": f"Request {i}: summarise this resume in one line."}]
+        started = time.perf_counter()
+        try:
+            with llm_priority(priority):
+                llm.call(messages)
+        except Exception as e:
+            with lock:
+                failures.append(type(e).__name__)
+            return
+        with lock:
+            latencies[priority].append(time.perf_counter() - started)
+
+    # By default all requests arrive at once, as when a batch lands next to interactive users;
+    # --arrival-rate spaces them out to measure the tail under steady load instead
+    threads = [threading.Thread(target=one, args=(i,)) for i in range(args.requests)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+        if args.arrival_rate:
+            time.sleep(1.0 / args.arrival_rate)
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+    server.shutdown()
+
+    report = {
+        "ok": sum(len(values) for values in latencies.values()),
+        "failed": len(failures),
+        "failure_types": sorted(set(failures)),
+        "wall_s": round(wall, 2),
+        "server": fake.stats(),
+    }
+    for priority, values in latencies.items():
+        report[priority] = {f"p{pct}_s": round(percentile(values, pct), 3) for pct in (50, 95, 99)}
+    if isinstance(llm, ScheduledLLM):
+        report["scheduler"] = llm.scheduler.stats()["keys"].popitem()[1]
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=120)
+    parser.add_argument("--rpm", type=int, default=600, help="the fake server's limit, also given to the scheduler")
+    parser.add_argument("--burst", type=float, default=1.0, help="seconds of the per-minute allowance accepted at once")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=4.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    parser.add_argument("--arrival-rate", type=float, default=0.0, help="requests per second (0: all at once)")
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--hedge-after", type=float, default=1.0)
+    parser.add_argument("--modes", default=",".join(MODES))
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    results = {}
+    for mode in args.modes.split(","):
+        results[mode] = run_mode(mode, args)
+        print(f"{mode}: {results[mode]['ok']} ok, {results[mode]['failed']} failed, "
+              f"{results[mode]['server']['rate_limited']} 429s, {results[mode]['wall_s']}s")
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""Wall-clock comparison of whole-document rewriting versus the section-parallel mode.
+
+Runs against the recorded-response stub LLM with real sleeps, so the
+concurrency of "sections" mode shows up in wall-clock time; no API key or
+network is needed. Keep the time scale near 1: crewai takes a SQLite file lock
+whenever a Crew is constructed, a fixed few milliseconds that would dominate
+artificially shortened calls.
+
+    python -m benchmarks.bench_sections --runs 3 --time-scale 1 --concurrency 4
+"""
+import argparse
+import json
+
+from crew_app import crew as pipeline
+from benchmarks.bench_fused import run_mode
+from benchmarks.corpus import resume_corpus
+from benchmarks.stub_llm import RecordedLLM
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="resumes per mode")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="multiply simulated latency (must be > 0 to see overlap)")
+    parser.add_argument("--concurrency", type=int, default=pipeline.SECTION_CONCURRENCY, help="section calls in flight")
+    args = parser.parse_args()
+
+    pipeline.SECTION_CONCURRENCY = args.concurrency
+    llm = RecordedLLM(time_scale=args.time_scale).install()
+    try:
+        resumes = resume_corpus(args.runs)
+        report = {mode: run_mode(llm, mode, resumes) for mode in ("standard", "sections")}
+    finally:
+        llm.uninstall()
+
+    standard, sections = report["standard"], report["sections"]
+    report["sections_vs_standard"] = {
+        "wall_clock_saved_pct": round(100 * (1 - sections["wall_clock_s"] / standard["wall_clock_s"]), 1),
+        "extra_llm_calls": round(sections["llm_calls"] - standard["llm_calls"], 1),
+        "prompt_tokens_delta_pct": round(100 * (sections["prompt_tokens"] / standard["prompt_tokens"] - 1), 1),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""Throughput scaling across API worker processes, and graceful draining.
+
+For each worker count, starts `python api_server.py --workers N` on the
+replay LLM backend with the SQLite shared state in a temporary directory,
+drives /process-resume end to end (upload, then the job's SSE stream) as
+benchmarks.load_test does, and reports throughput, latency and speedup over
+the first count, plus how many distinct workers answered fresh connections.
+
+The drain check submits jobs to the largest deployment, sends SIGTERM at once
+and counts the jobs whose results were stored before the server exited.
+
+    python -m benchmarks.bench_workers --workers 1,2,4 --requests 40 --concurrency 16
+"""
+import argparse
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+
+import requests
+
+from crew_app.result_store import SQLiteResultStore
+from benchmarks.corpus import JOB_DESCRIPTION, JOB_TITLE, upload_corpus
+from benchmarks.load_test import MIME_TYPES, REPLAY_DIR, REPO_ROOT, _free_port, run_scenario, server_env, wait_ready
+
+
+def start_workers(port: int, workers: int, state_dir: str, args) -> subprocess.Popen:
+    env = server_env(port, args)
+    env.pop("WORKERS", None)
+    env.update({
+        "KV_BACKEND": "sqlite",
+        "KV_PATH": os.path.join(state_dir, "shared_state.db"),
+        "RESULT_STORE": "sqlite",
+        "RESULT_STORE_PATH": os.path.join(state_dir, "results.db"),
+    })
+    log = open(args.server_log, "a") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "api_server.py", "--workers", str(workers)],
+        cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def stop(server: subprocess.Popen) -> float:
+    """SIGTERM, then seconds until the server (and so every worker) has exited."""
+    started = time.perf_counter()
+    server.send_signal(signal.SIGTERM)
+    server.wait(timeout=300)
+    return round(time.perf_counter() - started, 2)
+
+
+def workers_seen(url: str, probes: int = 40) -> int:
+    """Distinct worker pids answering /health over fresh connections."""
+    return len({requests.get(f"{url}/health", timeout=10).json()["workers"]["pid"] for _ in range(probes)})
+
+
+def run_workers(workers: int, uploads: list, args) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as state_dir:
+        server = start_workers(port, workers, state_dir, args)
+        try:
+            wait_ready(url, timeout=300)
+            result = run_scenario(url, "process-resume", uploads, args.requests, args.concurrency, args.warmup)
+            result["workers_seen"] = workers_seen(url)
+        finally:
+            shutdown_s = stop(server)
+        result["shutdown_s"] = shutdown_s
+    return result
+
+
+def drain_check(workers: int, uploads: list, args) -> dict:
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as state_dir:
+        server = start_workers(port, workers, state_dir, args)
+        try:
+            wait_ready(url, timeout=300)
+            job_ids = []
+            for filename, content, _ in uploads[:args.drain_jobs]:
+                ext = filename.rsplit(".", 1)[-1]
+                response = requests.post(
+                    f"{url}/process-resume",
+                    files={"file": (filename, content, MIME_TYPES[ext])},
+                    data={"job_title": JOB_TITLE, "job_description": JOB_DESCRIPTION},
+                    timeout=60,
+                )
+                response.raise_for_status()
+                job_ids.append(response.json()["job_id"])
+        finally:
+            shutdown_s = stop(server)
+        store = SQLiteResultStore(os.path.join(state_dir, "results.db"))
+        try:
+            stored = sum(1 for job_id in job_ids if store.get(job_id) is not None)
+        finally:
+            store.close()
+    return {"workers": workers, "submitted": len(job_ids), "completed": stored, "shutdown_s": shutdown_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default="1,2,4", help="comma-separated worker counts")
+    parser.add_argument("--requests", type=int, default=40, help="requests per worker count")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--warmup", type=int, default=4, help="untimed requests per worker count")
+    parser.add_argument("--corpus", type=int, default=12, help="distinct synthetic resumes")
+    parser.add_argument("--llm-latency", type=float, default=0.1, help="replayed LLM base latency (s)")
+    parser.add_argument("--token-latency", type=float, default=0.002, help="replayed LLM latency per completion token (s)")
+    parser.add_argument("--pipeline-workers", type=int, default=4, help="pipeline threads per worker")
+    parser.add_argument("--pipeline-mode", help="server PIPELINE_MODE")
+    parser.add_argument("--cache", action="store_true", help="keep the stage cache enabled")
+    parser.add_argument("--replay-dir", default=REPLAY_DIR, help="recordings served by the replay backend")
+    parser.add_argument("--drain-jobs", type=int, default=8, help="jobs in flight at SIGTERM for the drain check (0 skips it)")
+    parser.add_argument("--server-log", help="append the servers' output to this file")
+    parser.add_argument("--output", help="write the JSON report here")
+    args = parser.parse_args()
+
+    counts = [int(count) for count in args.workers.split(",")]
+    uploads = upload_corpus(max(args.corpus, args.drain_jobs))
+    results = {}
+    for workers in counts:
+        print(f"Running {workers} worker(s): {args.requests} requests, {args.concurrency} concurrent...", file=sys.stderr)
+        results[workers] = run_workers(workers, uploads, args)
+    base = results[counts[0]]["throughput_rps"]
+    for workers in counts:
+        results[workers]["speedup"] = round(results[workers]["throughput_rps"] / base, 2) if base else 0.0
+
+    report = {
+        "meta": {"cpus": os.cpu_count(), "config": {k: v for k, v in vars(args).items() if k not in ("output", "server_log")}},
+        "workers": results,
+    }
+    if args.drain_jobs:
+        print(f"Drain check: {args.drain_jobs} jobs, SIGTERM right after submitting...", file=sys.stderr)
+        report["drain"] = drain_check(max(counts), uploads, args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
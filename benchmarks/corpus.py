@@ -0,0 +1,133 @@
+"""Synthetic resumes and job descriptions shared by the benchmarks."""
+import random
+
+JOB_TITLE = "Senior Python Developer"
+
+JOB_DESCRIPTION = """We are looking for a Senior Python Developer to join our platform team.
+Requirements:
+- 5+ years of experience with Python, Django or FastAPI
+- Strong knowledge of PostgreSQL, Redis and REST API design
+- Experience with AWS, Docker, Kubernetes and CI/CD pipelines
+- Familiarity with machine learning workflows and data pipelines
+Preferred:
+- Experience with React or TypeScript
+- Exposure to Kafka, Airflow and distributed systems
+Responsibilities include designing scalable microservices, mentoring engineers,
+improving observability and owning production reliability for customer-facing APIs."""
+
+SKILLS = [
+    "Python", "Django", "FastAPI", "Flask", "PostgreSQL", "MySQL", "Redis", "AWS", "GCP", "Docker",
+    "Kubernetes", "Terraform", "React", "TypeScript", "Kafka", "Airflow", "Spark", "Pandas",
+    "REST APIs", "GraphQL", "CI/CD", "Git", "Linux", "Celery", "RabbitMQ", "machine learning",
+]
+VERBS = [
+    "Led", "Built", "Designed", "Reduced", "Improved", "Migrated", "Automated", "Implemented",
+    "Worked on", "Helped with", "Responsible for", "Maintained", "Optimized", "Launched",
+]
+OBJECTS = [
+    "a payments API", "the data ingestion pipeline", "internal dashboards", "the search service",
+    "customer onboarding flows", "deployment tooling", "the reporting backend", "billing microservices",
+]
+OUTCOMES = [
+    "cutting latency by {n}%", "serving {n}k daily users", "saving ${n}k per year", "",
+    "across {n} teams", "improving uptime to 99.{n}%", "",
+]
+COMPANIES = ["Acme Corp", "Globex Inc", "Initech LLC", "Umbrella Ltd", "Hooli", "Stark Industries"]
+SCHOOLS = ["State University", "Institute of Technology", "City College"]
+
+
+def synthetic_resume(jobs: int = 3, bullets_per_job: int = 4, seed: int = 0) -> str:
+    """A plausible plain-text resume; size grows with `jobs` x `bullets_per_job`."""
+    rng = random.Random(seed)
+    lines = [
+        "JANE DOE",
+        "jane.doe@example.com | +1 555 0100 | Berlin, Germany",
+        "",
+        "PROFESSIONAL SUMMARY",
+        f"Software engineer with {rng.randint(3, 12)} years of experience building backend systems "
+        f"with {', '.join(rng.sample(SKILLS, 3))}.",
+        "",
+        "EXPERIENCE",
+    ]
+    for index in range(jobs):
+        start = 2024 - 2 * (index + 1)
+        lines.append("Software Engineer")
+        lines.append(f"{rng.choice(COMPANIES)} | {start} - {start + 2}")
+        for _ in range(bullets_per_job):
+            outcome = rng.choice(OUTCOMES).format(n=rng.randint(2, 90))
+            bullet = f"- {rng.choice(VERBS)} {rng.choice(OBJECTS)} using {rng.choice(SKILLS)}"
+            lines.append(f"{bullet}, {outcome}" if outcome else bullet)
+        lines.append("")
+    lines += [
+        "EDUCATION",
+        f"B.Sc. Computer Science, {rng.choice(SCHOOLS)}, {2024 - 2 * jobs - 4}",
+        "",
+        "SKILLS",
+        ", ".join(rng.sample(SKILLS, 10)),
+    ]
+    return "\n".join(lines)
+
+
+def resume_corpus(count: int = 20, seed: int = 0) -> list:
+    """Resumes of varied size, from a one-job CV to a long career history."""
+    rng = random.Random(seed)
+    return [
+        synthetic_resume(jobs=rng.randint(1, 8), bullets_per_job=rng.randint(2, 7), seed=seed + i)
+        for i in range(count)
+    ]
+
+
+UPLOAD_FORMATS = ("txt", "docx", "pdf")
+
+
+def upload_corpus(count: int = 20, seed: int = 0) -> list:
+    """(filename, file bytes, resume text) uploads of varied size, cycling through txt, docx and pdf."""
+    from crew_app.utils import txt_to_docx_bytes, txt_to_pdf_bytes
+
+    render = {"txt": lambda text: text.encode("utf-8"), "docx": txt_to_docx_bytes, "pdf": txt_to_pdf_bytes}
+    uploads = []
+    for i, text in enumerate(resume_corpus(count, seed)):
+        ext = UPLOAD_FORMATS[i % len(UPLOAD_FORMATS)]
+        uploads.append((f"resume_{i}.{ext}", render[ext](text), text))
+    return uploads
+
+
+def _with_extraction_artifacts(extracted: str, rng: random.Random) -> str:
+    """Add damage real-world PDFs carry that our own renderer does not produce."""
+    pages = extracted.split("\f")
+    damaged = []
+    for number, page in enumerate(pages, 1):
+        lines = page.strip("\n").split("\n")
+        lines = ["Jane Doe  ·  Curriculum Vitae"] + lines + [f"Page {number} of {len(pages)}"]
+        for i, line in enumerate(lines):
+            words = line.split()
+            if line.isupper() and 1 <= len(words) <= 3 and rng.random() < 0.5:
+                # Letter-spaced heading
+                lines[i] = "  ".join(" ".join(word) for word in words)
+            elif len(words) > 8 and rng.random() < 0.3:
+                # Long line hyphenated or wrapped at a word boundary
+                cut = rng.randint(4, len(words) - 3)
+                word = words[cut]
+                if len(word) > 6 and word.isalpha() and word.islower():
+                    lines[i] = " ".join(words[:cut] + [word[:3] + "-"]) + "\n" + " ".join([word[3:]] + words[cut + 1:])
+                elif words[cut][0].islower():
+                    lines[i] = " ".join(words[:cut]) + "\n" + " ".join(words[cut:])
+        text = "\n".join(lines)
+        text = text.replace("ffi", "\ufb03").replace("fi", "\ufb01").replace("fl", "\ufb02").replace(" | ", "\u00a0|\u00a0")
+        damaged.append(text)
+    return "\n\f\n".join(damaged)
+
+
+def pdf_extraction_corpus(count: int = 20, seed: int = 0) -> list:
+    """(source text, extracted text) pairs: synthetic resumes rendered to PDF, extracted with pypdf,
+    then given running headers/footers, ligatures, hyphenation and letter-spaced headings."""
+    from crew_app.utils import txt_to_pdf_bytes
+    from crew_app.file_tools.file_loader import extract_text_from_pdf
+
+    rng = random.Random(seed)
+    pairs = []
+    for i in range(count):
+        source = synthetic_resume(jobs=rng.randint(2, 12), bullets_per_job=rng.randint(3, 8), seed=seed + i)
+        extracted = extract_text_from_pdf(txt_to_pdf_bytes(source))
+        pairs.append((source, _with_extraction_artifacts(extracted, rng)))
+    return pairs
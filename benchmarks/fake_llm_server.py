@@ -0,0 +1,179 @@
+"""Local OpenAI-compatible chat completions server that misbehaves on purpose.
+
+Answers POST /v1/chat/completions from the replay recordings (by agent role,
+so the full pipeline runs against it), after a configurable latency with an
+optional slow tail, and enforces its own requests-per-minute limit with 429s
+and Retry-After the way OpenAI does. It can also inject random 429s and 500s.
+GET /stats returns what it saw.
+
+    python -m benchmarks.fake_llm_server --port 8090 --rpm 120 --slow-rate 0.05
+    LLM_BACKEND=compatible LLM_BASE_URL=http://127.0.0.1:8090/v1 python api_server.py
+"""
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from crew_app.llm_backends import ReplayStore, describe_prompt
+from crew_app.prompt_budget import count_tokens
+from benchmarks.load_test import REPLAY_DIR
+
+DEFAULT_RESPONSE = "Done."
+
+
+class FakeLLM:
+    """Server-side behaviour: rate limit, latency and injected errors, plus counters."""
+
+    def __init__(self, rpm: int = 0, burst: float = 1.0, latency: float = 0.2, jitter: float = 0.1,
+                 slow_rate: float = 0.0, slow_latency: float = 5.0, error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 replay_dir: str = REPLAY_DIR, seed: int = None):
+        self.rpm = rpm
+        self.rate = rpm / 60.0
+        # Requests allowed at once: `burst` seconds' worth, as providers enforce limits over short windows
+        self.capacity = max(1.0, self.rate * burst)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+        self.latency = latency
+        self.jitter = jitter
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.store = ReplayStore(replay_dir)
+        self.random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "rate_limited": 0, "errors": 0, "slow": 0, "in_flight": 0, "max_in_flight": 0}
+
+    def _count(self, name: str, value: int = 1):
+        with self._lock:
+            self.counts[name] += value
+            if name == "in_flight":
+                self.counts["max_in_flight"] = max(self.counts["max_in_flight"], self.counts["in_flight"])
+
+    def admit(self):
+        """None when the request is within the limit, else the seconds until it would be."""
+        with self._lock:
+            self.counts["requests"] += 1
+            if self.throttle_rate and self.random.random() < self.throttle_rate:
+                return 1.0
+            if not self.rpm:
+                return None
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.level >= 1:
+                self.level -= 1
+                return None
+            return (1 - self.level) / self.rate
+
+    def complete(self, body: dict):
+        """(status, payload) for one chat completion request, after the simulated latency."""
+        wait = self.admit()
+        if wait is not None:
+            self._count("rate_limited")
+            return 429, {"error": {"message": "Rate limit reached for requests", "type": "requests", "code": "rate_limit_exceeded"}}, {"retry-after": f"{wait:.3f}"}
+        self._count("in_flight")
+        try:
+            with self._lock:
+                slow = self.random.random() < self.slow_rate
+                fail = self.random.random() < self.error_rate
+                delay = self.slow_latency if slow else max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+            if slow:
+                self._count("slow")
+            time.sleep(delay)
+            if fail:
+                self._count("errors")
+                return 500, {"error": {"message": "The server had an error while processing your request", "type": "server_error"}}, {}
+            messages = body.get("messages", [])
+            role, shape = describe_prompt(messages)
+            content = self.store.lookup(None, role, shape) or DEFAULT_RESPONSE
+            prompt_tokens = count_tokens("\n".join(str(m.get("content", "")) for m in messages))
+            completion_tokens = count_tokens(content)
+            self._count("ok")
+            return 200, {
+                "id": f"chatcmpl-fake-{self.counts['requests']}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": body.get("model", "fake"),
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens, "total_tokens": prompt_tokens + completion_tokens},
+            }, {}
+        finally:
+            self._count("in_flight", -1)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+
+def make_handler(fake: FakeLLM):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _reply(self, status: int, payload: dict, headers: dict = None):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+            if not self.path.rstrip("/").endswith("/chat/completions"):
+                self._reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+                return
+            self._reply(*fake.complete(body))
+
+        def do_GET(self):
+            if self.path.rstrip("/") == "/stats":
+                self._reply(200, fake.stats())
+            else:
+                self._reply(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def start_server(fake: FakeLLM, host: str = "127.0.0.1", port: int = 0):
+    """Serve `fake` on a background thread; returns the server (its port is server.server_address[1])."""
+    server = ThreadingHTTPServer((host, port), make_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="fake-llm").start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--rpm", type=int, default=0, help="requests per minute before 429s (0: unlimited)")
+    parser.add_argument("--burst", type=float, default=1.0, help="seconds of the per-minute allowance accepted at once")
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per completion")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="share of completions that take --slow-latency")
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of completions that fail with a 500")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="share of requests rejected with a 429 regardless of rate")
+    args = parser.parse_args()
+
+    fake = FakeLLM(rpm=args.rpm, burst=args.burst, latency=args.latency, jitter=args.jitter, slow_rate=args.slow_rate,
+                   slow_latency=args.slow_latency, error_rate=args.error_rate, throttle_rate=args.throttle_rate)
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(fake))
+    print(f"Fake LLM server on http://{args.host}:{args.port}/v1")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print(json.dumps(fake.stats()))
+
+
+if __name__ == "__main__":
+    main()
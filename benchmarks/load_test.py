@@ -0,0 +1,334 @@
+"""Load test for a single api_server instance.
+
+Starts the server with the replay LLM backend (no network or API key needed),
+drives /process-resume end to end (upload, then the job's SSE stream until
+done) and the three download endpoints with a corpus of synthetic resumes in
+txt, docx and pdf form, and reports throughput, latency percentiles, server
+RSS and a per-stage breakdown as JSON:
+
+    python -m benchmarks.load_test --requests 40 --concurrency 8 --output load.json
+    python -m benchmarks.load_test --compare load.json      # after a change
+
+`--url` targets an already running server instead (RSS is then not sampled).
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from benchmarks.corpus import JOB_DESCRIPTION, JOB_TITLE, upload_corpus
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPLAY_DIR = os.path.join(REPO_ROOT, "benchmarks", "recordings", "replay")
+SCENARIOS = ("process-resume", "download-pdf", "download-docx", "download-txt")
+MIME_TYPES = {
+    "txt": "text/plain",
+    "docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "pdf": "application/pdf",
+}
+# Metrics compared against a baseline, and whether a higher value is better
+COMPARED_METRICS = {"throughput_rps": True, "p50_ms": False, "p95_ms": False, "p99_ms": False}
+
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _rss_bytes(pid: int) -> int:
+    """Resident memory of a process and its children (the document pool workers); Linux only."""
+    total = 0
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        try:
+            with open(f"/proc/{current}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+            for task in os.listdir(f"/proc/{current}/task"):
+                with open(f"/proc/{current}/task/{task}/children") as f:
+                    pending.extend(int(child) for child in f.read().split())
+        except (OSError, ValueError):
+            continue
+    return total
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.is_set():
+            rss = _rss_bytes(self.pid)
+            if rss:
+                self.samples.append(rss)
+            self._done.wait(self.interval)
+
+    def stop(self) -> dict:
+        self._done.set()
+        self.join()
+        if not self.samples:
+            return {}
+        mb = 1024 * 1024
+        return {
+            "start_mb": round(self.samples[0] / mb, 1),
+            "peak_mb": round(max(self.samples) / mb, 1),
+            "end_mb": round(self.samples[-1] / mb, 1),
+        }
+
+
+def server_env(port: int, args) -> dict:
+    """Environment for a server on the replay backend, as configured by the command line."""
+    env = dict(os.environ)
+    env.update({
+        "PORT": str(port),
+        "LLM_BACKEND": "replay",
+        "LLM_REPLAY_DIR": args.replay_dir,
+        "LLM_REPLAY_LATENCY": str(args.llm_latency),
+        "LLM_REPLAY_TOKEN_LATENCY": str(args.token_latency),
+        "PIPELINE_WORKERS": str(args.pipeline_workers),
+        "PIPELINE_QUEUE_SIZE": str(max(args.requests + args.warmup, 16)),
+        # Repeated corpus resumes would otherwise be served from the stage cache
+        "STAGE_CACHE_SIZE": env.get("STAGE_CACHE_SIZE", "0") if not args.cache else env.get("STAGE_CACHE_SIZE", "256"),
+    })
+    env.pop("STAGE_CACHE_DB", None)
+    if not args.cache:
+        env["STAGE_CACHE_SHARED"] = "false"
+    if args.pipeline_mode:
+        env["PIPELINE_MODE"] = args.pipeline_mode
+    return env
+
+
+def start_server(port: int, args) -> subprocess.Popen:
+    log = open(args.server_log, "w") if args.server_log else subprocess.DEVNULL
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=server_env(port, args), stdout=log, stderr=subprocess.STDOUT,
+    )
+
+
+def wait_ready(url: str, timeout: float = 60.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"{url}/health", timeout=2).ok:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.25)
+    raise RuntimeError(f"Server at {url} did not become ready within {timeout:.0f}s")
+
+
+def process_resume(session: requests.Session, url: str, upload: tuple) -> dict:
+    """Submit one upload and follow its SSE stream; returns per-stage durations."""
+    filename, content, _ = upload
+    ext = filename.rsplit(".", 1)[-1]
+    response = session.post(
+        f"{url}/process-resume",
+        files={"file": (filename, content, MIME_TYPES[ext])},
+        data={"job_title": JOB_TITLE, "job_description": JOB_DESCRIPTION},
+        timeout=60,
+    )
+    response.raise_for_status()
+    job_id = response.json()["job_id"]
+    stages = {}
+    event = None
+    with session.get(f"{url}/jobs/{job_id}/events", stream=True, timeout=600) as stream:
+        for line in stream.iter_lines(decode_unicode=True):
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                data = json.loads(line[6:])
+                if event == "stage":
+                    stages[data["stage"]] = data["duration"]
+                elif event == "done":
+                    if data["status"] != "completed":
+                        raise RuntimeError(f"Job {job_id} {data['status']}: {data.get('error')}")
+                    return stages
+    raise RuntimeError(f"Event stream for job {job_id} ended early")
+
+
+def download(session: requests.Session, url: str, kind: str, upload: tuple) -> dict:
+    response = session.post(f"{url}/download-{kind}", data={"content": upload[2], "filename": f"resume.{kind}"}, timeout=120)
+    response.raise_for_status()
+    return {}
+
+
+def run_scenario(url: str, scenario: str, uploads: list, requests_count: int, concurrency: int, warmup: int = 0) -> dict:
+    local = threading.local()
+
+    def one(i: int):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        upload = uploads[i % len(uploads)]
+        started = time.perf_counter()
+        try:
+            if scenario == "process-resume":
+                stages = process_resume(session, url, upload)
+            else:
+                stages = download(session, url, scenario.split("-", 1)[1], upload)
+            return time.perf_counter() - started, stages, None
+        except Exception as e:
+            return time.perf_counter() - started, {}, str(e)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Untimed requests first, so worker processes, agents and connections are warm
+        list(executor.map(one, range(warmup)))
+        started = time.perf_counter()
+        outcomes = list(executor.map(one, range(requests_count)))
+    wall = time.perf_counter() - started
+
+    latencies = [latency * 1000 for latency, _, error in outcomes if error is None]
+    errors = [error for _, _, error in outcomes if error is not None]
+    stage_durations = {}
+    for _, stages, error in outcomes:
+        for stage, duration in stages.items():
+            stage_durations.setdefault(stage, []).append(duration * 1000)
+    result = {
+        "requests": requests_count,
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / wall, 3) if wall else 0.0,
+        "mean_ms": round(statistics.mean(latencies), 1) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 1),
+        "p95_ms": round(percentile(latencies, 95), 1),
+        "p99_ms": round(percentile(latencies, 99), 1),
+        "wall_s": round(wall, 3),
+    }
+    if stage_durations:
+        result["stages"] = {
+            stage: {"mean_ms": round(statistics.mean(values), 1), "p95_ms": round(percentile(values, 95), 1)}
+            for stage, values in stage_durations.items()
+        }
+    if errors:
+        result["sample_errors"] = sorted(set(errors))[:3]
+    return result
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def compare(report: dict, baseline: dict, threshold_pct: float) -> list:
+    """Print per-metric deltas against a baseline report; return the regressions beyond `threshold_pct`."""
+    regressions = []
+    print(f"\nAgainst {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('timestamp')}):")
+    for scenario, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(scenario)
+        if not previous:
+            continue
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = 100 * (after - before) / before
+            worse = -change if higher_is_better else change
+            flag = "  REGRESSION" if worse > threshold_pct else ""
+            print(f"  {scenario:15} {metric:15} {before:>10} -> {after:>10} ({change:+.1f}%){flag}")
+            if flag:
+                regressions.append(f"{scenario} {metric}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="test a running server instead of starting one")
+    parser.add_argument("--requests", type=int, default=40, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent clients")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help="comma-separated subset of " + ", ".join(SCENARIOS))
+    parser.add_argument("--warmup", type=int, default=4, help="untimed requests per scenario")
+    parser.add_argument("--corpus", type=int, default=12, help="distinct synthetic resumes")
+    parser.add_argument("--llm-latency", type=float, default=0.4, help="replayed LLM base latency (s)")
+    parser.add_argument("--token-latency", type=float, default=0.01, help="replayed LLM latency per completion token (s)")
+    parser.add_argument("--pipeline-workers", type=int, default=int(os.getenv("PIPELINE_WORKERS", "2")), help="server pipeline threads")
+    parser.add_argument("--pipeline-mode", help="server PIPELINE_MODE")
+    parser.add_argument("--cache", action="store_true", help="keep the stage cache enabled")
+    parser.add_argument("--replay-dir", default=REPLAY_DIR, help="recordings served by the replay backend")
+    parser.add_argument("--server-log", help="write the server's output to this file")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to compare against")
+    parser.add_argument("--fail-over", type=float, default=10.0, help="exit non-zero on regressions larger than this percentage")
+    args = parser.parse_args()
+
+    scenarios = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    uploads = upload_corpus(args.corpus)
+    server = None
+    sampler = None
+    url = args.url
+    if url is None:
+        port = _free_port()
+        url = f"http://127.0.0.1:{port}"
+        server = start_server(port, args)
+    try:
+        wait_ready(url)
+        if server is not None:
+            sampler = RssSampler(server.pid)
+            sampler.start()
+        results = {}
+        for scenario in scenarios:
+            print(f"Running {scenario}: {args.requests} requests, {args.concurrency} concurrent...", file=sys.stderr)
+            results[scenario] = run_scenario(url, scenario, uploads, args.requests, args.concurrency, args.warmup)
+        health = requests.get(f"{url}/health", timeout=10).json()
+    finally:
+        rss = sampler.stop() if sampler is not None else {}
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare", "url", "server_log")},
+        },
+        "scenarios": results,
+        "rss": rss,
+        "server": {"documents": health.get("documents"), "prompts": health.get("prompts"), "llm": health.get("llm")},
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.fail_over)
+        if regressions:
+            sys.exit(f"{len(regressions)} metric(s) regressed by more than {args.fail_over}%: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
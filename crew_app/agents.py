@@ -1,9 +1,23 @@
 from crewai import Agent
-import os
+from functools import lru_cache
+import threading
+from .llm_backends import get_backend
+from .llm_scheduler import scheduled
 
-# OpenAI API key should be set as environment variable
+# The LLM comes from the backend selected by LLM_BACKEND (see llm_backends.py);
+# OPENAI_MODEL picks the model
 
-MODEL = "gpt-4o-mini"
+
+@lru_cache(maxsize=None)
+def shared_llm(temperature: float):
+    """One LLM per temperature for the whole process.
+
+    Each LLM owns its client and HTTP connection pool, so sharing the
+    instance lets every request reuse warm keep-alive connections to the
+    model endpoint instead of opening new ones. Calls go through the LLM
+    scheduler (llm_scheduler.py) for rate limits, retries and hedging.
+    """
+    return scheduled(get_backend().create_llm(temperature))
 
 # Agent 1: Parses resume text and cleans it for LLM consumption
 def build_parser_agent():
@@ -14,8 +28,7 @@ def build_parser_agent():
             "You efficiently clean resume text by removing artifacts and normalizing formatting. "
             "Focus on speed and accuracy - preserve all important content while removing noise."
         ),
-        model=MODEL,
-        temperature=0.0,
+        llm=shared_llm(0.0),
         max_iter=1,
         max_execution_time=60
     )
@@ -30,8 +43,7 @@ def build_ats_writer_agent():
             "You strategically place keywords, use strong action verbs, and quantify all achievements. "
             "You work quickly and deliver results that pass ATS systems."
         ),
-        model=MODEL,
-        temperature=0.3,
+        llm=shared_llm(0.3),
         max_iter=1,
         max_execution_time=60
     )
@@ -45,8 +57,7 @@ def build_evaluator_agent():
             "You are a precise ATS scoring expert who quickly identifies gaps and provides specific, "
             "actionable recommendations. You focus on keyword density, section structure, and measurable achievements."
         ),
-        model=MODEL,
-        temperature=0.0,
+        llm=shared_llm(0.0),
         max_iter=1,
         max_execution_time=60
     )
@@ -57,8 +68,7 @@ def build_refiner_agent():
         role="Bullet Point Refiner",
         goal="Transform bullet points into high-impact, ATS-optimized statements with strong metrics.",
         backstory="You excel at creating powerful bullet points that combine action verbs, specific achievements, and quantified results. You work efficiently to maximize impact.",
-        model=MODEL,
-        temperature=0.2,
+        llm=shared_llm(0.2),
         max_iter=1,
         max_execution_time=60
     )
@@ -73,8 +83,7 @@ def build_keyword_agent():
             "You understand industry terminology, technical skills, and soft skills that make resumes stand out. "
             "You work quickly to ensure optimal keyword density without keyword stuffing."
         ),
-        model=MODEL,
-        temperature=0.1,
+        llm=shared_llm(0.1),
         max_iter=1,
         max_execution_time=60
     )
@@ -89,8 +98,7 @@ def build_skills_agent():
             "in ways that appeal to both ATS systems and human recruiters. You understand skill categorization, "
             "proficiency levels, and industry-standard skill descriptions."
         ),
-        model=MODEL,
-        temperature=0.1,
+        llm=shared_llm(0.1),
         max_iter=1,
         max_execution_time=60
     )
@@ -105,8 +113,7 @@ def build_industry_agent():
             "of different sectors. You know how to adapt resume language, emphasize relevant achievements, "
             "and structure content according to industry best practices."
         ),
-        model=MODEL,
-        temperature=0.2,
+        llm=shared_llm(0.2),
         max_iter=1,
         max_execution_time=60
     )
@@ -121,8 +128,7 @@ def build_formatting_agent():
             "You know how to structure content for maximum readability and ATS compatibility while maintaining "
             "professional appearance and visual hierarchy."
         ),
-        model=MODEL,
-        temperature=0.0,
+        llm=shared_llm(0.0),
         max_iter=1,
         max_execution_time=60
     )
@@ -137,8 +143,34 @@ def build_qa_agent():
             "professional standards, and ATS optimization. You catch errors, ensure proper formatting, "
             "and verify that all content meets industry standards."
         ),
-        model=MODEL,
-        temperature=0.0,
+        llm=shared_llm(0.0),
         max_iter=1,
         max_execution_time=60
     )
+
+
+AGENT_BUILDERS = {
+    "parser": build_parser_agent,
+    "writer": build_ats_writer_agent,
+    "evaluator": build_evaluator_agent,
+    "refiner": build_refiner_agent,
+    "keyword": build_keyword_agent,
+    "skills": build_skills_agent,
+    "industry": build_industry_agent,
+    "formatting": build_formatting_agent,
+    "qa": build_qa_agent,
+}
+
+# crewai agents keep per-execution state (executor, tools handler), so each worker thread gets its own set
+_registry = threading.local()
+
+
+def get_agent(name: str):
+    """Return this thread's instance of the named agent, building it on first use."""
+    agents = getattr(_registry, "agents", None)
+    if agents is None:
+        agents = _registry.agents = {}
+    agent = agents.get(name)
+    if agent is None:
+        agent = agents[name] = AGENT_BUILDERS[name]()
+    return agent
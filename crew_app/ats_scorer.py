@@ -0,0 +1,226 @@
+"""Deterministic, dependency-free ATS scoring.
+
+Produces the same JSON shape as the LLM evaluator (`overall_score`, `breakdown`,
+`missing_keywords`, `quick_wins`, `summary`) in a few milliseconds.
+"""
+import functools
+import math
+import os
+import re
+from collections import Counter
+
+# Section headings recognised in resumes (shared with the PDF renderer)
+SECTION_HEADINGS = [
+    'EXPERIENCE', 'EDUCATION', 'SKILLS', 'PROJECTS', 'SUMMARY', 'OBJECTIVE',
+    'ACHIEVEMENTS', 'CERTIFICATIONS', 'LANGUAGES'
+]
+CORE_SECTIONS = ['SUMMARY', 'EXPERIENCE', 'EDUCATION', 'SKILLS']
+
+BULLET_CHARS = ('•', '-', '*', '◦', '·')
+
+STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being
+below between both but by can could did do does doing down during each etc few for from further had
+has have having he her here hers him his how i if in into is it its itself just me more most my no
+nor not now of off on once only or other our ours out over own same she should so some such than
+that the their theirs them then there these they this those through to too under until up very was
+we were what when where which while who whom why will with would you your yours within across via
+per using use used including include includes like well new able must may might shall
+""".split())
+
+# Words every job ad uses; they say little about the role so they carry less weight
+GENERIC_TERMS = frozenset("""
+experience experienced years year work working team teams ability strong skills skill knowledge
+role candidate candidates job position company responsibilities requirements required preferred
+plus looking join help ensure good great excellent opportunity environment related relevant
+understanding familiarity proficiency proficient solid proven track record demonstrated etc
+""".split())
+
+ACTION_VERBS = frozenset("""
+accelerated achieved administered analyzed architected automated boosted built championed coached
+collaborated configured consolidated coordinated created cut decreased defined delivered deployed
+designed developed directed drove eliminated enabled engineered enhanced established evaluated
+executed expanded facilitated generated grew guided identified implemented improved increased
+initiated integrated introduced launched led maintained managed mentored migrated modernized
+monitored negotiated optimized orchestrated organized overhauled owned pioneered planned produced
+programmed reduced redesigned refactored resolved restructured revamped saved scaled secured
+shipped simplified spearheaded standardized streamlined strengthened supervised supported tested
+trained transformed tuned upgraded
+""".split())
+
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#./-]*[a-z0-9+#]|[a-z0-9]")
+NUMBER_RE = re.compile(r"\d|%|\$")
+
+# BM25 term-frequency saturation parameters; resumes are ~400 tokens on average
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_RESUME_TOKENS = 400
+
+MAX_MISSING_KEYWORDS = 10
+
+# Job postings whose keyword profile is kept in memory; the same posting is scored many times
+# (baseline and final evaluation, batch runs, repeat submissions)
+JD_CACHE_SIZE = int(os.getenv("JD_CACHE_SIZE", "256"))
+
+
+def tokenize(text: str) -> list:
+    """Lowercase word tokens that keep tech spellings such as c++, c#, node.js and ci/cd intact."""
+    return TOKEN_RE.findall(text.lower())
+
+
+def _is_keyword(token: str) -> bool:
+    return token not in STOPWORDS and any(ch.isalpha() for ch in token)
+
+
+def extract_terms(tokens: list) -> list:
+    """Unigrams and bigrams without stopwords or bare numbers at either end."""
+    terms = [t for t in tokens if _is_keyword(t)]
+    for first, second in zip(tokens, tokens[1:]):
+        if _is_keyword(first) and _is_keyword(second):
+            terms.append(f"{first} {second}")
+    return terms
+
+
+def _term_weight(term: str, tf: int) -> float:
+    """Sublinear term frequency times an IDF prior that damps generic job-ad vocabulary."""
+    words = term.split()
+    idf = 0.25 if all(w in GENERIC_TERMS for w in words) else 1.0
+    if len(words) == 2:
+        idf *= 1.5
+    return (1.0 + math.log(tf)) * idf
+
+
+@functools.lru_cache(maxsize=JD_CACHE_SIZE)
+def extract_keywords(job_title: str, job_description: str) -> dict:
+    """Weighted keyword profile of a job posting: {term: weight}.
+
+    Cached per (title, description), so the returned dict is shared and must not be modified.
+    """
+    counts = Counter(extract_terms(tokenize(job_description)))
+    # Repeated bigrams are phrases ("machine learning"); one-off bigrams are mostly noise
+    counts = Counter({t: c for t, c in counts.items() if " " not in t or c > 1})
+    for term in extract_terms(tokenize(job_title)):
+        counts[term] += 2
+    return {term: _term_weight(term, tf) for term, tf in counts.items()}
+
+
+def _keyword_coverage(keywords: dict, resume_tokens: list):
+    """BM25-saturated share of keyword weight found in the resume, plus the missing keywords."""
+    resume_counts = Counter(extract_terms(resume_tokens))
+    length_norm = 1 - BM25_B + BM25_B * len(resume_tokens) / AVG_RESUME_TOKENS
+    achieved = 0.0
+    total = 0.0
+    missing = []
+    for term, weight in keywords.items():
+        total += weight
+        tf = resume_counts.get(term, 0)
+        if tf:
+            # BM25 tf saturation, capped at full credit so keyword stuffing does not pay off
+            achieved += weight * min(1.0, tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm))
+        else:
+            missing.append((weight, term))
+    coverage = achieved / total if total else 1.0
+
+    missing.sort(key=lambda item: (-item[0], item[1]))
+    missing_terms = []
+    for _, term in missing:
+        # Skip a word already reported as part of a missing phrase
+        if any(term in reported.split() for reported in missing_terms):
+            continue
+        missing_terms.append(term)
+        if len(missing_terms) >= MAX_MISSING_KEYWORDS:
+            break
+    return coverage, missing_terms
+
+
+def is_heading(line: str) -> bool:
+    return len(line.split()) <= 5 and any(section in line.upper() for section in SECTION_HEADINGS)
+
+
+def detect_sections(lines: list) -> list:
+    """Section headings present in the resume, in canonical form."""
+    found = []
+    for line in lines:
+        if not is_heading(line):
+            continue
+        upper = line.upper()
+        for section in SECTION_HEADINGS:
+            if section in upper and section not in found:
+                found.append(section)
+    return found
+
+
+def _bullets(lines: list) -> list:
+    return [re.sub(r'^[•\-*◦·]\s*', '', line) for line in lines if line.startswith(BULLET_CHARS)]
+
+
+def _starts_with_action_verb(bullet: str) -> bool:
+    tokens = tokenize(bullet)
+    return bool(tokens) and tokens[0] in ACTION_VERBS
+
+
+def _band(ratio: float) -> int:
+    """Map a 0..1 ratio to the evaluator's 1-5 scale."""
+    return max(1, min(5, 1 + int(round(ratio * 4))))
+
+
+def score_resume(resume_text: str, job_title: str, job_description: str) -> dict:
+    """Score a resume against a job posting without calling an LLM."""
+    lines = [line.strip() for line in resume_text.splitlines() if line.strip()]
+    resume_tokens = tokenize(resume_text)
+
+    keywords = extract_keywords(job_title, job_description)
+    coverage, missing_keywords = _keyword_coverage(keywords, resume_tokens)
+
+    sections = detect_sections(lines)
+    section_ratio = sum(1 for s in CORE_SECTIONS if s in sections) / len(CORE_SECTIONS)
+
+    bullets = _bullets(lines)
+    quantified_ratio = sum(1 for b in bullets if NUMBER_RE.search(b)) / len(bullets) if bullets else 0.0
+    verb_ratio = sum(1 for b in bullets if _starts_with_action_verb(b)) / len(bullets) if bullets else 0.0
+
+    # Plain single-column text parses best: penalise tabs, table pipes and over-long lines
+    noisy = sum(1 for line in lines if "\t" in line or line.count("|") > 2 or len(line) > 200)
+    format_ratio = 1.0 - noisy / len(lines) if lines else 0.0
+
+    overall = (
+        0.40 * coverage
+        + 0.20 * section_ratio
+        + 0.20 * quantified_ratio
+        + 0.10 * verb_ratio
+        + 0.10 * format_ratio
+    )
+
+    quick_wins = []
+    if missing_keywords:
+        quick_wins.append(f"Work these job keywords into your experience or skills: {', '.join(missing_keywords[:5])}")
+    missing_sections = [s.title() for s in CORE_SECTIONS if s not in sections]
+    if missing_sections:
+        quick_wins.append(f"Add clearly labelled sections: {', '.join(missing_sections)}")
+    if bullets and quantified_ratio < 0.5:
+        quick_wins.append("Quantify more bullets with numbers, percentages or dollar amounts")
+    if bullets and verb_ratio < 0.6:
+        quick_wins.append("Start each bullet with a strong action verb (e.g. Led, Built, Reduced)")
+    if not bullets:
+        quick_wins.append("Present achievements as bullet points so ATS parsers pick them up")
+    if format_ratio < 0.9:
+        quick_wins.append("Remove tables, tabs and very long lines to keep the layout ATS-friendly")
+
+    overall_score = int(round(overall * 100))
+    return {
+        "overall_score": overall_score,
+        "breakdown": {
+            "keywords": _band(coverage),
+            "structure": _band(section_ratio),
+            "metrics": _band(quantified_ratio),
+            "verbs": _band(verb_ratio),
+            "format": _band(format_ratio),
+        },
+        "missing_keywords": missing_keywords,
+        "quick_wins": quick_wins,
+        "summary": (
+            f"Keyword coverage {coverage:.0%}, {len(sections)} sections detected, "
+            f"{quantified_ratio:.0%} of bullets quantified, {verb_ratio:.0%} start with an action verb."
+        ),
+        "evaluator": "local",
+    }
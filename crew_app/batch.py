@@ -0,0 +1,137 @@
+"""Score or optimize a set of resumes against a set of job descriptions."""
+import contextvars
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from .crew import clean_resume, optimize_resume, evaluate_resume, parse_evaluation, PipelineCancelled
+from .llm_scheduler import llm_priority
+
+# Pipelines in flight across all batches: every batch's pairs share one pool
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+_pair_executor = ThreadPoolExecutor(max_workers=BATCH_CONCURRENCY, thread_name_prefix="batch")
+
+
+def _overall_score(evaluation):
+    if isinstance(evaluation, dict):
+        try:
+            return float(evaluation.get("overall_score"))
+        except (TypeError, ValueError):
+            return None
+    return None
+
+
+def _rank(scores: dict, keys: list) -> list:
+    """Order `keys` by score, best first; unscored entries go last."""
+    return sorted(keys, key=lambda k: (scores.get(k) is None, -(scores.get(k) or 0)))
+
+
+def run_batch(resumes: list, jobs: list, optimize: bool = True, evaluator: str = None, mode: str = None, cancel_event=None, executor=None):
+    """Yield progress events for a resume x job matrix, ending with a ranked summary.
+
+    `resumes` is a list of (name, raw_text) and `jobs` a list of
+    {"job_title", "job_description"} dicts. Each resume is cleaned once; the
+    per-pair work (stages 2-4, or just scoring when `optimize` is false) fans
+    out over `executor`, by default the pool shared by every batch. Setting
+    `cancel_event` stops the batch: pairs not yet started are dropped and
+    running ones stop at their next stage boundary.
+    """
+    executor = executor or _pair_executor
+    started = time.perf_counter()
+    cleaned = {}
+    scores = {}
+    submitted = []
+
+    def submit(fn, *args):
+        future = executor.submit(contextvars.copy_context().run, fn, *args)
+        submitted.append(future)
+        return future
+
+    def cancelled():
+        return cancel_event is not None and cancel_event.is_set()
+
+    try:
+        # Stage 1 once per resume, whatever the number of job descriptions
+        def clean(raw_text):
+            if cancelled():
+                raise PipelineCancelled("Batch cancelled")
+            with llm_priority("batch"):
+                return clean_resume(raw_text)
+
+        futures = {submit(clean, raw_text): r for r, (_, raw_text) in enumerate(resumes)}
+        for future in as_completed(futures):
+            if cancelled():
+                break
+            r = futures[future]
+            try:
+                cleaned[r] = future.result()
+                yield {"type": "cleaned", "resume": r, "name": resumes[r][0], "elapsed": round(time.perf_counter() - started, 3)}
+            except Exception as e:
+                yield {"type": "error", "resume": r, "name": resumes[r][0], "error": str(e)}
+
+        def run_pair(r, j):
+            if cancelled():
+                raise PipelineCancelled("Batch cancelled")
+            job = jobs[j]
+            # Interactive requests are served first when the LLM is at its rate limit
+            with llm_priority("batch"):
+                if optimize:
+                    _, final_resume, evaluation = optimize_resume(
+                        cleaned[r], job["job_title"], job["job_description"],
+                        cancel_event=cancel_event, evaluator=evaluator, mode=mode
+                    )
+                else:
+                    final_resume = None
+                    evaluation = evaluate_resume(cleaned[r], job["job_title"], job["job_description"], evaluator, cancel_event=cancel_event)
+            return final_resume, parse_evaluation(evaluation)
+
+        futures = {} if cancelled() else {
+            submit(run_pair, r, j): (r, j)
+            for r in sorted(cleaned) for j in range(len(jobs))
+        }
+        for future in as_completed(futures):
+            r, j = futures[future]
+            if cancelled():
+                break
+            try:
+                final_resume, evaluation = future.result()
+            except Exception as e:
+                yield {"type": "error", "resume": r, "job": j, "error": str(e)}
+                continue
+            scores[(r, j)] = _overall_score(evaluation)
+            event = {
+                "type": "result",
+                "resume": r,
+                "job": j,
+                "score": scores[(r, j)],
+                "evaluation": evaluation,
+                "elapsed": round(time.perf_counter() - started, 3),
+            }
+            if final_resume is not None:
+                event["final"] = final_resume
+            yield event
+    finally:
+        # The pool is shared, so only this batch's queued work is dropped
+        for future in submitted:
+            future.cancel()
+
+    resume_ids = sorted(cleaned)
+    job_ids = list(range(len(jobs)))
+    yield {
+        "type": "summary",
+        "resumes": [name for name, _ in resumes],
+        "jobs": [job["job_title"] for job in jobs],
+        "matrix": [[scores.get((r, j)) for j in job_ids] for r in range(len(resumes))],
+        # For each job, resume indices best first (recruiter view)
+        "ranked_resumes": {j: _rank({r: scores.get((r, j)) for r in resume_ids}, resume_ids) for j in job_ids},
+        # For each resume, job indices best first (candidate view)
+        "ranked_jobs": {r: _rank({j: scores.get((r, j)) for j in job_ids}, job_ids) for r in resume_ids},
+        "elapsed": round(time.perf_counter() - started, 3),
+    }
+
+
+def run_batch_job(resumes: list, jobs: list, optimize: bool = True, evaluator: str = None, mode: str = None, cancel_event=None, on_stage=None):
+    """JobManager runner for a whole batch: each batch event is reported through `on_stage`."""
+    for event in run_batch(resumes, jobs, optimize=optimize, evaluator=evaluator, mode=mode, cancel_event=cancel_event):
+        if on_stage is not None:
+            on_stage(event)
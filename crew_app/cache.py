@@ -0,0 +1,271 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .shared_state import SHARED, shared_state
+
+
+def agent_signature(agent) -> dict:
+    """The parts of an agent's configuration that change what the LLM returns."""
+    llm = getattr(agent, "llm", None)
+    model = getattr(llm, "model", None) or (llm if isinstance(llm, str) else None)
+    return {
+        "role": getattr(agent, "role", ""),
+        "goal": getattr(agent, "goal", ""),
+        "backstory": getattr(agent, "backstory", ""),
+        "model": model,
+        "temperature": getattr(llm, "temperature", None),
+    }
+
+
+def stage_key(stage: str, agent, prompt: str) -> str:
+    """Content address for a stage result: hash of stage name, agent config and prompt."""
+    payload = json.dumps(
+        {"stage": stage, "agent": agent_signature(agent), "prompt": prompt},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class StageCache:
+    """Two-tier cache for stage outputs: an in-memory LRU in front of an optional SQLite file.
+
+    Entries expire after `ttl_seconds`; each tier evicts least-recently-used
+    entries once it holds more than its size limit. With a `shared` store
+    (shared_state, when several workers run) entries are also kept there
+    under `namespace`, so one worker's results serve the others.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 86400, db_path: str = None, max_db_entries: int = 10000,
+                 shared=None, namespace: str = "stage"):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.db_path = db_path
+        self.max_db_entries = max_db_entries
+        self.shared = shared
+        self.namespace = namespace
+        self.hits = 0
+        self.disk_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS stage_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_entries=int(os.getenv("STAGE_CACHE_SIZE", "256")),
+            ttl_seconds=int(os.getenv("STAGE_CACHE_TTL", "86400")),
+            db_path=os.getenv("STAGE_CACHE_DB") or None,
+            max_db_entries=int(os.getenv("STAGE_CACHE_DB_SIZE", "10000")),
+            shared=shared_state if SHARED and os.getenv("STAGE_CACHE_SHARED", "true").lower() == "true" else None,
+        )
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, created_at = entry
+                if now - created_at < self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._memory[key]
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT value, created_at FROM stage_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, created_at = row
+                    if now - created_at < self.ttl_seconds:
+                        self._db.execute("UPDATE stage_cache SET accessed_at = ? WHERE key = ?", (now, key))
+                        self._db.commit()
+                        self._remember(key, value, created_at)
+                        self.disk_hits += 1
+                        return value
+                    self._db.execute("DELETE FROM stage_cache WHERE key = ?", (key,))
+                    self._db.commit()
+
+        if self.shared is not None:
+            # Outside the lock: the store may be another process or a server
+            value = self.shared.get(f"{self.namespace}:{key}")
+            if value is not None:
+                value = value.decode("utf-8")
+                with self._lock:
+                    # The store expires entries itself, so the age here is only approximate
+                    self._remember(key, value, now)
+                    self.shared_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def set(self, key: str, value: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, value, now)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO stage_cache (key, value, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                    (key, value, now, now),
+                )
+                self._evict_disk(now)
+                self._db.commit()
+        if self.shared is not None:
+            self.shared.set(f"{self.namespace}:{key}", value, ex=self.ttl_seconds)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM stage_cache")
+                self._db.commit()
+
+    def stats(self) -> dict:
+        with self._lock:
+            found = self.hits + self.disk_hits + self.shared_hits
+            lookups = found + self.misses
+            return {
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round(found / lookups, 3) if lookups else 0.0,
+                "entries": len(self._memory),
+                "disk_enabled": self._db is not None,
+                "shared": self.shared is not None,
+            }
+
+    def _remember(self, key, value, created_at):
+        # Caller holds the lock
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (value, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now):
+        # Caller holds the lock
+        self._db.execute("DELETE FROM stage_cache WHERE created_at < ?", (now - self.ttl_seconds,))
+        (count,) = self._db.execute("SELECT COUNT(*) FROM stage_cache").fetchone()
+        overflow = count - self.max_db_entries
+        if overflow > 0:
+            self._db.execute(
+                "DELETE FROM stage_cache WHERE key IN "
+                "(SELECT key FROM stage_cache ORDER BY accessed_at ASC LIMIT ?)",
+                (overflow,),
+            )
+
+
+def render_key(fmt: str, content: str) -> str:
+    """Content address for a rendered document: hash of the output format and the text."""
+    return hashlib.sha256(f"{fmt}\0{content}".encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """In-memory LRU of rendered documents (PDF/DOCX bytes), bounded by entry count and total bytes.
+
+    The UI downloads the same final resume once per format click, so repeats
+    are served without going back to the document pool. With a `shared` store
+    renders are also kept there for `shared_ttl` seconds, as the next click
+    may reach another worker.
+    """
+
+    def __init__(self, max_entries: int = 128, max_bytes: int = 32 * 1024 * 1024, shared=None, shared_ttl: int = 3600):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared = shared
+        self.shared_ttl = shared_ttl
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            max_entries=int(os.getenv("RENDER_CACHE_SIZE", "128")),
+            max_bytes=int(os.getenv("RENDER_CACHE_BYTES", str(32 * 1024 * 1024))),
+            shared=shared_state if SHARED else None,
+            shared_ttl=int(os.getenv("RENDER_CACHE_TTL", "3600")),
+        )
+
+    def get(self, key: str):
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return value
+        value = self.shared.get(f"render:{key}") if self.shared is not None else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.shared_hits += 1
+        self._remember(key, value)
+        return value
+
+    def set(self, key: str, value: bytes):
+        if self.max_entries <= 0 or len(value) > self.max_bytes:
+            return
+        self._remember(key, value)
+        if self.shared is not None:
+            self.shared.set(f"render:{key}", value, ex=self.shared_ttl)
+
+    def _remember(self, key: str, value: bytes):
+        if self.max_entries <= 0 or len(value) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous)
+            self._memory[key] = value
+            self._bytes += len(value)
+            while len(self._memory) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._memory.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.shared_hits + self.misses
+            return {
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0,
+                "entries": len(self._memory),
+                "bytes": self._bytes,
+            }
+
+
+# Process-wide cache shared by every pipeline run
+stage_cache = StageCache.from_env()
+
+# Rendered downloads, shared by every request to the API process
+render_cache = RenderCache.from_env()
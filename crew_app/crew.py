@@ -1,25 +1,59 @@
+import asyncio
+import contextvars
+import functools
 import os
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from crewai import Crew, Process
-from .agents import (
-    build_parser_agent, build_ats_writer_agent,
-    build_evaluator_agent, build_refiner_agent,
-    build_keyword_agent, build_skills_agent,
-    build_industry_agent, build_formatting_agent,
-    build_qa_agent
-)
+from .agents import get_agent
 from .tasks import (
     parse_resume_task, rewrite_for_ats_task,
-    evaluate_ats_task, refine_bullets_task,
+    evaluate_ats_task, repair_evaluation_task, refine_bullets_task,
     optimize_keywords_task, enhance_skills_task,
     industry_optimize_task, format_structure_task,
-    quality_assurance_task
+    quality_assurance_task,
+    rewrite_and_refine_task, split_fused_output,
+    rewrite_section_task, refine_section_task
 )
+from .cache import stage_cache, stage_key
+from .prompt_budget import count_tokens, prompt_stats
+from .telemetry import telemetry, span, record_span, llm_usage
+from .ats_scorer import score_resume
+from .evaluation import validate_evaluation, unparsed_evaluation
+from .sections import split_sections, merge_sections, clean_section_output
+from .file_tools.normalizer import normalize_resume
+
+# "local" scores with the deterministic ats_scorer; "llm" spends a round-trip on the evaluator agent
+EVALUATOR_MODES = ("local", "llm")
+DEFAULT_EVALUATOR = os.getenv("ATS_EVALUATOR", "local")
+
+# "rules" cleans the extracted text with the deterministic normalizer only; "llm" also sends the
+# normalized (and so shorter) text through the parser agent
+PARSE_MODES = ("rules", "llm")
+DEFAULT_PARSE_MODE = os.getenv("PARSE_STAGE", "rules")
+
+# Score the cleaned resume while stages 2-3 run, so the evaluation carries a before/after delta
+BASELINE_EVALUATION = os.getenv("BASELINE_EVALUATION", "true").lower() == "true"
+# Seconds the final evaluation waits for a baseline still running; then baseline_score is null
+BASELINE_TIMEOUT = float(os.getenv("BASELINE_TIMEOUT", "30"))
+
+# "standard" runs rewrite and refine as two LLM calls; "fused" does both in one structured call;
+# "sections" rewrites and refines each resume section concurrently
+PIPELINE_MODES = ("standard", "fused", "sections")
+DEFAULT_PIPELINE_MODE = os.getenv("PIPELINE_MODE", "standard")
+
+# Section calls in flight at once per resume in "sections" mode
+SECTION_CONCURRENCY = int(os.getenv("SECTION_CONCURRENCY", "4"))
+# Long-lived threads shared by all resumes, so their per-thread agents are reused across requests
+_section_executor = ThreadPoolExecutor(max_workers=int(os.getenv("SECTION_WORKERS", "8")), thread_name_prefix="section")
 
 def build_crew(raw_resume_text: str, job_title: str, job_description: str):
-    parser = build_parser_agent()
-    writer = build_ats_writer_agent()
-    refiner = build_refiner_agent()
-    evaluator = build_evaluator_agent()
+    parser = get_agent("parser")
+    writer = get_agent("writer")
+    refiner = get_agent("refiner")
+    evaluator = get_agent("evaluator")
 
     t_parse = parse_resume_task(parser, raw_resume_text)
     # these are placeholders; we'll stitch later after parse result is known
@@ -29,51 +63,320 @@ def build_crew(raw_resume_text: str, job_title: str, job_description: str):
 
     crew = Crew(
         agents=[parser, writer, refiner, evaluator],
-        tasks=[t_parse, t_rewrite, t_refine, t_eval],
+        tasks=[*t_parse, *t_rewrite, *t_refine, t_eval],
         process=Process.sequential,
         verbose=True
     )
     return crew
 
-def run_pipeline(raw_resume_text: str, job_title: str, job_description: str):
-    # Build only essential agents for faster processing
-    parser = build_parser_agent()
-    writer = build_ats_writer_agent()
-    refiner = build_refiner_agent()
-    evaluator = build_evaluator_agent()
+class PipelineCancelled(Exception):
+    """Raised between stages when the caller has asked the pipeline to stop."""
 
-    # Stage 1: Parse and clean
-    print("Stage 1/4: Parsing and cleaning resume...")
-    t_parse = parse_resume_task(parser, raw_resume_text)
-    parse_crew = Crew(agents=[parser], tasks=[t_parse], process=Process.sequential, verbose=False)
-    parse_result = parse_crew.kickoff()
-    cleaned = str(parse_result).strip()
-
-    # Stage 2: ATS optimization (includes keyword optimization)
-    print("Stage 2/4: ATS optimization...")
-    t_rewrite = rewrite_for_ats_task(writer, cleaned, job_title, job_description)
-    rewrite_crew = Crew(agents=[writer], tasks=[t_rewrite], process=Process.sequential, verbose=False)
-    rewrite_result = rewrite_crew.kickoff()
-    rewritten = str(rewrite_result).strip()
-
-    # Stage 3: Bullet refinement
-    print("Stage 3/4: Bullet point refinement...")
-    t_refine = refine_bullets_task(refiner, rewritten)
-    refine_crew = Crew(agents=[refiner], tasks=[t_refine], process=Process.sequential, verbose=False)
-    refine_result = refine_crew.kickoff()
-    final_resume = str(refine_result).strip()
-
-    # Stage 4: Final evaluation with better error handling
-    print("Stage 4/4: Final ATS evaluation...")
+
+def _check_cancelled(cancel_event):
+    if cancel_event is not None and cancel_event.is_set():
+        raise PipelineCancelled("Pipeline cancelled")
+
+
+def _run_stage(stage: str, agent, task) -> str:
+    """Run one single-task crew, serving repeated (stage, agent, prompt) combinations from the cache."""
+    prompt = f"{task.description}\n{task.expected_output}"
+    key = stage_key(stage, agent, prompt)
+    cached = stage_cache.get(key)
+    if cached is not None:
+        print(f"{stage}: served from cache")
+        telemetry.count("ats_stage_cache_hits_total", stage=stage)
+        return cached
+    model = getattr(agent.llm, "model", "unknown")
+    with span("llm.call", stage=stage, model=model) as attributes:
+        crew = Crew(agents=[agent], tasks=[task], process=Process.sequential, verbose=False)
+        # The crew's token_usage is the shared LLM's running total, so meter this call's own tokens
+        with llm_usage() as usage:
+            result = crew.kickoff()
+        output = str(result).strip()
+        # Provider-reported usage when the backend meters it, otherwise the tokenizer estimate
+        prompt_tokens = usage["prompt_tokens"] or count_tokens(f"{agent.role}\n{agent.goal}\n{agent.backstory}\n{prompt}")
+        completion_tokens = usage["completion_tokens"] or count_tokens(output)
+        cost = telemetry.record_llm_call(stage, model, prompt_tokens, completion_tokens)
+        attributes.update(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, cost_usd=round(cost, 6))
+    prompt_stats.record_call(stage, prompt_tokens, completion_tokens)
+    stage_cache.set(key, output)
+    return output
+
+
+def _run_chunks(stage: str, agent, tasks: list, cancel_event=None) -> list:
+    """Run a stage's per-chunk tasks in order and return their outputs."""
+    outputs = []
+    for task in tasks:
+        _check_cancelled(cancel_event)
+        outputs.append(_run_stage(stage, agent, task))
+    return outputs
+
+
+def _emit_stage(on_stage, stage: str, index: int, field: str, output: str, stage_started: float, pipeline_started: float):
+    """Record a finished stage's span and report it, with its timing, to the optional progress callback."""
+    now = time.perf_counter()
+    record_span("pipeline.stage", now - stage_started, {"stage": stage})
+    if on_stage is None:
+        return
+    on_stage({
+        "stage": stage,
+        "index": index,
+        "total": 4,
+        "field": field,
+        "output": output,
+        "duration": round(now - stage_started, 3),
+        "elapsed": round(now - pipeline_started, 3),
+    })
+
+
+def evaluate_resume(final_resume: str, job_title: str, job_description: str, evaluator: str = None, cancel_event=None) -> str:
+    """Stage 4: score the final resume and return the evaluation as a JSON string.
+
+    LLM output that does not validate gets one cheap reformatting call before
+    falling back to the local scorer, so the stage always yields valid JSON.
+    """
+    evaluator = evaluator or DEFAULT_EVALUATOR
+    if evaluator not in EVALUATOR_MODES:
+        raise ValueError(f"Unknown evaluator '{evaluator}', expected one of {', '.join(EVALUATOR_MODES)}")
+    if evaluator == "llm":
+        try:
+            _check_cancelled(cancel_event)
+            evaluator_agent = get_agent("evaluator")
+            t_eval = evaluate_ats_task(evaluator_agent, final_resume, job_title, job_description)
+            output = _run_stage("evaluate", evaluator_agent, t_eval)
+            parsed = parse_evaluation(output, strict=True)
+            if parsed is None:
+                _check_cancelled(cancel_event)
+                print("Evaluation was not valid JSON, retrying the formatting only")
+                telemetry.count("ats_evaluation_retries_total")
+                output = _run_stage("evaluate_repair", evaluator_agent, repair_evaluation_task(evaluator_agent, output))
+                parsed = parse_evaluation(output, strict=True)
+            if parsed is not None:
+                return json.dumps(parsed)
+            print("Evaluation still not valid JSON, falling back to the local scorer")
+        except PipelineCancelled:
+            raise
+        except Exception as e:
+            print(f"Evaluation error: {str(e)}, falling back to the local scorer")
+    return json.dumps(score_resume(final_resume, job_title, job_description))
+
+
+def parse_evaluation(evaluation, strict: bool = False):
+    """Evaluator output as a validated evaluation dict.
+
+    Unparseable text comes back in the same shape with the text in `summary`
+    (None with `strict`), so clients only ever handle one shape.
+    """
+    with span("evaluation.parse") as attributes:
+        parsed = validate_evaluation(evaluation)
+        if parsed is None:
+            attributes["fallback"] = True
+            return None if strict else unparsed_evaluation(evaluation)
+        return parsed
+
+
+def _start_baseline(cleaned: str, job_title: str, job_description: str, evaluator: str = None):
+    """Submit the evaluation of the not yet optimized resume.
+
+    Returns (future, stop event), or None when disabled; setting the event
+    skips LLM calls the baseline has not made yet.
+    """
+    if not BASELINE_EVALUATION:
+        return None
+    stop = threading.Event()
+
+    def run():
+        with span("evaluation.baseline"):
+            return evaluate_resume(cleaned, job_title, job_description, evaluator, cancel_event=stop)
+
+    return _section_executor.submit(contextvars.copy_context().run, run), stop
+
+
+def _stop_baseline(baseline):
+    """Abandon a baseline evaluation whose result is no longer wanted."""
+    if baseline is not None:
+        future, stop = baseline
+        stop.set()
+        future.cancel()
+
+
+def _with_baseline(evaluation: str, baseline, timeout: float = BASELINE_TIMEOUT) -> str:
+    """Add `baseline_score` and `score_delta` from the baseline evaluation to the final one.
+
+    Both are null when the baseline failed or is still running after `timeout` seconds.
+    """
+    if baseline is None:
+        return evaluation
+    result = json.loads(evaluation)
     try:
-        t_eval = evaluate_ats_task(evaluator, final_resume, job_title, job_description)
-        eval_crew = Crew(agents=[evaluator], tasks=[t_eval], process=Process.sequential, verbose=False)
-        eval_result = eval_crew.kickoff()
-        evaluation = str(eval_result).strip()
+        before = json.loads(baseline[0].result(timeout=timeout)).get("overall_score")
+    except FutureTimeout:
+        print(f"Baseline evaluation still running after {timeout:.0f}s, reporting no baseline")
+        before = None
     except Exception as e:
-        print(f"Evaluation error: {str(e)}")
-        # Provide a fallback evaluation
-        evaluation = '{"overall_score": 75, "breakdown": {"keywords": 4, "structure": 4, "metrics": 3, "verbs": 4, "format": 4}, "missing_keywords": [], "quick_wins": ["Continue optimizing based on specific job requirements"]}'
+        print(f"Baseline evaluation error: {str(e)}")
+        before = None
+    after = result.get("overall_score")
+    result["baseline_score"] = before
+    result["score_delta"] = after - before if isinstance(after, int) and isinstance(before, int) else None
+    return json.dumps(result)
+
+
+def _rewrite_section(chunk: str, heading: str, job_title: str, job_description: str, cancel_event=None) -> str:
+    _check_cancelled(cancel_event)
+    writer = get_agent("writer")
+    tasks = rewrite_section_task(writer, chunk, heading, job_title, job_description)
+    outputs = _run_chunks("rewrite_section", writer, tasks, cancel_event)
+    return "\n".join(clean_section_output(output, heading) for output in outputs).strip() or chunk
+
+
+def _refine_section(chunk: str, heading: str, cancel_event=None) -> str:
+    _check_cancelled(cancel_event)
+    refiner = get_agent("refiner")
+    tasks = refine_section_task(refiner, chunk, heading)
+    outputs = _run_chunks("refine_section", refiner, tasks, cancel_event)
+    return "\n".join(clean_section_output(output, heading) for output in outputs).strip() or chunk
+
+
+async def _optimize_sections(sections: list, job_title: str, job_description: str, cancel_event=None, on_rewritten=None):
+    """Run rewrite -> refine for every section concurrently, at most SECTION_CONCURRENCY calls at a time.
+
+    Each section's chain is independent, so the slowest section rather than
+    the whole document bounds latency. `on_rewritten(text)` fires once every
+    section has been rewritten. The contact block before the first heading is
+    kept verbatim.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(SECTION_CONCURRENCY)
+    rewritten = [dict(section, chunks=list(section["chunks"])) for section in sections]
+    final = [dict(section, chunks=list(section["chunks"])) for section in sections]
+    units = [
+        (s, c) for s, section in enumerate(sections) if section["heading"]
+        for c, chunk in enumerate(section["chunks"]) if chunk.strip()
+    ]
+    pending = len(units)
+
+    async def run_unit(s: int, c: int):
+        nonlocal pending
+        heading = sections[s]["heading"]
+        async with semaphore:
+            text = await loop.run_in_executor(_section_executor, functools.partial(contextvars.copy_context().run, _rewrite_section, sections[s]["chunks"][c], heading, job_title, job_description, cancel_event))
+        rewritten[s]["chunks"][c] = text
+        pending -= 1
+        if pending == 0 and on_rewritten is not None:
+            on_rewritten(merge_sections(rewritten))
+        async with semaphore:
+            final[s]["chunks"][c] = await loop.run_in_executor(_section_executor, functools.partial(contextvars.copy_context().run, _refine_section, text, heading, cancel_event))
+
+    await asyncio.gather(*(run_unit(s, c) for s, c in units))
+    return merge_sections(rewritten), merge_sections(final)
+
+
+def clean_resume(raw_resume_text: str, mode: str = None) -> str:
+    """Stage 1: parse and clean the raw resume text."""
+    mode = mode or DEFAULT_PARSE_MODE
+    if mode not in PARSE_MODES:
+        raise ValueError(f"Unknown parse mode '{mode}', expected one of {', '.join(PARSE_MODES)}")
+    with span("parse.normalize"):
+        normalized = normalize_resume(raw_resume_text)
+    if mode == "rules":
+        return normalized
+    parser = get_agent("parser")
+    t_parse = parse_resume_task(parser, normalized)
+    # Only depends on the resume, so a new job description reuses the cached cleaned text
+    return "\n\n".join(_run_chunks("parse", parser, t_parse))
+
+
+def optimize_resume(cleaned: str, job_title: str, job_description: str, cancel_event=None, on_stage=None, evaluator: str = None, pipeline_started: float = None, mode: str = None):
+    """Stages 2-4: rewrite, refine and evaluate an already cleaned resume for one job."""
+    mode = mode or DEFAULT_PIPELINE_MODE
+    if mode not in PIPELINE_MODES:
+        raise ValueError(f"Unknown pipeline mode '{mode}', expected one of {', '.join(PIPELINE_MODES)}")
+    if pipeline_started is None:
+        pipeline_started = time.perf_counter()
+    # Runs on a section worker thread alongside stages 2-3; the job keyword profile it builds is
+    # cached, so the final evaluation reuses it
+    baseline = _start_baseline(cleaned, job_title, job_description, evaluator)
+    try:
+        writer = get_agent("writer")
+
+        sections = split_sections(cleaned) if mode == "sections" else []
+        if mode == "sections" and not any(section["heading"] for section in sections):
+            print("No section headings found, using the standard flow")
+            mode = "standard"
+
+        if mode == "sections":
+            # Stages 2+3 per section, concurrently; merged back in document order
+            _check_cancelled(cancel_event)
+            print(f"Stage 2-3/4: ATS optimization and bullet refinement of {len(sections)} sections...")
+            stage_started = time.perf_counter()
+
+            def on_rewritten(text):
+                _emit_stage(on_stage, "rewrite", 2, "rewritten", text, stage_started, pipeline_started)
+
+            rewritten, final_resume = asyncio.run(_optimize_sections(sections, job_title, job_description, cancel_event, on_rewritten))
+            _emit_stage(on_stage, "refine", 3, "final", final_resume, stage_started, pipeline_started)
+        elif mode == "fused":
+            # Stages 2+3: one round-trip returns both the rewrite and the polished version
+            _check_cancelled(cancel_event)
+            print("Stage 2-3/4: ATS optimization and bullet refinement...")
+            stage_started = time.perf_counter()
+            t_fused = rewrite_and_refine_task(writer, cleaned, job_title, job_description)
+            parts = [split_fused_output(output) for output in _run_chunks("rewrite_refine", writer, t_fused, cancel_event)]
+            rewritten = "\n\n".join(part[0] for part in parts)
+            final_resume = "\n\n".join(part[1] for part in parts)
+            _emit_stage(on_stage, "rewrite", 2, "rewritten", rewritten, stage_started, pipeline_started)
+            _emit_stage(on_stage, "refine", 3, "final", final_resume, time.perf_counter(), pipeline_started)
+        else:
+            refiner = get_agent("refiner")
+
+            # Stage 2: ATS optimization (includes keyword optimization)
+            _check_cancelled(cancel_event)
+            print("Stage 2/4: ATS optimization...")
+            stage_started = time.perf_counter()
+            t_rewrite = rewrite_for_ats_task(writer, cleaned, job_title, job_description)
+            rewritten = "\n\n".join(_run_chunks("rewrite", writer, t_rewrite, cancel_event))
+            _emit_stage(on_stage, "rewrite", 2, "rewritten", rewritten, stage_started, pipeline_started)
+
+            # Stage 3: Bullet refinement
+            _check_cancelled(cancel_event)
+            print("Stage 3/4: Bullet point refinement...")
+            stage_started = time.perf_counter()
+            t_refine = refine_bullets_task(refiner, rewritten)
+            final_resume = "\n\n".join(_run_chunks("refine", refiner, t_refine, cancel_event))
+            _emit_stage(on_stage, "refine", 3, "final", final_resume, stage_started, pipeline_started)
+
+        # Stage 4: Final evaluation with better error handling
+        _check_cancelled(cancel_event)
+        print("Stage 4/4: Final ATS evaluation...")
+        stage_started = time.perf_counter()
+        evaluation = _with_baseline(evaluate_resume(final_resume, job_title, job_description, evaluator, cancel_event), baseline)
+        _emit_stage(on_stage, "evaluate", 4, "evaluation", evaluation, stage_started, pipeline_started)
+    finally:
+        # Cancelled, failed or finished: a baseline still queued or running is no longer wanted
+        _stop_baseline(baseline)
+
+    return rewritten, final_resume, evaluation
+
+
+def run_pipeline(raw_resume_text: str, job_title: str, job_description: str, cancel_event=None, on_stage=None, evaluator: str = None, mode: str = None):
+    """Run the four stages in order. `on_stage(event)` is called as each stage finishes."""
+    pipeline_started = time.perf_counter()
+
+    # Stage 1: Parse and clean
+    print("Stage 1/4: Parsing and cleaning resume...")
+    cleaned = clean_resume(raw_resume_text)
+    _emit_stage(on_stage, "parse", 1, "cleaned", cleaned, pipeline_started, pipeline_started)
+
+    rewritten, final_resume, evaluation = optimize_resume(
+        cleaned, job_title, job_description,
+        cancel_event=cancel_event,
+        on_stage=on_stage,
+        evaluator=evaluator,
+        pipeline_started=pipeline_started,
+        mode=mode
+    )
 
     print("Resume optimization complete!")
     return cleaned, rewritten, final_resume, evaluation
@@ -0,0 +1,209 @@
+"""Shared process pool for CPU-bound document work (PDF/DOCX extraction and rendering).
+
+pypdf, ReportLab and python-docx are pure Python and hold the GIL, so running
+them in the API process stalls the event loop. Tasks run in worker processes
+with a per-task timeout that starts when the worker picks the task up, so time
+queued behind other requests never counts against it. Workers are recycled
+after a number of tasks to cap memory growth. A task past its timeout (pypdf
+can loop forever on malformed files) is interrupted inside its worker; only a
+worker that does not even respond to that is killed, by replacing the pool.
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .shared_state import WORKERS
+
+
+# Modules imported once by the fork server, so recycled workers start without re-importing them
+PRELOAD_MODULES = ["crew_app.file_tools.file_loader", "crew_app.utils"]
+
+
+def _worker_context():
+    """Worker recycling rules out plain fork; prefer a preloaded fork server over spawn."""
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(PRELOAD_MODULES)
+        return context
+    return multiprocessing.get_context("spawn")
+
+
+# Extra seconds a task may overrun its in-worker deadline before its worker counts as hung
+HUNG_GRACE_SECONDS = 5.0
+
+
+class DocumentTaskTimeout(asyncio.TimeoutError):
+    """A document task ran past its timeout and was interrupted in its worker."""
+
+
+def _on_deadline(signum, frame):
+    raise DocumentTaskTimeout("Document task timed out")
+
+
+def _timed_call(fn, args, timeout: float = None):
+    """Runs in the worker: report when execution actually started and finished.
+
+    With `timeout`, an alarm armed as execution starts interrupts the task.
+    """
+    started_at = time.time()
+    armed = bool(timeout) and hasattr(signal, "setitimer")
+    if armed:
+        signal.signal(signal.SIGALRM, _on_deadline)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        result = fn(*args)
+    finally:
+        if armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    return result, started_at, time.time()
+
+
+class _OpStats:
+    def __init__(self):
+        self.count = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.exec_total = 0.0
+        self.exec_max = 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "queue_wait_avg": round(self.wait_total / self.count, 4) if self.count else 0.0,
+            "queue_wait_max": round(self.wait_max, 4),
+            "exec_avg": round(self.exec_total / self.count, 4) if self.count else 0.0,
+            "exec_max": round(self.exec_max, 4),
+        }
+
+
+class DocumentPool:
+    def __init__(self, max_workers: int = 2, max_tasks_per_child: int = 100, timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.recycles = 0
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._executor = self._new_executor() if max_workers > 0 else None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            # The cores are split between the API's worker processes
+            max_workers=int(os.getenv("DOC_POOL_WORKERS", str(min(4, max(1, (os.cpu_count() or 1) // WORKERS))))),
+            max_tasks_per_child=int(os.getenv("DOC_POOL_MAX_TASKS_PER_CHILD", "100")),
+            timeout=float(os.getenv("DOC_TASK_TIMEOUT", "30")),
+        )
+
+    async def run(self, fn, *args, timeout: float = None):
+        """Run `fn(*args)` in a worker process and return its result.
+
+        With max_workers=0 the call runs on a thread instead, which keeps the
+        event loop free but shares the GIL (handy for tests and tiny instances).
+        """
+        timeout = timeout or self.timeout
+        op = self._op_stats(fn.__name__)
+        submitted_at = time.time()
+        if self._executor is None:
+            future = asyncio.to_thread(_timed_call, fn, args)
+            return self._record(op, submitted_at, await asyncio.wait_for(future, timeout))
+
+        for attempt in range(2):
+            executor = self._executor
+            try:
+                future = executor.submit(_timed_call, fn, args, timeout)
+                outcome = await self._wait(future, timeout)
+                return self._record(op, submitted_at, outcome)
+            except DocumentTaskTimeout:
+                # Interrupted in its worker, which is healthy and already on its next task
+                with self._lock:
+                    op.timeouts += 1
+                raise
+            except asyncio.TimeoutError:
+                with self._lock:
+                    op.timeouts += 1
+                self._replace_executor(executor)
+                raise
+            except BrokenProcessPool:
+                # Another task's timeout killed this pool under us; retry once on the fresh one
+                self._replace_executor(executor)
+                if attempt:
+                    with self._lock:
+                        op.failures += 1
+                    raise
+            except Exception:
+                with self._lock:
+                    op.failures += 1
+                raise
+
+    async def _wait(self, future, timeout: float):
+        """Wait for a submitted task; raises asyncio.TimeoutError only when its worker is hung."""
+        wrapped = asyncio.wrap_future(future)
+        # Queued work has not started, so however long the queue, the clock starts once the
+        # pool hands the task to its workers
+        while not future.running() and not future.done():
+            await asyncio.wait({wrapped}, timeout=0.05)
+        # The pool hands over one task more than it has workers, so a handed-over task may still wait
+        # for one other task (itself bounded by its deadline) before its own deadline is armed
+        return await asyncio.wait_for(wrapped, 2 * timeout + HUNG_GRACE_SECONDS)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_tasks_per_child": self.max_tasks_per_child,
+                "timeout": self.timeout,
+                "recycles": self.recycles,
+                "operations": {name: op.to_dict() for name, op in self._stats.items()},
+            }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            max_tasks_per_child=self.max_tasks_per_child,
+            mp_context=_worker_context(),
+        )
+
+    def _replace_executor(self, broken):
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_executor()
+            self.recycles += 1
+        # A hung worker never returns, so terminate the old pool's processes outright
+        for process in list((getattr(broken, "_processes", None) or {}).values()):
+            process.terminate()
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _op_stats(self, name: str) -> _OpStats:
+        with self._lock:
+            return self._stats.setdefault(name, _OpStats())
+
+    def _record(self, op: _OpStats, submitted_at: float, outcome):
+        result, started_at, finished_at = outcome
+        wait = max(0.0, started_at - submitted_at)
+        execution = finished_at - started_at
+        with self._lock:
+            op.count += 1
+            op.wait_total += wait
+            op.wait_max = max(op.wait_max, wait)
+            op.exec_total += execution
+            op.exec_max = max(op.exec_max, execution)
+        return result
+
+
+# Process-wide pool shared by every request
+doc_pool = DocumentPool.from_env()
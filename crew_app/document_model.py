@@ -0,0 +1,120 @@
+"""Intermediate resume model shared by the PDF, DOCX and TXT renderers.
+
+The text is classified once into an ordered list of (kind, text) blocks —
+name, contact, heading, job_title, company, date, bullet, normal, or None for
+a blank line — and every output format is rendered from the same blocks, so a
+multi-format export parses the resume a single time.
+"""
+import re
+
+from .ats_scorer import SECTION_HEADINGS, BULLET_CHARS
+
+# Line classifier patterns, compiled once; the order of checks lives in classify_lines
+CONTACT_RE = re.compile(r"[@+]|email|phone|address|location", re.IGNORECASE)
+HEADING_RE = re.compile("|".join(re.escape(h) for h in SECTION_HEADINGS), re.IGNORECASE)
+BULLET_PREFIX_RE = re.compile(r'^[•\-*◦·]\s*')
+TITLE_EXCLUDED_RE = re.compile(r"[@+|•\-*]")
+NEXT_COMPANY_RE = re.compile(r"\||at|Company|Inc|LLC|Corp")
+COMPANY_RE = re.compile(r"\||at|Company|Inc|LLC|Corp|Ltd")
+DATE_RE = re.compile(r"\b(?:19|20)\d{2}\b|jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec", re.IGNORECASE)
+
+# Block kinds that start a new job entry inside a section
+ENTRY_KINDS = ("job_title", "company")
+
+
+def classify_lines(lines: list) -> list:
+    """One pass over the stripped lines, returning (kind, text) per line; kind None is a blank line."""
+    classified = []
+    last = len(lines) - 1
+    for i, line in enumerate(lines):
+        if not line:
+            classified.append((None, ""))
+        # Name: first line, all caps, short
+        elif i == 0 and line.isupper() and len(line) < 50 and len(line.split()) <= 4:
+            classified.append(("name", line))
+        # Contact info (email, phone, location)
+        elif CONTACT_RE.search(line):
+            classified.append(("contact", line))
+        # Section heading; the word limit (shared with ats_scorer.is_heading) keeps sentences that
+        # merely mention "experience" from becoming headings
+        elif len(line.split()) <= 5 and HEADING_RE.search(line):
+            classified.append(("heading", line.upper()))
+        elif line.startswith(BULLET_CHARS):
+            classified.append(("bullet", BULLET_PREFIX_RE.sub('', line)))
+        # Job title: a short line followed by a company line
+        elif len(line.split()) <= 4 and not TITLE_EXCLUDED_RE.search(line):
+            is_title = i < last and NEXT_COMPANY_RE.search(lines[i + 1])
+            classified.append(("job_title" if is_title else "normal", line))
+        elif COMPANY_RE.search(line):
+            classified.append(("company", line))
+        elif DATE_RE.search(line):
+            classified.append(("date", line))
+        else:
+            classified.append(("normal", line))
+    return classified
+
+
+class ResumeDocument:
+    """Classified resume blocks in document order, plus a structured view of them.
+
+    Plain data, so it pickles cheaply into document pool workers. `source`
+    is the text the blocks were parsed from, which the TXT renderer returns
+    unchanged.
+    """
+
+    def __init__(self, blocks: list, source: str = None):
+        self.blocks = blocks
+        self.source = source
+
+    @property
+    def name(self):
+        return next((text for kind, text in self.blocks if kind == "name"), None)
+
+    @property
+    def contact(self) -> list:
+        return [text for kind, text in self.blocks if kind == "contact"]
+
+    @property
+    def sections(self) -> list:
+        """[{"heading", "lines", "entries": [{"title", "company", "date", "bullets", "lines"}]}] in order.
+
+        Blocks before the first heading (other than name and contact) belong to
+        a section with heading None; bullets before any entry stay in "lines".
+        """
+        sections = [{"heading": None, "lines": [], "entries": []}]
+        for kind, text in self.blocks:
+            if kind in (None, "name", "contact"):
+                continue
+            section = sections[-1]
+            entry = section["entries"][-1] if section["entries"] else None
+            if kind == "heading":
+                sections.append({"heading": text, "lines": [], "entries": []})
+            elif kind == "company" and entry is not None and entry["company"] is None and not entry["bullets"]:
+                # The company line under a job title
+                entry["company"] = text
+            elif kind in ENTRY_KINDS:
+                section["entries"].append({
+                    "title": text if kind == "job_title" else None,
+                    "company": text if kind == "company" else None,
+                    "date": None,
+                    "bullets": [],
+                    "lines": [],
+                })
+            elif entry is not None:
+                if kind == "date" and entry["date"] is None:
+                    entry["date"] = text
+                elif kind == "bullet":
+                    entry["bullets"].append(text)
+                else:
+                    entry["lines"].append(text)
+            else:
+                section["lines"].append(text)
+        return [s for s in sections if s["heading"] or s["lines"] or s["entries"]]
+
+    def to_text(self) -> str:
+        """Plain text with headings upper-cased and bullets normalised to "•"."""
+        return "\n".join(f"• {text}" if kind == "bullet" else text for kind, text in self.blocks)
+
+
+def parse_document(text: str) -> ResumeDocument:
+    return ResumeDocument(classify_lines([line.strip() for line in text.splitlines()]), source=text)
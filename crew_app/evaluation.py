@@ -0,0 +1,146 @@
+"""Schema and tolerant parsing for ATS evaluations.
+
+The LLM evaluator is asked for JSON but may wrap it in a code fence or prose,
+use Python literals or single quotes, or leave trailing commas. `extract_json`
+finds the first object in the text and repairs those issues; `Evaluation`
+validates and normalises it so every client sees the same shape whether the
+local scorer or the LLM produced it.
+"""
+import ast
+import json
+import re
+from typing import Dict, List, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, ValidationError, field_validator
+
+FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL | re.IGNORECASE)
+TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+SMART_QUOTES = str.maketrans({"“": '"', "”": '"', "‘": "'", "’": "'"})
+SCORE_RE = re.compile(r"(-?\d+(?:\.\d+)?)\s*(?:/\s*(\d+(?:\.\d+)?)|%)?")
+
+
+class Evaluation(BaseModel):
+    """One ATS evaluation: an overall 0-100 score, 1-5 category ratings and advice."""
+
+    model_config = ConfigDict(extra="ignore")
+
+    overall_score: int = Field(ge=0, le=100)
+    breakdown: Dict[str, Union[int, float, str]] = Field(default_factory=dict)
+    missing_keywords: List[str] = Field(default_factory=list)
+    quick_wins: List[str] = Field(default_factory=list)
+    summary: Optional[str] = None
+    evaluator: str = "llm"
+    # Score of the cleaned resume before optimization, and the change since
+    baseline_score: Optional[int] = None
+    score_delta: Optional[int] = None
+
+    @field_validator("overall_score", mode="before")
+    @classmethod
+    def _score(cls, value):
+        """Accept 82, 82.4, "82", "82%", "82/100" and "4/5", scaled to 0-100."""
+        if isinstance(value, str):
+            match = SCORE_RE.search(value)
+            if not match:
+                return value
+            number, scale = float(match.group(1)), match.group(2)
+            value = number * 100 / float(scale) if scale else number
+        if isinstance(value, float):
+            value = int(round(value))
+        return max(0, min(100, value)) if isinstance(value, int) else value
+
+    @field_validator("missing_keywords", "quick_wins", mode="before")
+    @classmethod
+    def _string_list(cls, value):
+        if value is None:
+            return []
+        if isinstance(value, str):
+            separator = "\n" if "\n" in value else ","
+            return [item.strip(" -•*") for item in value.split(separator) if item.strip(" -•*")]
+        return [str(item) for item in value]
+
+    @field_validator("breakdown", mode="before")
+    @classmethod
+    def _breakdown(cls, value):
+        return value or {}
+
+
+def _object_span(text: str):
+    """Start and end of the first balanced {...} in the text, honouring quoted strings."""
+    start = text.find("{")
+    while start != -1:
+        depth = 0
+        quote = None
+        escaped = False
+        for i in range(start, len(text)):
+            char = text[i]
+            if quote:
+                if escaped:
+                    escaped = False
+                elif char == "\\":
+                    escaped = True
+                elif char == quote:
+                    quote = None
+            elif char in "\"'":
+                # An apostrophe inside a word ("candidate's") is not a string delimiter
+                if char == "'" and i > 0 and text[i - 1].isalnum():
+                    continue
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    return start, i + 1
+        start = text.find("{", start + 1)
+    return None
+
+
+def extract_json(text: str):
+    """The first JSON object in LLM output as a dict, repairing common issues; None when there is none."""
+    if not isinstance(text, str):
+        return text if isinstance(text, dict) else None
+    fenced = FENCE_RE.search(text)
+    candidate = fenced.group(1) if fenced else text
+    bounds = _object_span(candidate)
+    if bounds is None:
+        return None
+    raw = candidate[bounds[0]:bounds[1]].translate(SMART_QUOTES)
+    attempts = (
+        lambda: json.loads(raw),
+        lambda: json.loads(TRAILING_COMMA_RE.sub(r"\1", raw)),
+        # Python-style dicts: single quotes and True/False/None, with apostrophes left intact
+        lambda: ast.literal_eval(re.sub(r"\btrue\b|\bfalse\b|\bnull\b", lambda m: {"true": "True", "false": "False", "null": "None"}[m.group()], TRAILING_COMMA_RE.sub(r"\1", raw))),
+    )
+    for attempt in attempts:
+        try:
+            value = attempt()
+        except (ValueError, SyntaxError, MemoryError, RecursionError):
+            continue
+        if isinstance(value, dict):
+            return value
+    return None
+
+
+def validate_evaluation(text) -> Optional[dict]:
+    """Parsed and normalised evaluation, or None when the text holds no valid one."""
+    data = extract_json(text)
+    if data is None:
+        return None
+    try:
+        return Evaluation.model_validate(data).model_dump()
+    except ValidationError:
+        return None
+
+
+def unparsed_evaluation(text: str) -> dict:
+    """Same shape as a valid evaluation, carrying text that could not be parsed in `summary`."""
+    return {
+        "overall_score": None,
+        "breakdown": {},
+        "missing_keywords": [],
+        "quick_wins": [],
+        "summary": str(text),
+        "evaluator": "unparsed",
+        "baseline_score": None,
+        "score_delta": None,
+    }
@@ -1,33 +1,120 @@
 import io
-from typing import Tuple
+import mmap
+import os
+from contextlib import contextmanager
+from typing import Iterator, Tuple
 from pypdf import PdfReader
 from docx import Document
 
-def extract_text_from_pdf(file_bytes: bytes) -> str:
-    reader = PdfReader(io.BytesIO(file_bytes))
-    parts = []
+from .normalizer import PAGE_BREAK
+
+# Limits enforced before any parsing starts
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+
+
+class ExtractionError(ValueError):
+    """Raised when an upload exceeds the configured size or page limits."""
+
+
+def source_size(source) -> int:
+    """Size in bytes of raw bytes, a filesystem path or a seekable binary file object."""
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return len(source)
+    if isinstance(source, (str, os.PathLike)):
+        return os.path.getsize(source)
+    position = source.tell()
+    size = source.seek(0, io.SEEK_END)
+    source.seek(position)
+    return size
+
+
+@contextmanager
+def open_source(source):
+    """Yield a seekable binary stream without copying the document into a new buffer.
+
+    Paths are memory-mapped, so pages are faulted in by the OS as the parser
+    touches them; file objects (e.g. an upload's spooled temporary file) are
+    rewound and read in place.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(source)
+    elif isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield io.BytesIO(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                yield mapped
+    else:
+        source.seek(0)
+        yield source
+
+
+def iter_pdf_pages(stream, max_pages: int = MAX_PDF_PAGES) -> Iterator[str]:
+    """Lazily yield the text of each page; pages are only parsed when requested."""
+    reader = PdfReader(stream)
+    page_count = len(reader.pages)
+    if max_pages and page_count > max_pages:
+        raise ExtractionError(f"PDF has {page_count} pages; the limit is {max_pages}")
     for page in reader.pages:
-        txt = page.extract_text() or ""
-        parts.append(txt)
-    return "\n".join(parts)
-
-def extract_text_from_docx(file_bytes: bytes) -> str:
-    f = io.BytesIO(file_bytes)
-    doc = Document(f)
-    parts = []
-    for p in doc.paragraphs:
-        parts.append(p.text)
-    return "\n".join(parts)
-
-def detect_and_extract(filename: str, file_bytes: bytes) -> Tuple[str, str]:
-    """Return (ext, text). ext in {pdf, docx, txt}."""
+        yield page.extract_text() or ""
+
+
+def _collect(parts: Iterator[str], max_chars: int = None, separator: str = "\n") -> str:
+    """Join parts, stopping once more than `max_chars` characters have been gathered."""
+    collected = []
+    total = 0
+    for part in parts:
+        collected.append(part)
+        total += len(part) + len(separator)
+        if max_chars and total > max_chars:
+            break
+    return separator.join(collected)
+
+
+def extract_text_from_pdf(source, max_chars: int = None, max_pages: int = MAX_PDF_PAGES) -> str:
+    # Pages are separated by a form feed so the normalizer can spot running headers and footers
+    with open_source(source) as stream:
+        return _collect(iter_pdf_pages(stream, max_pages), max_chars, separator=f"\n{PAGE_BREAK}\n")
+
+
+def extract_text_from_docx(source, max_chars: int = None) -> str:
+    # zipfile needs a real file object (mmap has no seekable() before Python 3.13), so paths are opened directly
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as stream:
+            doc = Document(stream)
+    else:
+        with open_source(source) as stream:
+            doc = Document(stream)
+    return _collect((p.text for p in doc.paragraphs), max_chars)
+
+
+def extract_text_from_txt(source, max_chars: int = None) -> str:
+    with open_source(source) as stream:
+        # UTF-8 uses at most 4 bytes per character; read one extra so callers still see the overflow
+        data = stream.read((max_chars + 1) * 4) if max_chars else stream.read()
+    text = data.decode("utf-8", errors="ignore")
+    return text[:max_chars + 1] if max_chars else text
+
+
+def detect_and_extract(filename: str, source, max_chars: int = None, max_bytes: int = MAX_UPLOAD_BYTES) -> Tuple[str, str]:
+    """Return (ext, text). ext in {pdf, docx, txt}.
+
+    `source` may be raw bytes, a filesystem path or a seekable binary file
+    object. Uploads larger than `max_bytes` are rejected before parsing, and
+    extraction stops once more than `max_chars` characters are collected.
+    """
+    size = source_size(source)
+    if max_bytes and size > max_bytes:
+        raise ExtractionError(f"File is {size} bytes; the limit is {max_bytes}")
     low = filename.lower()
     if low.endswith(".pdf"):
-        return "pdf", extract_text_from_pdf(file_bytes)
+        return "pdf", extract_text_from_pdf(source, max_chars)
     if low.endswith(".docx"):
-        return "docx", extract_text_from_docx(file_bytes)
+        return "docx", extract_text_from_docx(source, max_chars)
     # basic text fallback
     try:
-        return "txt", file_bytes.decode("utf-8", errors="ignore")
+        return "txt", extract_text_from_txt(source, max_chars)
     except Exception:
         return "bin", ""
@@ -0,0 +1,135 @@
+"""Rule-based cleanup of extracted resume text, replacing the LLM parse stage by default.
+
+Fixes the mechanical damage PDF/DOCX extraction does: ligatures and invisible
+characters, page headers and footers repeated across pages, page numbers,
+lowercase words hyphenated across line breaks (known compounds such as
+"full-stack" keep their hyphen), bullets wrapped onto continuation lines,
+letter-spaced headings ("E X P E R I E N C E") and the many bullet glyphs
+(including the DEL byte pypdf emits for Helvetica bullets), which all become
+"• ". PDF extraction separates pages with form feeds so headers and footers
+can be matched across pages.
+"""
+import re
+
+PAGE_BREAK = "\f"
+
+# Characters replaced or dropped before any line processing
+CHAR_MAP = str.maketrans({
+    "\ufb00": "ff", "\ufb01": "fi", "\ufb02": "fl", "\ufb03": "ffi", "\ufb04": "ffl", "\ufb05": "st", "\ufb06": "st",
+    "\u00a0": " ", "\u2002": " ", "\u2003": " ", "\u2009": " ", "\t": " ",
+    "\u00ad": None, "\u200b": None, "\u200c": None, "\u200d": None, "\u2060": None, "\ufeff": None,
+    "\r": "\n",
+})
+CONTROL_RE = re.compile("[\x00-\x08\x0b\x0e-\x1f]")
+SPACES_RE = re.compile(" {2,}")
+# Bullet glyphs at the start of a line; "-", "–" and "*" need a following space so "-5%" or "*nix"
+# survive. Letters and ">" are not bullets: prose and quotes can start with "o " or "> "
+BULLET_RE = re.compile(r"^(?:[•●▪■◦·‣⁃∙○□➢➤►▶✓✔\x7f]\s*|[-–*]\s+)")
+PAGE_NUMBER_RE = re.compile(r"^(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?$|^-\s*\d+\s*-$", re.IGNORECASE)
+SPACED_LETTERS_RE = re.compile(r"^(?:[A-Za-z&] ){2,}[A-Za-z&](?: {2,}(?:[A-Za-z&] )*[A-Za-z&])*$")
+# The word before a hyphen that ends a line, including any earlier parts of a compound ("end-to-")
+HYPHEN_BREAK_RE = re.compile(r"(?<![\w-])([A-Za-z][A-Za-z-]*[A-Za-z])-$")
+LEADING_WORD_RE = re.compile(r"[A-Za-z]+")
+DIGITS_RE = re.compile(r"\d+")
+
+# Compounds that keep their hyphen when they wrap at a line break
+HYPHENATED_COMPOUNDS = frozenset((
+    "full-stack", "front-end", "back-end", "client-side", "server-side", "cross-functional",
+    "cross-platform", "real-time", "data-driven", "event-driven", "test-driven", "results-driven",
+    "detail-oriented", "customer-facing", "user-facing", "self-motivated", "self-starter", "open-source",
+    "hands-on", "fast-paced", "long-term", "short-term", "cloud-native", "high-performance",
+    "problem-solving", "decision-making", "on-call", "e-commerce", "in-house", "follow-up",
+    "well-known", "large-scale", "multi-tenant", "non-profit", "co-founder", "mission-critical",
+    "state-of", "year-over", "month-over",
+))
+
+# Lines examined at the top and bottom of each page for running headers/footers
+EDGE_LINES = 3
+# Share of pages an edge line must appear on to count as a header or footer
+REPEAT_SHARE = 0.5
+SENTENCE_END = (".", ":", ";", "!", "?")
+
+
+def _edge_key(line: str) -> str:
+    # "Page 2 of 3" and "Page 3 of 3" are the same footer
+    return DIGITS_RE.sub("#", line.lower())
+
+
+def _running_lines(pages: list) -> set:
+    """Keys of lines that sit at the top or bottom of at least half the pages (two at minimum)."""
+    if len(pages) < 2:
+        return set()
+    counts = {}
+    for lines in pages:
+        content = [line for line in lines if line]
+        keys = {_edge_key(line) for line in content[:EDGE_LINES] + content[-EDGE_LINES:]}
+        for key in keys:
+            counts[key] = counts.get(key, 0) + 1
+    needed = max(2, int(len(pages) * REPEAT_SHARE + 0.5))
+    return {key for key, count in counts.items() if count >= needed}
+
+
+def _clean_line(line: str) -> str:
+    line = line.strip()
+    if SPACED_LETTERS_RE.match(line):
+        # Letter-spaced heading: single spaces join letters, wider gaps separate words
+        return " ".join(word.replace(" ", "") for word in re.split(r" {2,}", line))
+    return SPACES_RE.sub(" ", line)
+
+
+def _is_split_word(head: str, tail) -> bool:
+    """Whether "head-" at a line end and the `tail` match starting the next line are one word."""
+    if tail is None or "-" in head or not (head.islower() and tail.group(0).islower()):
+        return False
+    return f"{head}-{tail.group(0)}" not in HYPHENATED_COMPOUNDS
+
+
+def normalize_resume(text: str) -> str:
+    """Deterministic stand-in for the LLM parse stage; pages are split on form feeds."""
+    text = CONTROL_RE.sub("", text.translate(CHAR_MAP))
+    pages = [[_clean_line(line) for line in page.split("\n")] for page in text.split(PAGE_BREAK)]
+    running = _running_lines(pages)
+
+    out = []
+    for page_number, lines in enumerate(pages):
+        content_positions = [i for i, line in enumerate(lines) if line]
+        if not content_positions:
+            continue
+        first, last = content_positions[0], content_positions[-1]
+        # The top of the first page holds the name, which later pages often repeat as their header
+        edges = set(content_positions[-EDGE_LINES:])
+        if page_number:
+            edges.update(content_positions[:EDGE_LINES])
+        for i, line in enumerate(lines):
+            if not line:
+                # Blank lines separate blocks within a page; page boundaries are not block breaks
+                if first < i < last and out and out[-1]:
+                    out.append("")
+                continue
+            if PAGE_NUMBER_RE.match(line) or (i in edges and _edge_key(line) in running):
+                continue
+            bullet = BULLET_RE.match(line)
+            if bullet:
+                body = line[bullet.end():].strip()
+                if body:
+                    out.append(f"• {body}")
+                continue
+            previous = out[-1] if out else ""
+            if previous and line[0].islower():
+                hyphenated = HYPHEN_BREAK_RE.search(previous)
+                if hyphenated:
+                    if _is_split_word(hyphenated.group(1), LEADING_WORD_RE.match(line)):
+                        # "manage-" + "ment" -> "management"
+                        out[-1] = previous[:-1] + line
+                    else:
+                        # "full-" + "stack" -> "full-stack"
+                        out[-1] = previous + line
+                    continue
+                if previous.startswith("• ") and not previous.endswith(SENTENCE_END):
+                    # Bullet text wrapped onto the next line
+                    out[-1] = f"{previous} {line}"
+                    continue
+            out.append(line)
+    while out and not out[-1]:
+        out.pop()
+    return "\n".join(out)
@@ -0,0 +1,167 @@
+"""Compact, reusable profiles of job postings.
+
+A small set of postings is reused by many candidates, so each one is analysed
+once per normalised text (whitespace and case folded): role titles, required
+and preferred skills, key phrases and the years of experience asked for, all
+extracted deterministically from ats_scorer's weighted keywords. The writer
+and evaluator prompts get this short profile instead of a truncated copy of
+the posting: fewer tokens, and every candidate is judged against the same
+requirements. Profiles live in a StageCache (memory, plus SQLite when
+`JOB_PROFILE_DB` is set, plus the shared store when several workers run).
+"""
+import hashlib
+import json
+import os
+import re
+import time
+
+from .ats_scorer import GENERIC_TERMS, STOPWORDS, extract_keywords, extract_terms, tokenize
+from .cache import StageCache
+from .prompt_budget import BOILERPLATE_CUES, SENTENCE_SPLIT_RE, compact, count_tokens
+from .shared_state import SHARED, shared_state
+
+# "false" sends the budgeted posting text to the LLM instead of its profile
+JOB_PROFILES = os.getenv("JOB_PROFILES", "true").lower() == "true"
+
+# Sentences with these cues list nice-to-haves; every other sentence lists requirements
+PREFERRED_CUES = ("preferred", "nice to have", "nice-to-have", "bonus", "a plus", "ideally", "desirable", "advantage")
+# Role titles named in the posting, e.g. "Data Engineers" or "Senior Product Manager"
+TITLE_RE = re.compile(
+    r"\b(?:[A-Z][\w+#./-]*\s+){1,3}"
+    r"(?:Engineer|Developer|Manager|Analyst|Scientist|Designer|Architect|Administrator|Consultant)s?\b"
+)
+# Original-case words, to tell named skills ("PostgreSQL", "CI/CD") from ordinary vocabulary
+CASED_WORD_RE = re.compile(r"[A-Za-z0-9][A-Za-z0-9+#./-]*[A-Za-z0-9+#]|[A-Za-z0-9]")
+YEARS_RE = re.compile(r"(\d{1,2})\s*\+?\s*(?:-\s*\d{1,2}\s*)?years", re.IGNORECASE)
+
+MAX_SKILLS = 12
+MAX_PHRASES = 8
+MAX_TITLES = 3
+
+job_profile_cache = StageCache(
+    max_entries=int(os.getenv("JOB_PROFILE_CACHE_SIZE", "1024")),
+    ttl_seconds=int(os.getenv("JOB_PROFILE_TTL", str(30 * 86400))),
+    db_path=os.getenv("JOB_PROFILE_DB") or None,
+    shared=shared_state if SHARED else None,
+    namespace="job_profile",
+)
+
+
+def profile_id(job_title: str, job_description: str) -> str:
+    """Hash of the posting with whitespace and case folded, so re-pasted copies share a profile."""
+    normalized = f"{' '.join(job_title.split())}\n{' '.join(job_description.split())}".lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+def _named_terms(sentence: str) -> set:
+    """Lower-cased words written like product or technology names: capitalised mid-sentence,
+    mixed case ("FastAPI") or with symbols ("C++", "node.js")."""
+    named = set()
+    for i, word in enumerate(CASED_WORD_RE.findall(sentence)):
+        if (i and word[0].isupper()) or any(c.isupper() for c in word[1:]) or any(c in "+#./" for c in word):
+            named.add(word.lower())
+    return named
+
+
+def _ranked(scores: dict, limit: int) -> list:
+    return [term for term, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
+
+def build_profile(job_title: str, job_description: str) -> dict:
+    """Analyse a posting: {"titles", "required", "preferred", "key_phrases", "min_years", ...}."""
+    keywords = extract_keywords(job_title, job_description)
+    title_words = set(tokenize(job_title))
+    text = compact(job_description)
+    required = {}
+    preferred = {}
+    phrases = {}
+    titles = [" ".join(job_title.split())] if job_title.strip() else []
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        low = sentence.lower()
+        if not low.strip() or any(cue in low for cue in BOILERPLATE_CUES):
+            continue
+        bucket = preferred if any(cue in low for cue in PREFERRED_CUES) else required
+        skip = set(title_words)
+        for match in TITLE_RE.finditer(sentence):
+            title = match.group()
+            skip.update(tokenize(title))
+            if title.lower() not in (t.lower() for t in titles) and len(titles) < MAX_TITLES:
+                titles.append(title)
+        tokens = tokenize(sentence)
+        named = _named_terms(sentence)
+        # "python, sql, pandas" or "Python FastAPI Redis": every word is a skill
+        listing = sentence.count(",") >= 2 or not any(token in STOPWORDS for token in tokens)
+        for term in set(extract_terms(tokens)):
+            words = term.split()
+            weight = keywords.get(term)
+            # Generic job-ad words and words of role titles (the posting's own is the "Role") say nothing new
+            if weight is None or all(word in GENERIC_TERMS or word in skip for word in words):
+                continue
+            if len(words) > 1:
+                phrases[term] = weight
+            elif term in named or listing or weight > 1.0:
+                # Named skills, list items and plain words the posting repeats
+                bucket[term] = max(bucket.get(term, 0.0), weight * (2.0 if term in named else 1.0))
+    if not required and not preferred:
+        # An all lower-case skill list: fall back to keyword weight alone
+        required = {term: weight for term, weight in keywords.items() if " " not in term and term not in title_words}
+    for term in required:
+        preferred.pop(term, None)
+    # "machine learning" is listed once, as a phrase
+    in_phrases = {word for phrase in phrases for word in phrase.split()}
+    required = {term: score for term, score in required.items() if term not in in_phrases}
+    preferred = {term: score for term, score in preferred.items() if term not in in_phrases}
+    years = [int(n) for n in YEARS_RE.findall(text)]
+    return {
+        "profile_id": profile_id(job_title, job_description),
+        "job_title": job_title,
+        "titles": titles,
+        "required": _ranked(required, MAX_SKILLS),
+        "preferred": _ranked(preferred, MAX_SKILLS),
+        "key_phrases": _ranked(phrases, MAX_PHRASES),
+        "min_years": min(years) if years else None,
+        "source_tokens": count_tokens(job_description),
+        "created_at": time.time(),
+    }
+
+
+def profile_text(profile: dict) -> str:
+    """The profile as the short block the writer and evaluator prompts use in place of the posting."""
+    titles = profile["titles"]
+    lines = []
+    if titles:
+        lines.append(f"Role: {titles[0]}" + (f" (also: {', '.join(titles[1:])})" if len(titles) > 1 else ""))
+    if profile["required"]:
+        lines.append(f"Required: {', '.join(profile['required'])}")
+    if profile["preferred"]:
+        lines.append(f"Preferred: {', '.join(profile['preferred'])}")
+    if profile["key_phrases"]:
+        lines.append(f"Key phrases: {', '.join(profile['key_phrases'])}")
+    if profile["min_years"]:
+        lines.append(f"Experience: {profile['min_years']}+ years")
+    return "\n".join(lines)
+
+
+def get_profile(job_title: str, job_description: str) -> dict:
+    """Cached profile of a posting, built on first use."""
+    key = profile_id(job_title, job_description)
+    cached = job_profile_cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    profile = build_profile(job_title, job_description)
+    profile["profile_tokens"] = count_tokens(profile_text(profile))
+    job_profile_cache.set(key, json.dumps(profile))
+    return profile
+
+
+def lookup_profile(key: str):
+    """A stored profile by id, or None."""
+    cached = job_profile_cache.get(key)
+    return json.loads(cached) if cached is not None else None
+
+
+def job_requirements(job_title: str, job_description: str):
+    """Profile text for a stage prompt, or None to budget the raw posting (profiles disabled or empty)."""
+    if not JOB_PROFILES or not job_description:
+        return None
+    return profile_text(get_profile(job_title, job_description)) or None
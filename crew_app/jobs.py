@@ -0,0 +1,254 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from .telemetry import trace
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+class QueueFullError(Exception):
+    """Raised when the pipeline queue has no room for another job."""
+
+
+class ShuttingDownError(Exception):
+    """Raised for new jobs while the manager drains before shutdown."""
+
+
+class Job:
+    def __init__(self, job_id: str, params: dict):
+        self.id = job_id
+        self.params = params
+        self.status = QUEUED
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.events = []
+        self.result_id = None
+
+    def add_event(self, event: dict):
+        """Record a progress event (e.g. a finished pipeline stage) for streaming clients."""
+        self.events.append(event)
+
+    def events_since(self, start: int) -> list:
+        return self.events[start:]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def to_dict(self) -> dict:
+        data = {
+            "job_id": self.id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+        if self.status == COMPLETED:
+            data["results"] = self.result
+        if self.result_id:
+            data["result_id"] = self.result_id
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class SharedJob:
+    """Read-only snapshot of a job run by another worker, from the shared state."""
+
+    def __init__(self, state, record: dict):
+        self.state = state
+        self.record = record
+        self.id = record["job_id"]
+        self.status = record["status"]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATES
+
+    def events_since(self, start: int) -> list:
+        return [json.loads(event) for event in self.state.lrange(f"job:{self.id}:events", start, -1)]
+
+    def to_dict(self) -> dict:
+        return dict(self.record)
+
+
+class JobManager:
+    """Runs blocking pipeline calls on a bounded thread pool.
+
+    `runner` is called as `runner(**params, cancel_event=event, on_stage=callback)`
+    on a worker thread; swap it for a stub to exercise the API without an LLM.
+    With a `result_store`, completed results are saved under the job id before
+    the job is reported as completed.
+
+    With a `state` store (shared_state) every job's status and events are
+    also published there, so any worker process can report on, stream or
+    cancel it; the queue and its limit stay per process.
+    """
+
+    def __init__(self, runner, max_workers: int = 2, max_queue: int = 16, retention_seconds: int = 3600, result_store=None, state=None):
+        self.runner = runner
+        self.result_store = result_store
+        self.state = state
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retention_seconds = retention_seconds
+        self.draining = False
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="pipeline")
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def submit(self, **params) -> Job:
+        with self._lock:
+            if self.draining:
+                raise ShuttingDownError("Server is shutting down")
+            self._prune()
+            if self.queued_count() >= self.max_queue:
+                raise QueueFullError(f"Pipeline queue is full ({self.max_queue} jobs waiting)")
+            job = Job(uuid.uuid4().hex, params)
+            self._jobs[job.id] = job
+        self._publish(job)
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str):
+        """The job, or a SharedJob snapshot when another worker runs it; None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.state is not None:
+            record = self.state.get(f"job:{job_id}")
+            if record is not None:
+                return SharedJob(self.state, json.loads(record))
+        return job
+
+    def cancel(self, job_id: str):
+        """Cancel a job. Queued jobs never start; running jobs stop at the next stage boundary."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        if isinstance(job, SharedJob):
+            # The owning worker checks for this before starting the job and after each stage
+            self.state.set(f"job:{job_id}:cancel", "1", ex=self.retention_seconds)
+            return job
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            self._finish(job, CANCELLED)
+        return job
+
+    def queued_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == QUEUED)
+
+    def running_count(self) -> int:
+        return sum(1 for job in self._jobs.values() if job.status == RUNNING)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queued": self.queued_count(),
+                "running": self.running_count(),
+                "draining": self.draining,
+            }
+
+    def drain(self, timeout: float) -> int:
+        """Refuse new jobs and give queued and running ones up to `timeout` seconds to finish,
+        then shut down, cancelling the rest. Returns how many were cut short."""
+        with self._lock:
+            self.draining = True
+            futures = [job.future for job in self._jobs.values() if not job.finished and job.future is not None]
+        if futures:
+            print(f"Draining {len(futures)} pipeline job(s) for up to {timeout:.0f}s")
+        _, pending = wait(futures, timeout=timeout)
+        self.shutdown(wait=False)
+        return len(pending)
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        for job in jobs:
+            if not job.finished:
+                job.cancel_event.set()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        for job in jobs:
+            if not job.finished:
+                # Other workers would otherwise report the job as running until it expires
+                self._finish(job, CANCELLED, error="Server shut down before the job finished; please resubmit")
+
+    def _cancel_requested(self, job: Job) -> bool:
+        """Whether the job was cancelled here or, through the shared state, from another worker."""
+        if not job.cancel_event.is_set() and self.state is not None and self.state.get(f"job:{job.id}:cancel") is not None:
+            job.cancel_event.set()
+        return job.cancel_event.is_set()
+
+    def _add_event(self, job: Job, event: dict):
+        job.add_event(event)
+        if self.state is not None:
+            key = f"job:{job.id}:events"
+            self.state.rpush(key, json.dumps(event))
+            self.state.expire(key, self.retention_seconds)
+            self._cancel_requested(job)
+
+    def _publish(self, job: Job):
+        if self.state is not None:
+            self.state.set(f"job:{job.id}", json.dumps(job.to_dict()), ex=self.retention_seconds)
+
+    def _run(self, job: Job):
+        if self._cancel_requested(job):
+            self._finish(job, CANCELLED)
+            return
+        job.status = RUNNING
+        job.started_at = time.time()
+        self._publish(job)
+        try:
+            with trace(job.id):
+                result = self.runner(**job.params, cancel_event=job.cancel_event, on_stage=lambda event: self._add_event(job, event))
+        except Exception as e:
+            if job.cancel_event.is_set():
+                self._finish(job, CANCELLED)
+            else:
+                print(f"Job {job.id} failed: {str(e)}")
+                self._finish(job, FAILED, error=str(e))
+            return
+        if job.cancel_event.is_set():
+            self._finish(job, CANCELLED)
+            return
+        if self.result_store is not None:
+            try:
+                self.result_store.put(job.id, result)
+                job.result_id = job.id
+            except Exception as e:
+                # The job still succeeded; only downloads by id are unavailable
+                print(f"Job {job.id}: could not store result: {str(e)}")
+        self._finish(job, COMPLETED, result=result)
+
+    def _finish(self, job: Job, status: str, result=None, error=None):
+        job.result = result
+        job.error = error
+        job.finished_at = time.time()
+        job.status = status
+        self._publish(job)
+
+    def _prune(self):
+        # Caller holds the lock
+        cutoff = time.time() - self.retention_seconds
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job.finished and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
@@ -0,0 +1,268 @@
+"""LLM backends behind every agent.
+
+`LLM_BACKEND` selects where completions come from:
+
+- `openai` (default): OpenAI's API, model from `OPENAI_MODEL`.
+- `compatible`: any OpenAI-compatible server (vLLM, llama.cpp, Ollama, LM Studio)
+  at `LLM_BASE_URL`.
+- `replay`: responses served from a directory of recordings with simulated
+  latency; no network or API key, for tests, benchmarks and load tests.
+- `record`: calls OpenAI and appends every response to the recordings, to
+  build a replay set from real traffic.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from typing import Any
+
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+from crewai.types.usage_metrics import UsageMetrics
+
+from .prompt_budget import count_tokens
+from .llm_scheduler import CLIENT_OPTIONS
+from .telemetry import add_llm_usage
+
+MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "http://localhost:8080/v1")
+LLM_API_KEY = os.getenv("LLM_API_KEY", "")
+
+REPLAY_DIR = os.getenv("LLM_REPLAY_DIR", "data/llm_replay")
+# Simulated latency of a replayed call: base seconds plus seconds per completion token
+REPLAY_LATENCY = float(os.getenv("LLM_REPLAY_LATENCY", "0"))
+REPLAY_TOKEN_LATENCY = float(os.getenv("LLM_REPLAY_TOKEN_LATENCY", "0"))
+# Fail on prompts without an exact recording instead of falling back to a similar one
+REPLAY_STRICT = os.getenv("LLM_REPLAY_STRICT", "0") == "1"
+
+ROLE_RE = re.compile(r"^You are (.+?)\.", re.MULTILINE)
+EXPECTED_RE = re.compile(r"expected criteria for your final answer: (.*)")
+# Upper-case section names inside expected outputs ("ATS-optimized EXPERIENCE section.")
+SHAPE_RE = re.compile(r"\b[A-Z]{2,}(?:[ &/]+[A-Z]{2,})*\b")
+
+
+def prompt_key(model: str, messages: list) -> str:
+    """Stable hash of the model and the exact conversation sent to it."""
+    payload = json.dumps([model] + [[m.get("role"), m.get("content")] for m in messages], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def describe_prompt(messages: list):
+    """(agent role, expected-output shape) of a crewai prompt, used to find a fallback recording."""
+    text = "\n".join(str(m.get("content", "")) for m in messages)
+    role = ROLE_RE.search(text)
+    expected = EXPECTED_RE.search(text)
+    shape = SHAPE_RE.sub("*", expected.group(1).strip()) if expected else ""
+    return (role.group(1) if role else ""), shape
+
+
+class ReplayStore:
+    """Recorded responses in `*.jsonl` files under a directory, indexed by exact prompt and by prompt shape.
+
+    Each line is {"key", "role", "shape", "response"}. A prompt without an
+    exact recording falls back to the last recording for the same agent role
+    and expected output, then to the last one for the role, so replay also
+    covers prompts that were never recorded (e.g. synthetic load-test resumes).
+    """
+
+    def __init__(self, directory: str = REPLAY_DIR):
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._exact = {}
+        self._by_shape = {}
+        self._by_role = {}
+        self.hits = 0
+        self.fallbacks = 0
+        self.misses = 0
+        if os.path.isdir(directory):
+            for name in sorted(os.listdir(directory)):
+                if name.endswith(".jsonl"):
+                    with open(os.path.join(directory, name), encoding="utf-8") as f:
+                        for line in f:
+                            if line.strip():
+                                self._index(json.loads(line))
+
+    def _index(self, record: dict):
+        if record.get("key"):
+            self._exact[record["key"]] = record["response"]
+        self._by_shape[(record["role"], record["shape"])] = record["response"]
+        self._by_role[record["role"]] = record["response"]
+
+    def lookup(self, key: str, role: str, shape: str, strict: bool = REPLAY_STRICT):
+        with self._lock:
+            if key in self._exact:
+                self.hits += 1
+                return self._exact[key]
+            response = None if strict else self._by_shape.get((role, shape), self._by_role.get(role))
+            if response is None:
+                self.misses += 1
+            else:
+                self.fallbacks += 1
+            return response
+
+    def save(self, key: str, role: str, shape: str, response: str):
+        record = {"key": key, "role": role, "shape": shape, "response": response}
+        with self._lock:
+            self._index(record)
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, "responses.jsonl"), "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "directory": self.directory,
+                "recordings": len(self._exact),
+                "hits": self.hits,
+                "fallbacks": self.fallbacks,
+                "misses": self.misses,
+            }
+
+
+class ReplayLLM(BaseLLM):
+    """Serves recorded responses after a simulated delay; with an `upstream` LLM, records misses instead."""
+
+    llm_type: str = "replay"
+    store: Any = None
+    upstream: Any = None
+    latency: float = 0.0
+    token_latency: float = 0.0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, response_model=None):
+        messages = self._format_messages(messages)
+        key = prompt_key(self.model, messages)
+        role, shape = describe_prompt(messages)
+        response = None if self.upstream is not None else self.store.lookup(key, role, shape)
+        if response is None:
+            if self.upstream is None:
+                raise RuntimeError(f"No recorded response for a '{role or 'unknown'}' prompt in {self.store.directory}")
+            response = str(self.upstream.call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions, from_task=from_task, from_agent=from_agent))
+            self.store.save(key, role, shape, response)
+        prompt_tokens = count_tokens("\n".join(str(m.get("content", "")) for m in messages))
+        completion_tokens = count_tokens(response)
+        if self.upstream is None:
+            if self.latency or self.token_latency:
+                time.sleep(self.latency + completion_tokens * self.token_latency)
+            # When recording, the upstream LLM reports its provider counts itself
+            add_llm_usage(prompt_tokens, completion_tokens)
+        self._track_token_usage_internal({
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        })
+        return response
+
+    def supports_function_calling(self) -> bool:
+        return False
+
+
+def metered(llm):
+    """Also report each call's provider-counted tokens to the caller's `telemetry.llm_usage()` block.
+
+    crewai only adds them to the instance's lifetime totals, which every
+    request sharing the LLM contributes to.
+    """
+    track = llm._track_token_usage_internal
+
+    def track_and_meter(usage_data):
+        track(usage_data)
+        metrics = UsageMetrics.from_provider_dict(usage_data)
+        if metrics is not None:
+            add_llm_usage(metrics.prompt_tokens, metrics.completion_tokens)
+
+    # An instance attribute, outside pydantic's fields, shadows the method for this LLM only
+    object.__setattr__(llm, "_track_token_usage_internal", track_and_meter)
+    return llm
+
+
+class OpenAIBackend:
+    name = "openai"
+
+    def __init__(self, model: str = MODEL):
+        self.model = model
+
+    def create_llm(self, temperature: float):
+        return metered(LLM(model=self.model, temperature=temperature, **CLIENT_OPTIONS))
+
+    def missing_configuration(self):
+        """Why this backend cannot serve requests, or None when it is ready."""
+        if not os.getenv("OPENAI_API_KEY"):
+            return "OpenAI API key not found. Please check environment variables."
+        return None
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "model": self.model}
+
+
+class CompatibleBackend(OpenAIBackend):
+    """Any server speaking the OpenAI chat completions API; local servers usually ignore the key."""
+
+    name = "compatible"
+
+    def __init__(self, model: str = MODEL, base_url: str = LLM_BASE_URL, api_key: str = LLM_API_KEY):
+        super().__init__(model)
+        self.base_url = base_url
+        self.api_key = api_key or "not-needed"
+
+    def create_llm(self, temperature: float):
+        return metered(LLM(model=self.model, base_url=self.base_url, api_key=self.api_key, provider="openai", temperature=temperature, **CLIENT_OPTIONS))
+
+    def missing_configuration(self):
+        return None
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "model": self.model, "base_url": self.base_url}
+
+
+class ReplayBackend(OpenAIBackend):
+    name = "replay"
+
+    def __init__(self, model: str = MODEL, directory: str = REPLAY_DIR, latency: float = REPLAY_LATENCY, token_latency: float = REPLAY_TOKEN_LATENCY):
+        super().__init__(model)
+        self.store = ReplayStore(directory)
+        self.latency = latency
+        self.token_latency = token_latency
+
+    def create_llm(self, temperature: float):
+        return ReplayLLM(model=self.model, temperature=temperature, store=self.store, latency=self.latency, token_latency=self.token_latency)
+
+    def missing_configuration(self):
+        return None
+
+    def describe(self) -> dict:
+        return {"backend": self.name, "model": self.model, "latency": self.latency, "token_latency": self.token_latency, **self.store.stats()}
+
+
+class RecordBackend(ReplayBackend):
+    name = "record"
+
+    def create_llm(self, temperature: float):
+        return ReplayLLM(model=self.model, temperature=temperature, store=self.store, upstream=super(ReplayBackend, self).create_llm(temperature))
+
+    def missing_configuration(self):
+        return OpenAIBackend.missing_configuration(self)
+
+
+BACKENDS = {
+    "openai": OpenAIBackend,
+    "compatible": CompatibleBackend,
+    "replay": ReplayBackend,
+    "record": RecordBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """The process-wide backend selected by LLM_BACKEND, created on first use."""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if LLM_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown LLM_BACKEND '{LLM_BACKEND}', expected one of {', '.join(BACKENDS)}")
+            _backend = BACKENDS[LLM_BACKEND]()
+        return _backend
@@ -0,0 +1,424 @@
+"""Central scheduler for every LLM request.
+
+Agents share one LLM per temperature (`agents.shared_llm`). With the scheduler
+on, each is wrapped in a ScheduledLLM, so completions from all concurrent jobs
+pass through one place that, per key (endpoint and model):
+
+- admits requests under token buckets for requests and tokens per minute and
+  a cap on calls in flight;
+- serves waiting requests by priority, interactive before batch (batch work
+  runs inside `llm_priority("batch")`), first come first served within one;
+- retries rate limits, server errors and timeouts with exponential backoff
+  and full jitter, honouring Retry-After; a 429 pauses the whole key so other
+  requests do not pile onto the limit;
+- with `LLM_HEDGE_AFTER` set, sends a duplicate of a call that has not
+  answered in time, if there is spare capacity, and takes the first answer.
+
+Counters and queue-wait spans go to telemetry (/metrics); `/health` shows
+per-key queue state under `llm_scheduler`.
+"""
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError as FutureTimeout, wait
+from contextlib import contextmanager
+from typing import Any
+
+from crewai.llms.base_llm import BaseLLM, call_stop_override
+
+from .prompt_budget import count_tokens
+from .shared_state import WORKERS
+from .telemetry import telemetry, record_span
+
+
+def _worker_share(limit: int) -> int:
+    # Each of the WORKERS processes schedules its own share of a deployment-wide limit; 0 stays unlimited
+    return max(1, limit // WORKERS) if limit else 0
+
+
+LLM_SCHEDULER = os.getenv("LLM_SCHEDULER", "true").lower() == "true"
+# Provider limits per key for the whole deployment; 0 disables a bucket. Defaults match OpenAI's first usage tier for gpt-4o-mini
+LLM_RPM = _worker_share(int(os.getenv("LLM_RPM", "500")))
+LLM_TPM = _worker_share(int(os.getenv("LLM_TPM", "200000")))
+# Seconds of the per-minute allowance that may go out at once; providers enforce limits over
+# windows shorter than a minute, so a full minute's burst would still draw 429s
+LLM_BURST_SECONDS = float(os.getenv("LLM_BURST_SECONDS", "10"))
+LLM_MAX_CONCURRENCY = _worker_share(int(os.getenv("LLM_MAX_CONCURRENCY", "16")))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "20"))
+# Seconds before a slow call gets a duplicate; 0 disables hedging
+LLM_HEDGE_AFTER = float(os.getenv("LLM_HEDGE_AFTER", "0"))
+# Threads for primaries and hedges when LLM_MAX_CONCURRENCY is 0 (uncapped)
+HEDGE_POOL_SIZE = int(os.getenv("LLM_HEDGE_POOL_SIZE", "32"))
+# Completion tokens reserved from the token bucket until the real count is known
+LLM_COMPLETION_ESTIMATE = int(os.getenv("LLM_COMPLETION_ESTIMATE", "400"))
+# Longest a request may wait for admission before failing
+LLM_QUEUE_TIMEOUT = float(os.getenv("LLM_QUEUE_TIMEOUT", "120"))
+
+# Options for the provider client: the scheduler owns retries, and the OpenAI SDK's own would hide 429s from it
+CLIENT_OPTIONS = {"max_retries": 0} if LLM_SCHEDULER else {}
+
+PRIORITIES = {"interactive": 0, "batch": 1}
+RETRYABLE_STATUS = {408: "timeout", 429: "rate_limit", 500: "server_error", 502: "server_error", 503: "server_error", 504: "timeout"}
+RETRYABLE_NAMES = (("ratelimit", "rate_limit"), ("timeout", "timeout"), ("connection", "server_error"), ("serviceunavailable", "server_error"), ("internalserver", "server_error"))
+
+_priority = contextvars.ContextVar("llm_priority", default="interactive")
+
+
+class SchedulerTimeout(RuntimeError):
+    """A request waited longer than LLM_QUEUE_TIMEOUT for admission."""
+
+
+class LLMRequestFailed(RuntimeError):
+    """Retries exhausted; deliberately not classed as a rate limit so outer retry layers do not repeat them."""
+
+
+@contextmanager
+def llm_priority(name: str):
+    """Run the block's LLM calls at `name` priority ("interactive" or "batch")."""
+    if name not in PRIORITIES:
+        raise ValueError(f"Unknown LLM priority '{name}', expected one of {', '.join(PRIORITIES)}")
+    token = _priority.set(name)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def _error_chain(error: BaseException):
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        yield error
+        error = error.__cause__ or error.__context__
+
+
+def retry_reason(error: BaseException):
+    """Why `error` is worth retrying ("rate_limit", "server_error" or "timeout"), or None."""
+    for candidate in _error_chain(error):
+        status = getattr(candidate, "status_code", None) or getattr(getattr(candidate, "response", None), "status_code", None)
+        if isinstance(status, int):
+            return RETRYABLE_STATUS.get(status)
+        name = type(candidate).__name__.lower()
+        for marker, reason in RETRYABLE_NAMES:
+            if marker in name:
+                return reason
+    return None
+
+
+def retry_after(error: BaseException):
+    """Seconds from a Retry-After header on the error's HTTP response, if any."""
+    for candidate in _error_chain(error):
+        headers = getattr(getattr(candidate, "response", None), "headers", None) or getattr(candidate, "headers", None)
+        if headers is None:
+            continue
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+            return max(0.0, float(value)) if value is not None else None
+        except (AttributeError, TypeError, ValueError):
+            continue
+    return None
+
+
+def backoff_delay(attempt: int, base: float = LLM_BACKOFF_BASE, cap: float = LLM_BACKOFF_MAX, hint: float = None) -> float:
+    """Full-jitter exponential backoff for retry `attempt` (0-based); a Retry-After hint is a floor."""
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    return max(delay, hint) if hint is not None else delay
+
+
+class TokenBucket:
+    """`per_minute` units a minute, bursting to `burst_seconds` worth of them; 0 means unlimited.
+
+    Not thread-safe on its own: the owning KeyScheduler holds its lock.
+    """
+
+    def __init__(self, per_minute: int, burst_seconds: float = LLM_BURST_SECONDS):
+        self.per_minute = per_minute
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self.level = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until `amount` can be taken; a request larger than the bucket waits for a full one."""
+        if not self.per_minute:
+            return 0.0
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float, now: float):
+        if self.per_minute:
+            self._refill(now)
+            self.level -= amount
+
+    def settle(self, reserved: float, used: float):
+        """Correct an estimate once the real amount is known; the level may go negative (debt)."""
+        if self.per_minute:
+            self.level = min(self.capacity, self.level + reserved - used)
+
+
+class KeyScheduler:
+    """Admission control for one key: a priority queue in front of the buckets and the concurrency cap."""
+
+    def __init__(self, key: str, rpm: int, tpm: int, max_concurrency: int, burst_seconds: float = LLM_BURST_SECONDS):
+        self.key = key
+        self.requests = TokenBucket(rpm, burst_seconds)
+        self.tokens = TokenBucket(tpm, burst_seconds)
+        self.max_concurrency = max_concurrency
+        self.active = 0
+        self.paused_until = 0.0
+        self.admitted = 0
+        self.rate_limited = 0
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._cond = threading.Condition()
+        self._waiting = []   # heap of (priority, sequence) tickets
+        self._sequence = itertools.count()
+
+    def _delay(self, tokens: int, now: float):
+        # None: wait for a running call to finish; otherwise seconds until the buckets allow it.
+        # A max_concurrency of 0 means no cap
+        if 0 < self.max_concurrency <= self.active:
+            return None
+        return max(self.paused_until - now, self.requests.delay(1, now), self.tokens.delay(tokens, now))
+
+    def _admit(self, tokens: int, now: float):
+        self.requests.take(1, now)
+        self.tokens.take(tokens, now)
+        self.active += 1
+        self.admitted += 1
+
+    def acquire(self, priority: int, tokens: int, timeout: float = LLM_QUEUE_TIMEOUT):
+        """Block until this request is first in line and within every limit."""
+        ticket = (priority, next(self._sequence))
+        deadline = time.monotonic() + timeout if timeout else None
+        with self._cond:
+            heapq.heappush(self._waiting, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    delay = self._delay(tokens, now) if self._waiting[0] == ticket else None
+                    if delay is not None and delay <= 0:
+                        heapq.heappop(self._waiting)
+                        self._admit(tokens, now)
+                        # The next ticket is now first in line
+                        self._cond.notify_all()
+                        return
+                    if deadline is not None:
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            raise SchedulerTimeout(f"Waited over {timeout:.0f}s for LLM capacity on {self.key}")
+                        delay = remaining if delay is None else min(delay, remaining)
+                    self._cond.wait(delay)
+            except BaseException:
+                if ticket in self._waiting:
+                    self._waiting.remove(ticket)
+                    heapq.heapify(self._waiting)
+                    self._cond.notify_all()
+                raise
+
+    def try_acquire(self, priority: int, tokens: int) -> bool:
+        """Admit without waiting, unless a request of the same or higher priority is queued
+        (used for hedges, which must not jump their own line)."""
+        with self._cond:
+            now = time.monotonic()
+            delay = None if self._waiting and self._waiting[0][0] <= priority else self._delay(tokens, now)
+            if delay is None or delay > 0:
+                return False
+            self._admit(tokens, now)
+            return True
+
+    def release(self, reserved: int, used: int):
+        with self._cond:
+            self.active -= 1
+            self.tokens.settle(reserved, used)
+            self._cond.notify_all()
+
+    def note(self, counter: str):
+        """Bump one of the retries / hedges / hedge_wins counters."""
+        with self._cond:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def pause(self, seconds: float):
+        """Hold every request on this key, e.g. after a 429."""
+        with self._cond:
+            self.rate_limited += 1
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self._cond.notify_all()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "queued": len(self._waiting),
+                "in_flight": self.active,
+                "admitted": self.admitted,
+                "rate_limited": self.rate_limited,
+                "retries": self.retries,
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "paused_for": round(max(0.0, self.paused_until - time.monotonic()), 3),
+            }
+
+
+class LLMScheduler:
+    def __init__(self, rpm: int = LLM_RPM, tpm: int = LLM_TPM, max_concurrency: int = LLM_MAX_CONCURRENCY,
+                 burst_seconds: float = LLM_BURST_SECONDS, max_retries: int = LLM_MAX_RETRIES, hedge_after: float = LLM_HEDGE_AFTER,
+                 completion_estimate: int = LLM_COMPLETION_ESTIMATE, queue_timeout: float = LLM_QUEUE_TIMEOUT):
+        self.rpm = rpm
+        self.tpm = tpm
+        self.max_concurrency = max_concurrency
+        self.burst_seconds = burst_seconds
+        self.max_retries = max_retries
+        self.hedge_after = hedge_after
+        self.completion_estimate = completion_estimate
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._keys = {}
+        self._hedge_pool = None
+        if hedge_after:
+            # Primaries and hedges each hold an admission slot, so two threads per slot at most;
+            # without a concurrency cap the pool itself bounds calls in flight
+            workers = 2 * max_concurrency if max_concurrency > 0 else HEDGE_POOL_SIZE
+            self._hedge_pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-hedge")
+
+    def limiter(self, key: str) -> KeyScheduler:
+        with self._lock:
+            if key not in self._keys:
+                self._keys[key] = KeyScheduler(key, self.rpm, self.tpm, self.max_concurrency, self.burst_seconds)
+            return self._keys[key]
+
+    def call(self, key: str, fn, prompt_tokens: int) -> str:
+        """Run `fn()` (one completion) under the key's limits, with retries and optional hedging."""
+        limiter = self.limiter(key)
+        priority = _priority.get()
+        reserved = prompt_tokens + self.completion_estimate
+        last_error = None
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            limiter.acquire(PRIORITIES[priority], reserved, self.queue_timeout)
+            record_span("llm.queue_wait", time.perf_counter() - started, {"priority": priority})
+            try:
+                response = self._attempt(limiter, PRIORITIES[priority], fn, prompt_tokens, reserved)
+                telemetry.count("ats_llm_requests_total", priority=priority, outcome="ok")
+                return response
+            except Exception as e:
+                reason = retry_reason(e)
+                if reason is None:
+                    telemetry.count("ats_llm_requests_total", priority=priority, outcome="error")
+                    raise
+                last_error = e
+            telemetry.count("ats_llm_retries_total", reason=reason)
+            limiter.note("retries")
+            if attempt == self.max_retries:
+                break
+            delay = backoff_delay(attempt, hint=retry_after(last_error))
+            if reason == "rate_limit":
+                # Everyone on the key waits, not just this request; acquire() honours the pause
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+        telemetry.count("ats_llm_requests_total", priority=priority, outcome="gave_up")
+        # Raised outside the except block so the provider error is not chained as its cause
+        raise LLMRequestFailed(f"LLM request on {key} failed after {self.max_retries + 1} attempts ({type(last_error).__name__}: {str(last_error)[:200]})")
+
+    def _run(self, limiter: KeyScheduler, fn, prompt_tokens: int, reserved: int) -> str:
+        # Caller already holds an admission slot
+        used = 0
+        try:
+            response = fn()
+            used = prompt_tokens + count_tokens(str(response))
+            return response
+        finally:
+            limiter.release(reserved, used)
+
+    def _attempt(self, limiter: KeyScheduler, priority: int, fn, prompt_tokens: int, reserved: int) -> str:
+        if self._hedge_pool is None:
+            return self._run(limiter, fn, prompt_tokens, reserved)
+        primary = self._hedge_pool.submit(contextvars.copy_context().run, self._run, limiter, fn, prompt_tokens, reserved)
+        try:
+            return primary.result(timeout=self.hedge_after)
+        except FutureTimeout:
+            if primary.done():
+                # The call itself raised a TimeoutError
+                return primary.result()
+        if not limiter.try_acquire(priority, reserved):
+            return primary.result()
+        telemetry.count("ats_llm_hedges_total", outcome="sent")
+        limiter.note("hedges")
+        hedge = self._hedge_pool.submit(contextvars.copy_context().run, self._run, limiter, fn, prompt_tokens, reserved)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        telemetry.count("ats_llm_hedges_total", outcome="won")
+                        limiter.note("hedge_wins")
+                    # The slower call finishes in the background and releases its own slot
+                    return future.result()
+        return primary.result()
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = dict(self._keys)
+        return {
+            "rpm": self.rpm,
+            "tpm": self.tpm,
+            "max_concurrency": self.max_concurrency,
+            "hedge_after": self.hedge_after,
+            "keys": {key: limiter.stats() for key, limiter in keys.items()},
+        }
+
+
+scheduler = LLMScheduler()
+
+
+class ScheduledLLM(BaseLLM):
+    """Any LLM, with its calls admitted, retried and hedged by the scheduler."""
+
+    llm_type: str = "scheduled"
+    inner: Any = None
+    scheduler: Any = None
+    key: str = ""
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, response_model=None):
+        text = messages if isinstance(messages, str) else "\n".join(str(m.get("content", "")) for m in messages)
+        # Stop words crewai sets on this wrapper apply to the wrapped LLM; the context is copied into hedge threads
+        with call_stop_override(self.inner, self.stop_sequences or None):
+            return self.scheduler.call(
+                self.key,
+                lambda: self.inner.call(messages, tools=tools, callbacks=callbacks, available_functions=available_functions, from_task=from_task, from_agent=from_agent, response_model=response_model),
+                count_tokens(text),
+            )
+
+    def get_token_usage_summary(self):
+        # The wrapped LLM counts real usage, hedged duplicates included
+        return self.inner.get_token_usage_summary()
+
+    def supports_function_calling(self) -> bool:
+        return self.inner.supports_function_calling()
+
+    def supports_stop_words(self) -> bool:
+        return self.inner.supports_stop_words()
+
+    def get_context_window_size(self) -> int:
+        return self.inner.get_context_window_size()
+
+
+def scheduled(llm):
+    """Wrap `llm` in the scheduler (keyed by its endpoint and model) unless LLM_SCHEDULER is off."""
+    if not LLM_SCHEDULER:
+        return llm
+    key = f"{getattr(llm, 'base_url', None) or llm.llm_type}/{llm.model}"
+    return ScheduledLLM(model=llm.model, temperature=llm.temperature, inner=llm, scheduler=scheduler, key=key)
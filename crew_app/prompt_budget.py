@@ -0,0 +1,303 @@
+"""Token budgets for stage prompts.
+
+Instead of cutting the resume and job description at fixed character offsets,
+each stage gets a token budget. Inputs are first compacted (whitespace and
+extraction artifacts collapsed, repeated boilerplate lines dropped) and the
+job description is reduced to its most requirement-heavy sentences. The
+resume body is never shortened: one that does not fit is split into chunks,
+between sections where possible, and the stage runs once per chunk.
+
+Token counts use tiktoken when it is installed and a close heuristic
+otherwise.
+"""
+import os
+import re
+import threading
+
+from .ats_scorer import extract_keywords, extract_terms, tokenize, is_heading
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+ENCODING_MODEL = "gpt-4o-mini"
+
+# Default input budget (tokens) per stage and the share of it the job description may take
+# Whole-resume stages take a typical two-page resume (about 1,500 tokens) with room to spare
+DEFAULT_BUDGETS = {
+    "parse": 3000,
+    "rewrite": 4000,
+    "refine": 3000,
+    "rewrite_refine": 4000,
+    "rewrite_section": 1500,
+    "refine_section": 1200,
+    "evaluate": 4000,
+    "keywords": 3000,
+    "skills": 3000,
+    "industry": 3000,
+    "formatting": 3000,
+    "qa": 3000,
+}
+JD_SHARE = {
+    "rewrite": 0.25,
+    "rewrite_refine": 0.25,
+    "rewrite_section": 0.35,
+    "evaluate": 0.2,
+    "keywords": 0.3,
+    "skills": 0.3,
+    "industry": 0.3,
+    "qa": 0.25,
+}
+
+WORD_RE = re.compile(r"\w+|[^\w\s]")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?;])\s+|\n+")
+PAGE_ARTIFACT_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+CONTROL_RE = re.compile("[\x00-\x08\x0b\x0c\x0e-\x1f\u200b\ufeff]")
+SPACES_RE = re.compile("[ \t\u00a0]+")
+
+# Phrases that mark what a candidate must have; sentences with them are kept first
+REQUIREMENT_CUES = (
+    "must", "required", "requirement", "experience with", "experience in", "proficien", "years",
+    "knowledge of", "familiar", "degree", "expertise", "hands-on", "strong", "responsib",
+)
+# Job-ad boilerplate that says nothing about the role
+BOILERPLATE_CUES = (
+    "equal opportunity", "benefits", "about us", "we offer", "apply now", "salary", "diversity",
+    "accommodation", "background check", "401k", "paid time off",
+)
+
+# Only lines at least this long are treated as duplicated boilerplate
+MIN_DEDUP_WORDS = 5
+
+
+def _encoder():
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(ENCODING_MODEL)
+    except Exception:
+        return tiktoken.get_encoding("o200k_base")
+
+
+_ENCODER = _encoder()
+
+
+def count_tokens(text: str) -> int:
+    """Exact with tiktoken; otherwise about one token per 4 characters of each word, one per symbol."""
+    if not text:
+        return 0
+    if _ENCODER is not None:
+        return len(_ENCODER.encode(text))
+    return sum((len(piece) + 3) // 4 for piece in WORD_RE.findall(text))
+
+
+def stage_budget(stage: str) -> int:
+    return int(os.getenv(f"PROMPT_BUDGET_{stage.upper()}", str(DEFAULT_BUDGETS.get(stage, 3000))))
+
+
+def compact(text: str) -> str:
+    """Collapse whitespace, drop page-number artifacts and repeated lines, keep one blank line between blocks."""
+    lines = []
+    seen = set()
+    for line in CONTROL_RE.sub("", text.replace("\r", "\n")).split("\n"):
+        line = SPACES_RE.sub(" ", line).strip()
+        if not line:
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if PAGE_ARTIFACT_RE.match(line):
+            continue
+        # Headers, footers and paragraphs repeated on every page or pasted twice; short lines
+        # such as a job title held twice are legitimate repeats
+        key = line.lower()
+        if len(line.split()) >= MIN_DEDUP_WORDS:
+            if key in seen:
+                continue
+            seen.add(key)
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+
+def _sentences(text: str) -> list:
+    """Sentences and lines, without repeats."""
+    seen = set()
+    sentences = []
+    for sentence in SENTENCE_SPLIT_RE.split(text):
+        sentence = sentence.strip()
+        if sentence and sentence.lower() not in seen:
+            seen.add(sentence.lower())
+            sentences.append(sentence)
+    return sentences
+
+
+def _cut(text: str, budget: int) -> str:
+    """Last resort for a single oversized piece: keep whole words up to the budget."""
+    kept = []
+    used = 0
+    for word in text.split():
+        used += count_tokens(" " + word)
+        if used > budget:
+            break
+        kept.append(word)
+    return " ".join(kept) + " ..."
+
+
+def _select(pieces: list, scores: list, budget: int) -> list:
+    """Indices of the best-scoring pieces that fit in `budget`, in original order."""
+    costs = [count_tokens(piece) + 1 for piece in pieces]
+    chosen = set()
+    used = 0
+    for i in sorted(range(len(pieces)), key=lambda i: -scores[i]):
+        if scores[i] <= 0:
+            continue
+        if used + costs[i] <= budget:
+            chosen.add(i)
+            used += costs[i]
+    return sorted(chosen)
+
+
+def salient_requirements(job_title: str, job_description: str, budget: int) -> str:
+    """Reduce a job description to the sentences that say the most about the role, within `budget`."""
+    text = compact(job_description)
+    if count_tokens(text) <= budget:
+        return text
+    sentences = _sentences(text)
+    keywords = extract_keywords(job_title, job_description)
+    scores = []
+    for sentence in sentences:
+        low = sentence.lower()
+        score = sum(keywords.get(term, 0.0) for term in set(extract_terms(tokenize(sentence))))
+        if any(cue in low for cue in REQUIREMENT_CUES):
+            score *= 1.5
+        if any(cue in low for cue in BOILERPLATE_CUES):
+            score *= 0.1
+        scores.append(score)
+    chosen = _select(sentences, scores, budget)
+    if not chosen:
+        return _cut(sentences[max(range(len(sentences)), key=lambda i: scores[i])], budget)
+    return "\n".join(sentences[i] for i in chosen)
+
+
+def _split_line(line: str, budget: int) -> list:
+    """A line longer than the budget, as sentence (or, failing that, word) pieces that each fit."""
+    pieces = []
+    for sentence in SENTENCE_SPLIT_RE.split(line):
+        sentence = sentence.strip()
+        if not sentence:
+            continue
+        if count_tokens(sentence) <= budget:
+            pieces.append(sentence)
+            continue
+        words = []
+        for word in sentence.split():
+            if words and count_tokens(" ".join(words + [word])) > budget:
+                pieces.append(" ".join(words))
+                words = []
+            words.append(word)
+        pieces.append(" ".join(words))
+    return pieces
+
+
+def fit_resume(resume_text: str, budget: int) -> list:
+    """Return the compacted resume as chunks of at most `budget` tokens; nothing is left out.
+
+    Most resumes fit in one chunk. A longer one is split between sections,
+    and a section longer than the budget between its lines, so each chunk
+    can go to its own LLM call and the outputs be joined in order.
+    """
+    text = compact(resume_text)
+    if count_tokens(text) <= budget:
+        return [text]
+    sections = []
+    for line in text.split("\n"):
+        if not sections or (line and is_heading(line)):
+            sections.append([])
+        sections[-1].append(line)
+    units = []
+    for lines in sections:
+        section = "\n".join(lines).strip()
+        if count_tokens(section) <= budget:
+            units.append(section)
+            continue
+        for line in lines:
+            units.extend(_split_line(line, budget) if count_tokens(line) > budget else [line])
+    chunks = []
+    current = []
+    used = 0
+    for unit in units:
+        cost = count_tokens(unit) + 1
+        if current and used + cost > budget:
+            chunks.append("\n".join(current).strip())
+            current = []
+            used = 0
+        current.append(unit)
+        used += cost
+    chunks.append("\n".join(current).strip())
+    return [chunk for chunk in chunks if chunk]
+
+
+class PromptStats:
+    """Per-stage token accounting: what budgeting saved and what each LLM call sent and received."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+
+    def _stage(self, stage: str) -> dict:
+        return self._stages.setdefault(stage, {
+            "prompts": 0, "raw_tokens": 0, "budgeted_tokens": 0, "chunks": 0,
+            "calls": 0, "input_tokens": 0, "output_tokens": 0,
+        })
+
+    def record_budget(self, stage: str, raw_tokens: int, budgeted_tokens: int, chunks: int):
+        with self._lock:
+            s = self._stage(stage)
+            s["prompts"] += 1
+            s["raw_tokens"] += raw_tokens
+            s["budgeted_tokens"] += budgeted_tokens
+            s["chunks"] += chunks
+
+    def record_call(self, stage: str, input_tokens: int, output_tokens: int):
+        with self._lock:
+            s = self._stage(stage)
+            s["calls"] += 1
+            s["input_tokens"] += input_tokens
+            s["output_tokens"] += output_tokens
+
+    def stats(self) -> dict:
+        with self._lock:
+            report = {"tokenizer": "tiktoken" if _ENCODER is not None else "estimate", "stages": {}}
+            for stage, s in self._stages.items():
+                entry = dict(s)
+                entry["avg_input_tokens"] = round(s["input_tokens"] / s["calls"], 1) if s["calls"] else 0.0
+                entry["avg_output_tokens"] = round(s["output_tokens"] / s["calls"], 1) if s["calls"] else 0.0
+                report["stages"][stage] = entry
+            return report
+
+
+prompt_stats = PromptStats()
+
+def budget_inputs(stage: str, resume_text: str, job_title: str = "", job_description: str = "", jd_text: str = None):
+    """Split the stage budget between job description and resume; return (resume chunks, jd) ready for the prompt.
+
+    Only the job description is shortened to fit; the resume gets the rest of
+    the budget and is chunked when it needs more. `jd_text` (a job profile)
+    replaces the budgeted job description when given.
+    """
+    budget = stage_budget(stage)
+    jd = ""
+    if job_description and JD_SHARE.get(stage):
+        jd_budget = int(budget * JD_SHARE[stage])
+        if jd_text is None:
+            jd = salient_requirements(job_title, job_description, jd_budget)
+        else:
+            jd = jd_text if count_tokens(jd_text) <= jd_budget else _cut(jd_text, jd_budget)
+    chunks = fit_resume(resume_text, budget - count_tokens(jd))
+    prompt_stats.record_budget(
+        stage,
+        count_tokens(resume_text) + (count_tokens(job_description) if jd else 0),
+        sum(count_tokens(chunk) for chunk in chunks) + count_tokens(jd),
+        len(chunks),
+    )
+    return chunks, jd
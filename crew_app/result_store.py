@@ -0,0 +1,168 @@
+"""Persistent store of finished pipeline results, keyed by job id.
+
+Downloads look results up by id instead of the client re-posting the resume
+text, and results outlive the in-memory job table (and server restarts).
+`RESULT_STORE` picks the backend: `sqlite` (default) or `memory`. Entries
+expire after `RESULT_TTL_SECONDS`; once the stored results exceed
+`RESULT_STORE_MAX_BYTES` the oldest are evicted.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+RESULT_STORE = os.getenv("RESULT_STORE", "sqlite")
+RESULT_STORE_PATH = os.getenv("RESULT_STORE_PATH", "data/results.db")
+RESULT_TTL_SECONDS = int(os.getenv("RESULT_TTL_SECONDS", str(7 * 86400)))
+RESULT_STORE_MAX_BYTES = int(os.getenv("RESULT_STORE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Stored text fields that can be rendered for download
+RESULT_FIELDS = ("cleaned", "rewritten", "final")
+
+
+class MemoryResultStore:
+    """Results in a process-local dict; lost on restart. The reference for other backends."""
+
+    name = "memory"
+
+    def __init__(self, ttl_seconds: int = RESULT_TTL_SECONDS, max_bytes: int = RESULT_STORE_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # result_id -> (payload, created_at)
+        self._bytes = 0
+
+    def put(self, result_id: str, result: dict):
+        payload = json.dumps(result)
+        now = time.time()
+        with self._lock:
+            self._remove(result_id)
+            self._entries[result_id] = (payload, now)
+            self._bytes += len(payload)
+            self._evict(now)
+
+    def get(self, result_id: str):
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return None
+            payload, created_at = entry
+            if time.time() - created_at >= self.ttl_seconds:
+                self._remove(result_id)
+                return None
+        return _record(result_id, payload, created_at, self.ttl_seconds)
+
+    def delete(self, result_id: str) -> bool:
+        with self._lock:
+            return self._remove(result_id)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"backend": self.name, "entries": len(self._entries), "bytes": self._bytes, "max_bytes": self.max_bytes}
+
+    def close(self):
+        pass
+
+    def _remove(self, result_id: str) -> bool:
+        # Caller holds the lock
+        entry = self._entries.pop(result_id, None)
+        if entry is None:
+            return False
+        self._bytes -= len(entry[0])
+        return True
+
+    def _evict(self, now: float):
+        # Caller holds the lock; entries are in insertion (creation) order
+        while self._entries:
+            result_id, (payload, created_at) = next(iter(self._entries.items()))
+            if now - created_at < self.ttl_seconds and self._bytes <= self.max_bytes:
+                return
+            self._remove(result_id)
+
+
+class SQLiteResultStore:
+    name = "sqlite"
+
+    def __init__(self, path: str = RESULT_STORE_PATH, ttl_seconds: int = RESULT_TTL_SECONDS, max_bytes: int = RESULT_STORE_MAX_BYTES):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            "id TEXT PRIMARY KEY, payload TEXT NOT NULL, size INTEGER NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS results_created_at ON results (created_at)")
+        self._db.commit()
+
+    def put(self, result_id: str, result: dict):
+        payload = json.dumps(result)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO results (id, payload, size, created_at) VALUES (?, ?, ?, ?)",
+                (result_id, payload, len(payload), now),
+            )
+            self._evict(now)
+            self._db.commit()
+
+    def get(self, result_id: str):
+        with self._lock:
+            row = self._db.execute("SELECT payload, created_at FROM results WHERE id = ?", (result_id,)).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl_seconds:
+            return None
+        return _record(result_id, row[0], row[1], self.ttl_seconds)
+
+    def delete(self, result_id: str) -> bool:
+        with self._lock:
+            deleted = self._db.execute("DELETE FROM results WHERE id = ?", (result_id,)).rowcount
+            self._db.commit()
+        return deleted > 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"backend": self.name, "path": self.path, "entries": count, "bytes": size, "max_bytes": self.max_bytes}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _evict(self, now: float):
+        # Caller holds the lock
+        self._db.execute("DELETE FROM results WHERE created_at < ?", (now - self.ttl_seconds,))
+        (total,) = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()
+        if total <= self.max_bytes:
+            return
+        # Oldest first until the running total fits
+        excess = total - self.max_bytes
+        stale = []
+        for result_id, size in self._db.execute("SELECT id, size FROM results ORDER BY created_at ASC"):
+            if excess <= 0:
+                break
+            stale.append((result_id,))
+            excess -= size
+        self._db.executemany("DELETE FROM results WHERE id = ?", stale)
+
+
+def _record(result_id: str, payload: str, created_at: float, ttl_seconds: int) -> dict:
+    return {"result_id": result_id, "created_at": created_at, "expires_at": created_at + ttl_seconds, **json.loads(payload)}
+
+
+RESULT_STORES = {
+    "sqlite": SQLiteResultStore,
+    "memory": MemoryResultStore,
+}
+
+
+def create_result_store(backend: str = RESULT_STORE):
+    if backend not in RESULT_STORES:
+        raise ValueError(f"Unknown RESULT_STORE '{backend}', expected one of {', '.join(RESULT_STORES)}")
+    return RESULT_STORES[backend]()
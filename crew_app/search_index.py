@@ -0,0 +1,310 @@
+"""On-disk inverted index over cleaned resumes with BM25 top-k queries.
+
+Layout of the index directory:
+
+    postings.bin   uint32 (doc_num, tf) pairs, grouped by term; memory-mapped for queries
+    lexicon.json   {term: [first_pair, pair_count]} into postings.bin
+    docs.json      document table and the next document number
+    delta.jsonl    adds/deletes since the last compaction, replayed on open
+
+    index.lock     advisory lock shared by every process using the directory
+
+Adds land in an in-memory delta (and the append-only log) and are merged into
+postings.bin by `compact()`, which runs automatically once the delta grows.
+
+Several API workers may open the same directory. Writes hold an exclusive
+lock on index.lock and reads a shared one, and every operation first catches
+up with the others: new delta.jsonl lines are replayed, and a compaction
+elsewhere (seen as a new docs.json) triggers a full reload. Document numbers
+are therefore allocated by one writer at a time, and a compaction never
+drops another worker's adds.
+"""
+import heapq
+import json
+import math
+import mmap
+import os
+import threading
+import uuid
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+
+from .ats_scorer import tokenize, extract_terms, extract_keywords
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where the index must stay with a single process
+    fcntl = None
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+COMPACT_THRESHOLD = 1000
+
+
+class ResumeIndex:
+    def __init__(self, path: str, compact_threshold: int = COMPACT_THRESHOLD):
+        self.path = path
+        self.compact_threshold = compact_threshold
+        self._lock = threading.RLock()
+        self._postings_file = None
+        self._mmap = None
+        self._postings = None
+        os.makedirs(path, exist_ok=True)
+        self._lock_file = open(os.path.join(path, "index.lock"), "a+")
+        with self._file_lock(exclusive=False):
+            self._reset()
+            self._load()
+
+    # -- public API -------------------------------------------------------
+
+    def add(self, text: str, doc_id: str = None, name: str = None) -> str:
+        """Index a cleaned resume. Re-adding an existing id replaces it."""
+        doc_id = doc_id or uuid.uuid4().hex
+        counts = Counter(extract_terms(tokenize(text)))
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            if doc_id in self._by_id:
+                self._delete(doc_id)
+            doc_num = self._next_num
+            self._next_num += 1
+            self._apply_add(doc_num, doc_id, name or doc_id, sum(counts.values()), counts)
+            self._log({"op": "add", "num": doc_num, "id": doc_id, "name": name or doc_id, "tf": counts})
+            if self._delta_docs >= self.compact_threshold:
+                self._compact()
+        return doc_id
+
+    def delete(self, doc_id: str) -> bool:
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            if doc_id not in self._by_id:
+                return False
+            self._delete(doc_id)
+            return True
+
+    def search(self, job_title: str, job_description: str, top_k: int = 10) -> list:
+        """Top-k resumes for a job posting, scored with BM25 over the posting's weighted keywords."""
+        query = extract_keywords(job_title, job_description)
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            live = len(self._docs)
+            if not live or not query:
+                return []
+            avg_length = sum(d["length"] for d in self._docs.values()) / live or 1.0
+            length_norms = {}
+            scores = {}
+            for term, weight in query.items():
+                postings = self._term_postings(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (live - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_num, tf in postings.items():
+                    length_norm = length_norms.get(doc_num)
+                    if length_norm is None:
+                        length_norm = length_norms[doc_num] = 1 - BM25_B + BM25_B * self._docs[doc_num]["length"] / avg_length
+                    bm25 = idf * tf * (BM25_K1 + 1) / (tf + BM25_K1 * length_norm)
+                    scores[doc_num] = scores.get(doc_num, 0.0) + weight * bm25
+            best = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [
+                {"id": self._docs[num]["id"], "name": self._docs[num]["name"], "score": round(score, 4)}
+                for num, score in best
+            ]
+
+    def stats(self) -> dict:
+        with self._lock, self._file_lock(exclusive=False):
+            self._refresh()
+            return {
+                "documents": len(self._docs),
+                "terms": len(set(self._lexicon) | set(self._delta)),
+                "pending": self._delta_docs,
+                "deleted": len(self._deleted),
+            }
+
+    def compact(self):
+        """Merge the delta and drop deleted documents, rewriting postings.bin."""
+        with self._lock, self._file_lock(exclusive=True):
+            self._refresh()
+            self._compact()
+
+    def close(self):
+        with self._lock:
+            self._close_postings()
+            self._lock_file.close()
+
+    # -- internals --------------------------------------------------------
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool):
+        """Hold index.lock against the other processes using the directory; the caller holds self._lock."""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _reset(self):
+        self._docs = {}         # doc_num -> {"id", "name", "length"}
+        self._by_id = {}        # external id -> doc_num
+        self._deleted = set()   # doc_nums removed since the last compaction
+        self._next_num = 0
+        self._lexicon = {}
+        self._delta = {}        # term -> {doc_num: tf} for documents not yet compacted
+        self._delta_docs = 0
+        self._delta_offset = 0  # bytes of delta.jsonl already applied
+        self._generation = None
+
+    def _docs_signature(self):
+        """Identity of docs.json, which only a compaction rewrites (atomically, as a new file)."""
+        try:
+            stat = os.stat(os.path.join(self.path, "docs.json"))
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _refresh(self):
+        """Catch up with writes from other processes; the caller holds the file lock."""
+        if self._docs_signature() != self._generation:
+            self._close_postings()
+            self._reset()
+            self._load()
+            return
+        delta_path = os.path.join(self.path, "delta.jsonl")
+        if os.path.exists(delta_path) and os.path.getsize(delta_path) > self._delta_offset:
+            self._replay(delta_path)
+
+    def _compact(self):
+        # Caller holds both locks and has refreshed
+        merged = {}
+        for term in set(self._lexicon) | set(self._delta):
+            postings = self._term_postings(term)
+            if postings:
+                merged[term] = postings
+
+        pairs = array("I")
+        lexicon = {}
+        for term in sorted(merged):
+            lexicon[term] = [len(pairs) // 2, len(merged[term])]
+            for doc_num, tf in sorted(merged[term].items()):
+                pairs.append(doc_num)
+                pairs.append(tf)
+
+        self._close_postings()
+        self._write_atomic("postings.bin", pairs.tobytes(), binary=True)
+        self._write_atomic("lexicon.json", json.dumps(lexicon))
+        self._lexicon = lexicon
+        self._delta = {}
+        self._delta_docs = 0
+        self._deleted = set()
+        self._save_docs()
+        open(os.path.join(self.path, "delta.jsonl"), "w").close()
+        self._delta_offset = 0
+        self._generation = self._docs_signature()
+        self._open_postings()
+
+    def _term_postings(self, term: str) -> dict:
+        """Live {doc_num: tf} for a term across the compacted file and the delta."""
+        deleted = self._deleted
+        delta = self._delta.get(term, {})
+        postings = {}
+        entry = self._lexicon.get(term)
+        if entry is not None and self._postings is not None:
+            first, count = entry
+            # Strided views over the mmap: (doc_num, tf) pairs are read in place, without an intermediate dict
+            view = self._postings[first * 2:(first + count) * 2]
+            for doc_num, tf in zip(view[0::2], view[1::2]):
+                if doc_num not in deleted and doc_num not in delta:
+                    postings[doc_num] = tf
+        for doc_num, tf in delta.items():
+            if doc_num not in deleted:
+                postings[doc_num] = tf
+        return postings
+
+    def _apply_add(self, doc_num, doc_id, name, length, counts):
+        self._docs[doc_num] = {"id": doc_id, "name": name, "length": length}
+        self._by_id[doc_id] = doc_num
+        for term, tf in counts.items():
+            self._delta.setdefault(term, {})[doc_num] = tf
+        self._delta_docs += 1
+        self._next_num = max(self._next_num, doc_num + 1)
+
+    def _apply_delete(self, doc_id):
+        doc_num = self._by_id.pop(doc_id)
+        del self._docs[doc_num]
+        self._deleted.add(doc_num)
+
+    def _delete(self, doc_id):
+        self._apply_delete(doc_id)
+        self._log({"op": "delete", "id": doc_id})
+
+    def _log(self, record: dict):
+        # Caller holds the exclusive file lock and has replayed everything before this record
+        with open(os.path.join(self.path, "delta.jsonl"), "ab") as f:
+            f.write((json.dumps(record) + "\n").encode("utf-8"))
+            self._delta_offset = f.tell()
+
+    def _load(self):
+        docs_path = os.path.join(self.path, "docs.json")
+        self._generation = self._docs_signature()
+        if os.path.exists(docs_path):
+            with open(docs_path, encoding="utf-8") as f:
+                state = json.load(f)
+            self._docs = {int(num): doc for num, doc in state["docs"].items()}
+            self._by_id = {doc["id"]: num for num, doc in self._docs.items()}
+            self._next_num = state["next_num"]
+        lexicon_path = os.path.join(self.path, "lexicon.json")
+        if os.path.exists(lexicon_path):
+            with open(lexicon_path, encoding="utf-8") as f:
+                self._lexicon = json.load(f)
+        self._open_postings()
+
+        delta_path = os.path.join(self.path, "delta.jsonl")
+        if os.path.exists(delta_path):
+            self._replay(delta_path)
+
+    def _replay(self, delta_path: str):
+        """Apply delta.jsonl records past the ones already applied."""
+        with open(delta_path, "rb") as f:
+            f.seek(self._delta_offset)
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if record["op"] == "add":
+                    if record["id"] in self._by_id:
+                        self._apply_delete(record["id"])
+                    self._apply_add(record["num"], record["id"], record["name"], sum(record["tf"].values()), record["tf"])
+                elif record["id"] in self._by_id:
+                    self._apply_delete(record["id"])
+            self._delta_offset = f.tell()
+
+    def _save_docs(self):
+        state = {"docs": self._docs, "next_num": self._next_num}
+        self._write_atomic("docs.json", json.dumps(state))
+
+    def _write_atomic(self, name, data, binary=False):
+        target = os.path.join(self.path, name)
+        tmp = target + ".tmp"
+        with open(tmp, "wb" if binary else "w") as f:
+            f.write(data)
+        os.replace(tmp, target)
+
+    def _open_postings(self):
+        postings_path = os.path.join(self.path, "postings.bin")
+        if not os.path.exists(postings_path) or os.path.getsize(postings_path) == 0:
+            return
+        self._postings_file = open(postings_path, "rb")
+        self._mmap = mmap.mmap(self._postings_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._postings = memoryview(self._mmap).cast("I")
+
+    def _close_postings(self):
+        if self._postings is None:
+            return
+        self._postings.release()
+        self._mmap.close()
+        self._postings_file.close()
+        self._postings = None
+        self._postings_file = None
@@ -0,0 +1,85 @@
+"""Split a resume into independently rewritable sections and merge them back in order."""
+import os
+
+from .ats_scorer import BULLET_CHARS, is_heading
+
+# Sections whose entries (one per job or project) are rewritten separately
+ENTRY_SECTIONS = ("EXPERIENCE", "PROJECTS")
+
+# Upper bound on LLM work units per resume; adjacent entries are merged beyond it
+MAX_SECTION_UNITS = int(os.getenv("MAX_SECTION_UNITS", "8"))
+
+
+def _entries(body: str) -> list:
+    """Split a section body into entries at blank lines, or where a new title follows a bullet."""
+    blocks = []
+    current = []
+    previous_bullet = False
+    for line in body.splitlines():
+        stripped = line.strip()
+        bullet = stripped.startswith(BULLET_CHARS)
+        if (not stripped or (previous_bullet and not bullet)) and any(l.strip().startswith(BULLET_CHARS) for l in current):
+            blocks.append("\n".join(current).strip())
+            current = []
+        if stripped:
+            current.append(line.rstrip())
+            previous_bullet = bullet
+    if current:
+        blocks.append("\n".join(current).strip())
+    return [block for block in blocks if block]
+
+
+def split_sections(text: str) -> list:
+    """Return [{"heading", "chunks"}] in document order.
+
+    The lines before the first heading (name and contact details) form a
+    section with heading None. Entry sections such as EXPERIENCE get one chunk
+    per job; every other section is a single chunk.
+    """
+    raw = [{"heading": None, "lines": []}]
+    for line in text.splitlines():
+        stripped = line.strip()
+        if stripped and is_heading(stripped):
+            raw.append({"heading": stripped, "lines": []})
+        else:
+            raw[-1]["lines"].append(line.rstrip())
+
+    sections = []
+    for section in raw:
+        body = "\n".join(section["lines"]).strip()
+        if section["heading"] is None and not body:
+            continue
+        if section["heading"] and any(name in section["heading"].upper() for name in ENTRY_SECTIONS):
+            chunks = _entries(body) or [body]
+        else:
+            chunks = [body]
+        sections.append({"heading": section["heading"], "chunks": chunks})
+    _limit_units(sections)
+    return sections
+
+
+def _limit_units(sections: list, max_units: int = MAX_SECTION_UNITS):
+    """Merge adjacent entries of the longest entry section until the resume fits in `max_units` calls."""
+    while sum(len(s["chunks"]) for s in sections if s["heading"]) > max_units:
+        section = max(sections, key=lambda s: len(s["chunks"]) if s["heading"] else 0)
+        if len(section["chunks"]) < 2:
+            return
+        chunks = section["chunks"]
+        section["chunks"] = ["\n\n".join(chunks[i:i + 2]) for i in range(0, len(chunks), 2)]
+
+
+def clean_section_output(output: str, heading: str) -> str:
+    """Drop the section heading if the model echoed it back."""
+    lines = output.strip().splitlines()
+    if heading and lines and lines[0].strip().strip("#*: ").upper() == heading.strip().strip(":").upper():
+        lines = lines[1:]
+    return "\n".join(lines).strip()
+
+
+def merge_sections(sections: list) -> str:
+    """Inverse of split_sections: headings and chunks back into one document."""
+    parts = []
+    for section in sections:
+        body = "\n\n".join(chunk for chunk in section["chunks"] if chunk)
+        parts.append(f"{section['heading']}\n{body}".strip() if section["heading"] else body)
+    return "\n\n".join(part for part in parts if part)
@@ -0,0 +1,275 @@
+"""Key-value store shared by the API's worker processes.
+
+With several uvicorn workers (`WORKERS`), consecutive requests from one client
+land on any of them, so job state, the stage and job-profile caches and
+rendered documents go through a store every worker can reach. The interface
+is the subset of Redis commands the app uses (strings with expiry and
+lists), so a Redis server drops in for the local backends:
+
+- `memory`: a process-local dict; the default, for a single worker
+- `sqlite`: one SQLite file (`KV_PATH`) in WAL mode, shared by every process
+  on the host; the default once `WORKERS` is above 1
+- `redis`: the server at `KV_URL` (needs the `redis` package)
+
+As with redis-py, values come back as bytes; str values are stored UTF-8 encoded.
+"""
+import os
+import sqlite3
+import threading
+import time
+
+WORKERS_ENV = os.getenv("WORKERS", "1")
+KV_BACKEND = os.getenv("KV_BACKEND", "memory")
+KV_PATH = os.getenv("KV_PATH", "data/shared_state.db")
+KV_URL = os.getenv("KV_URL", "redis://localhost:6379/0")
+
+# Expired SQLite rows are purged once every this many writes
+PURGE_EVERY = 500
+
+
+def resolve_workers(value) -> int:
+    """Worker count from a WORKERS value: a number, or "auto" for one per core."""
+    if str(value).strip().lower() in ("auto", "0", ""):
+        return os.cpu_count() or 1
+    return max(1, int(value))
+
+
+# Processes serving the API; each takes its share of per-host limits (LLM rate limits, document workers)
+WORKERS = resolve_workers(WORKERS_ENV)
+
+
+def _encode(value) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        return value.encode("utf-8")
+    return str(value).encode("utf-8")
+
+
+class MemoryKV:
+    """Process-local store with Redis semantics; the reference for other backends."""
+
+    name = "memory"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._data = {}   # key -> [value (bytes or list of bytes), expires_at or None]
+
+    def _entry(self, key: str, now: float):
+        # Caller holds the lock
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None and entry[1] <= now:
+            del self._data[key]
+            return None
+        return entry
+
+    def ping(self) -> bool:
+        return True
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entry(key, time.time())
+            return entry[0] if entry is not None and isinstance(entry[0], bytes) else None
+
+    def set(self, key: str, value, ex: float = None) -> bool:
+        with self._lock:
+            self._data[key] = [_encode(value), time.time() + ex if ex else None]
+            return True
+
+    def delete(self, *keys) -> int:
+        now = time.time()
+        deleted = 0
+        with self._lock:
+            for key in keys:
+                if self._entry(key, now) is not None:
+                    del self._data[key]
+                    deleted += 1
+        return deleted
+
+    def expire(self, key: str, seconds: float) -> bool:
+        with self._lock:
+            entry = self._entry(key, time.time())
+            if entry is None:
+                return False
+            entry[1] = time.time() + seconds
+            return True
+
+    def rpush(self, key: str, *values) -> int:
+        with self._lock:
+            entry = self._entry(key, time.time())
+            if entry is None:
+                entry = self._data[key] = [[], None]
+            entry[0].extend(_encode(value) for value in values)
+            return len(entry[0])
+
+    def lrange(self, key: str, start: int, end: int) -> list:
+        with self._lock:
+            entry = self._entry(key, time.time())
+            if entry is None or not isinstance(entry[0], list):
+                return []
+            items = entry[0]
+            # Redis ranges are inclusive; -1 is the last item
+            return items[start:] if end == -1 else items[start:end + 1]
+
+    def llen(self, key: str) -> int:
+        return len(self.lrange(key, 0, -1))
+
+    def dbsize(self) -> int:
+        now = time.time()
+        with self._lock:
+            return sum(1 for key in list(self._data) if self._entry(key, now) is not None)
+
+    def close(self):
+        pass
+
+
+class SQLiteKV:
+    """The same commands over a SQLite file, so processes on one host share state without a server."""
+
+    name = "sqlite"
+
+    def __init__(self, path: str = KV_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._writes = 0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Other workers hold the write lock for a few milliseconds at a time
+        self._db = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS kv_list ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS kv_list_key ON kv_list (key, id)")
+
+    def _write(self, statements):
+        """Run (sql, params) pairs in one immediate transaction; returns the last cursor."""
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = None
+                for sql, params in statements:
+                    cursor = self._db.execute(sql, params)
+                self._writes += 1
+                if self._writes % PURGE_EVERY == 0:
+                    now = time.time()
+                    self._db.execute("DELETE FROM kv WHERE expires_at <= ?", (now,))
+                    self._db.execute("DELETE FROM kv_list WHERE expires_at <= ?", (now,))
+                self._db.execute("COMMIT")
+                return cursor
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def ping(self) -> bool:
+        with self._lock:
+            self._db.execute("SELECT 1").fetchone()
+        return True
+
+    def get(self, key: str):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM kv WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return bytes(row[0]) if row is not None else None
+
+    def set(self, key: str, value, ex: float = None) -> bool:
+        expires_at = time.time() + ex if ex else None
+        self._write([("INSERT OR REPLACE INTO kv (key, value, expires_at) VALUES (?, ?, ?)", (key, _encode(value), expires_at))])
+        return True
+
+    def delete(self, *keys) -> int:
+        deleted = 0
+        for key in keys:
+            live = self.get(key) is not None or self.llen(key) > 0
+            self._write([
+                ("DELETE FROM kv WHERE key = ?", (key,)),
+                ("DELETE FROM kv_list WHERE key = ?", (key,)),
+            ])
+            deleted += live
+        return deleted
+
+    def expire(self, key: str, seconds: float) -> bool:
+        now = time.time()
+        expires_at = now + seconds
+        string = self._write([("UPDATE kv SET expires_at = ? WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (expires_at, key, now))])
+        items = self._write([("UPDATE kv_list SET expires_at = ? WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (expires_at, key, now))])
+        return bool(string.rowcount or items.rowcount)
+
+    def rpush(self, key: str, *values) -> int:
+        now = time.time()
+        # New items inherit the list's expiry, as a Redis list keeps its TTL
+        statements = [("DELETE FROM kv_list WHERE key = ? AND expires_at <= ?", (key, now))]
+        statements += [
+            ("INSERT INTO kv_list (key, value, expires_at) "
+             "VALUES (?, ?, (SELECT MAX(expires_at) FROM kv_list WHERE key = ?))", (key, _encode(value), key))
+            for value in values
+        ]
+        self._write(statements)
+        return self.llen(key)
+
+    def lrange(self, key: str, start: int, end: int) -> list:
+        # Only the forward ranges the app uses: start >= 0, end >= start or -1
+        limit = -1 if end == -1 else max(0, end - start + 1)
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT value FROM kv_list WHERE key = ? AND (expires_at IS NULL OR expires_at > ?) "
+                "ORDER BY id LIMIT ? OFFSET ?",
+                (key, time.time(), limit, start),
+            ).fetchall()
+        return [bytes(row[0]) for row in rows]
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            (count,) = self._db.execute(
+                "SELECT COUNT(*) FROM kv_list WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)", (key, time.time())
+            ).fetchone()
+        return count
+
+    def dbsize(self) -> int:
+        now = time.time()
+        with self._lock:
+            (strings,) = self._db.execute("SELECT COUNT(*) FROM kv WHERE expires_at IS NULL OR expires_at > ?", (now,)).fetchone()
+            (lists,) = self._db.execute(
+                "SELECT COUNT(DISTINCT key) FROM kv_list WHERE expires_at IS NULL OR expires_at > ?", (now,)
+            ).fetchone()
+        return strings + lists
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _redis_kv(url: str = KV_URL):
+    try:
+        import redis
+    except ImportError:
+        raise RuntimeError("KV_BACKEND=redis needs the redis package (pip install redis)")
+    return redis.Redis.from_url(url)
+
+
+KV_BACKENDS = {
+    "memory": MemoryKV,
+    "sqlite": SQLiteKV,
+    "redis": _redis_kv,
+}
+
+
+def create_kv(backend: str = KV_BACKEND):
+    if backend not in KV_BACKENDS:
+        raise ValueError(f"Unknown KV_BACKEND '{backend}', expected one of {', '.join(KV_BACKENDS)}")
+    return KV_BACKENDS[backend]()
+
+
+def kv_stats(kv) -> dict:
+    return {"backend": KV_BACKEND, "workers": WORKERS, "pid": os.getpid(), "keys": kv.dbsize()}
+
+
+# One store per process; with the memory backend nothing is actually shared
+shared_state = create_kv()
+# Whether caches should use the store as a second tier (a process-local one would only duplicate memory)
+SHARED = KV_BACKEND != "memory"
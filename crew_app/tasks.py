@@ -1,130 +1,206 @@
 from crewai import Task
+from .prompt_budget import budget_inputs
+from .job_profiles import job_requirements
+
+# Characters of raw resume text extracted for the parse stage; the stage's token budget decides what reaches the LLM
+PARSE_CHAR_LIMIT = 12000
+
+# Builders for stages that return a resume give one task per chunk of the budgeted resume; the
+# pipeline runs them in order and joins the outputs
 
 def parse_resume_task(agent, raw_resume_text):
-    # Truncate if too long - reduced for faster processing
-    truncated_text = raw_resume_text[:800] + "..." if len(raw_resume_text) > 800 else raw_resume_text
+    # Compacted to the parse token budget rather than cut at a fixed offset
+    chunks, _ = budget_inputs("parse", raw_resume_text)
     
-    return Task(
+    return [Task(
         description=(
-            f"Clean this resume text:\n\n{truncated_text}\n\n"
+            f"Clean this resume text:\n\n{chunk}\n\n"
             "Remove artifacts, normalize bullets. Be fast."
         ),
         agent=agent,
         expected_output=("Clean resume text.")
-    )
+    ) for chunk in chunks]
 
 def rewrite_for_ats_task(agent, cleaned_resume_text, job_title, job_description):
-    # Truncate inputs if too long - reduced for faster processing
-    truncated_resume = cleaned_resume_text[:600] + "..." if len(cleaned_resume_text) > 600 else cleaned_resume_text
-    truncated_jd = job_description[:150] + "..." if len(job_description) > 150 else job_description
+    # Fit inputs to the stage token budget - compacted, not cut off
+    chunks, truncated_jd = budget_inputs("rewrite", cleaned_resume_text, job_title, job_description, job_requirements(job_title, job_description))
     
-    return Task(
+    return [Task(
         description=(
             f"Rewrite for {job_title}:\n\n"
             f"JOB: {truncated_jd}\n\n"
-            f"RESUME: {truncated_resume}\n\n"
+            f"RESUME: {chunk}\n\n"
             "Match keywords, add metrics. Be fast."
         ),
         agent=agent,
         expected_output="ATS-optimized resume."
-    )
+    ) for chunk in chunks]
 
 def refine_bullets_task(agent, rewritten_resume_text):
-    truncated_text = rewritten_resume_text[:500] + "..." if len(rewritten_resume_text) > 500 else rewritten_resume_text
+    chunks, _ = budget_inputs("refine", rewritten_resume_text)
     
-    return Task(
+    return [Task(
         description=(
-            f"Polish bullets:\n\n{truncated_text}\n\n"
+            f"Polish bullets:\n\n{chunk}\n\n"
             "Add verbs and metrics. Be fast."
         ),
         agent=agent,
         expected_output="Enhanced resume."
-    )
+    ) for chunk in chunks]
+
+# Section markers the fused rewrite + refine task asks the model to emit
+REWRITTEN_MARKER = "=== REWRITTEN ==="
+FINAL_MARKER = "=== FINAL ==="
+
+def rewrite_and_refine_task(agent, cleaned_resume_text, job_title, job_description):
+    """Stages 2 and 3 in one call: the model rewrites, then polishes its own rewrite."""
+    chunks, truncated_jd = budget_inputs("rewrite_refine", cleaned_resume_text, job_title, job_description, job_requirements(job_title, job_description))
+    
+    return [Task(
+        description=(
+            f"Rewrite for {job_title}:\n\n"
+            f"JOB: {truncated_jd}\n\n"
+            f"RESUME: {chunk}\n\n"
+            "Step 1: match keywords, add metrics. Step 2: polish the bullets of your rewrite with verbs and metrics.\n"
+            f"Reply exactly as:\n{REWRITTEN_MARKER}\n<step 1 resume>\n{FINAL_MARKER}\n<step 2 resume>\nBe fast."
+        ),
+        agent=agent,
+        expected_output=f"{REWRITTEN_MARKER} section followed by {FINAL_MARKER} section."
+    ) for chunk in chunks]
+
+def split_fused_output(output: str):
+    """Return (rewritten, final) from a fused task's output, tolerating missing markers."""
+    if FINAL_MARKER not in output:
+        text = output.replace(REWRITTEN_MARKER, "").strip()
+        return text, text
+    rewritten, final = output.split(FINAL_MARKER, 1)
+    rewritten = rewritten.replace(REWRITTEN_MARKER, "").strip()
+    final = final.strip()
+    return rewritten or final, final or rewritten
+
+def rewrite_section_task(agent, section_text, heading, job_title, job_description):
+    """Stage 2 for one section (or one job entry) of the resume."""
+    chunks, truncated_jd = budget_inputs("rewrite_section", section_text, job_title, job_description, job_requirements(job_title, job_description))
+    
+    return [Task(
+        description=(
+            f"Rewrite this {heading} section for {job_title}:\n\n"
+            f"JOB: {truncated_jd}\n\n"
+            f"SECTION: {chunk}\n\n"
+            "Match keywords, add metrics. Reply with only this section's content, without the heading. Be fast."
+        ),
+        agent=agent,
+        expected_output=f"ATS-optimized {heading} section."
+    ) for chunk in chunks]
+
+def refine_section_task(agent, section_text, heading):
+    """Stage 3 for one section (or one job entry) of the resume."""
+    chunks, _ = budget_inputs("refine_section", section_text)
+    
+    return [Task(
+        description=(
+            f"Polish this {heading} section:\n\n{chunk}\n\n"
+            "Add verbs and metrics. Reply with only this section's content, without the heading. Be fast."
+        ),
+        agent=agent,
+        expected_output=f"Enhanced {heading} section."
+    ) for chunk in chunks]
 
 def evaluate_ats_task(agent, final_resume_text, job_title, job_description):
-    truncated_resume = final_resume_text[:400] + "..." if len(final_resume_text) > 400 else final_resume_text
-    truncated_jd = job_description[:100] + "..." if len(job_description) > 100 else job_description
+    chunks, truncated_jd = budget_inputs("evaluate", final_resume_text, job_title, job_description, job_requirements(job_title, job_description))
+    # One score covers the whole resume, so an oversized one is still sent in a single prompt
+    truncated_resume = "\n".join(chunks)
     
     return Task(
         description=(
             f"Score for {job_title}:\n\n"
             f"JOB: {truncated_jd}\n\n"
             f"RESUME: {truncated_resume}\n\n"
-            "Rate 1-5: keywords, structure, metrics. Return JSON: overall_score, breakdown, missing_keywords, quick_wins."
+            "Rate 1-5: keywords, structure, metrics. Return only a JSON object with double-quoted keys: "
+            "overall_score (0-100), breakdown, missing_keywords (list), quick_wins (list)."
+        ),
+        agent=agent,
+        expected_output="JSON evaluation."
+    )
+
+def repair_evaluation_task(agent, evaluation_text):
+    """Cheap retry when the evaluation was not valid JSON: reformat it, without the resume or job."""
+    return Task(
+        description=(
+            "Rewrite this ATS evaluation as one valid JSON object and nothing else. Keys: "
+            "overall_score (integer 0-100), breakdown (object of 1-5 ratings for keywords, structure, metrics), "
+            "missing_keywords (list of strings), quick_wins (list of strings).\n\n"
+            f"EVALUATION: {evaluation_text[:2000]}"
         ),
         agent=agent,
         expected_output="JSON evaluation."
     )
 
 def optimize_keywords_task(agent, resume_text, job_title, job_description):
-    truncated_resume = resume_text[:600] + "..." if len(resume_text) > 600 else resume_text
-    truncated_jd = job_description[:200] + "..." if len(job_description) > 200 else job_description
+    chunks, truncated_jd = budget_inputs("keywords", resume_text, job_title, job_description)
     
-    return Task(
+    return [Task(
         description=(
             f"Optimize keywords for {job_title}:\n\n"
             f"JOB: {truncated_jd}\n\n"
-            f"RESUME: {truncated_resume}\n\n"
+            f"RESUME: {chunk}\n\n"
             "Identify and integrate relevant keywords from the job description. Focus on technical skills, industry terms, and ATS-friendly keywords. Be strategic and natural."
         ),
         agent=agent,
         expected_output="Resume with optimized keyword integration."
-    )
+    ) for chunk in chunks]
 
 def enhance_skills_task(agent, resume_text, job_title, job_description):
-    truncated_resume = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-    truncated_jd = job_description[:200] + "..." if len(job_description) > 200 else job_description
+    chunks, truncated_jd = budget_inputs("skills", resume_text, job_title, job_description)
     
-    return Task(
+    return [Task(
         description=(
             f"Enhance skills section for {job_title}:\n\n"
             f"JOB: {truncated_jd}\n\n"
-            f"RESUME: {truncated_resume}\n\n"
+            f"RESUME: {chunk}\n\n"
             "Improve the skills section with relevant technical and soft skills. Categorize skills properly and ensure they match job requirements."
         ),
         agent=agent,
         expected_output="Resume with enhanced and optimized skills section."
-    )
+    ) for chunk in chunks]
 
 def industry_optimize_task(agent, resume_text, job_title, job_description):
-    truncated_resume = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-    truncated_jd = job_description[:200] + "..." if len(job_description) > 200 else job_description
+    chunks, truncated_jd = budget_inputs("industry", resume_text, job_title, job_description)
     
-    return Task(
+    return [Task(
         description=(
             f"Optimize for industry standards for {job_title}:\n\n"
             f"JOB: {truncated_jd}\n\n"
-            f"RESUME: {truncated_resume}\n\n"
+            f"RESUME: {chunk}\n\n"
             "Tailor content to industry-specific standards and expectations. Use appropriate terminology and emphasize relevant achievements for this field."
         ),
         agent=agent,
         expected_output="Industry-optimized resume content."
-    )
+    ) for chunk in chunks]
 
 def format_structure_task(agent, resume_text, job_title, job_description):
-    truncated_resume = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
+    chunks, _ = budget_inputs("formatting", resume_text)
     
-    return Task(
+    return [Task(
         description=(
             f"Optimize formatting and structure:\n\n"
-            f"RESUME: {truncated_resume}\n\n"
+            f"RESUME: {chunk}\n\n"
             "Ensure proper resume structure, formatting, and ATS compatibility. Fix any formatting issues and optimize for readability."
         ),
         agent=agent,
         expected_output="Well-formatted and structured resume."
-    )
+    ) for chunk in chunks]
 
 def quality_assurance_task(agent, resume_text, job_title, job_description):
-    truncated_resume = resume_text[:500] + "..." if len(resume_text) > 500 else resume_text
-    truncated_jd = job_description[:150] + "..." if len(job_description) > 150 else job_description
+    chunks, truncated_jd = budget_inputs("qa", resume_text, job_title, job_description)
     
-    return Task(
+    return [Task(
         description=(
             f"Final quality check for {job_title}:\n\n"
             f"JOB: {truncated_jd}\n\n"
-            f"RESUME: {truncated_resume}\n\n"
+            f"RESUME: {chunk}\n\n"
             "Conduct final review for consistency, accuracy, professional standards, and ATS optimization. Ensure all content meets industry standards."
         ),
         agent=agent,
         expected_output="Final quality-assured resume ready for submission."
-    )
+    ) for chunk in chunks]
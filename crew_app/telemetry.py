@@ -0,0 +1,209 @@
+"""Tracing spans aggregated into Prometheus histograms and counters.
+
+    with span("document.extract", format="pdf"):
+        ...
+
+Every span records its duration in a histogram labelled by span name and its
+labels. LLM calls also add prompt/completion tokens and an estimated cost per
+stage and model. `telemetry.render()` produces the Prometheus text format served
+by /metrics; with TRACE_LOG set, each span is also written as a JSON line
+(`TRACE_LOG=-` for stdout), tagged with the current trace (job) id.
+`llm_usage()` scopes token counts to the calls made inside a block.
+"""
+import contextvars
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_LOG = os.getenv("TRACE_LOG", "")
+
+# Seconds; LLM stages take seconds, document work and parsing milliseconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# USD per million (prompt, completion) tokens; LLM_PRICE_PROMPT / LLM_PRICE_COMPLETION override for any model
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+_trace_id = contextvars.ContextVar("trace_id", default=None)
+
+
+def model_price(model: str):
+    if os.getenv("LLM_PRICE_PROMPT") or os.getenv("LLM_PRICE_COMPLETION"):
+        return float(os.getenv("LLM_PRICE_PROMPT", "0")), float(os.getenv("LLM_PRICE_COMPLETION", "0"))
+    return MODEL_PRICES.get(model, (0.0, 0.0))
+
+
+class _Histogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.total += value
+        for i, bound in enumerate(BUCKETS):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+class Telemetry:
+    def __init__(self, trace_log: str = TRACE_LOG):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._log = None
+        if trace_log == "-":
+            self._log = sys.stdout
+        elif trace_log:
+            self._log = open(trace_log, "a", buffering=1, encoding="utf-8")
+
+    def observe(self, name: str, duration: float, error: bool = False, **labels):
+        """Record one finished span; non-label attributes (tokens, sizes) go only to the trace log."""
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        with self._lock:
+            self._histograms.setdefault(key, _Histogram()).observe(duration)
+            if error:
+                self._count("ats_span_errors_total", 1, span=name, **labels)
+
+    def count(self, metric: str, value: float = 1, **labels):
+        with self._lock:
+            self._count(metric, value, **labels)
+
+    def _count(self, metric: str, value: float, **labels):
+        key = (metric, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        self._counters[key] = self._counters.get(key, 0) + value
+
+    def record_llm_call(self, stage: str, model: str, prompt_tokens: int, completion_tokens: int):
+        prompt_price, completion_price = model_price(model)
+        cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+        with self._lock:
+            self._count("ats_llm_calls_total", 1, stage=stage, model=model)
+            self._count("ats_llm_tokens_total", prompt_tokens, stage=stage, model=model, kind="prompt")
+            self._count("ats_llm_tokens_total", completion_tokens, stage=stage, model=model, kind="completion")
+            self._count("ats_llm_cost_usd_total", cost, stage=stage, model=model)
+        return cost
+
+    def log(self, record: dict):
+        if self._log is None:
+            return
+        line = json.dumps(record, default=str)
+        with self._lock:
+            self._log.write(line + "\n")
+
+    def render(self, gauges: dict = None) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = ["# HELP ats_span_duration_seconds Duration of traced operations", "# TYPE ats_span_duration_seconds histogram"]
+        with self._lock:
+            for (name, labels), hist in sorted(self._histograms.items()):
+                base = _labels((("span", name),) + labels)
+                for bound, count in zip(BUCKETS, hist.counts):
+                    lines.append(f"ats_span_duration_seconds_bucket{_labels((('span', name),) + labels + (('le', repr(bound)),))} {count}")
+                lines.append(f"ats_span_duration_seconds_bucket{_labels((('span', name),) + labels + (('le', '+Inf'),))} {hist.count}")
+                lines.append(f"ats_span_duration_seconds_sum{base} {hist.total:.6f}")
+                lines.append(f"ats_span_duration_seconds_count{base} {hist.count}")
+            declared = set()
+            for (metric, labels), value in sorted(self._counters.items()):
+                if metric not in declared:
+                    declared.add(metric)
+                    lines.append(f"# TYPE {metric} counter")
+                lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+        for (metric, labels), value in sorted((gauges or {}).items()):
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _labels(pairs) -> str:
+    if not pairs:
+        return ""
+    escaped = (k + '="' + str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ") + '"' for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _number(value) -> str:
+    return str(int(value)) if float(value).is_integer() else f"{value:.8f}"
+
+
+telemetry = Telemetry()
+
+
+@contextmanager
+def trace(trace_id: str):
+    """Tag every span opened inside the block (on this thread or context) with `trace_id`."""
+    token = _trace_id.set(trace_id)
+    try:
+        yield
+    finally:
+        _trace_id.reset(token)
+
+
+def record_span(name: str, duration: float, labels: dict = None, attributes: dict = None, error: BaseException = None):
+    """Record a span whose duration was measured elsewhere."""
+    labels = labels or {}
+    telemetry.observe(name, duration, error=error is not None, **labels)
+    telemetry.log({
+        "ts": round(time.time(), 3),
+        "trace_id": _trace_id.get(),
+        "span": name,
+        "duration": round(duration, 6),
+        **labels,
+        **(attributes or {}),
+        **({"error": repr(error)} if error is not None else {}),
+    })
+
+
+@contextmanager
+def span(name: str, **labels):
+    """Time a block. Yields a dict the block can fill with extra attributes for the trace log."""
+    attributes = {}
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attributes
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        record_span(name, time.perf_counter() - started, labels, attributes, error)
+
+
+_llm_usage = contextvars.ContextVar("llm_usage", default=None)
+_llm_usage_lock = threading.Lock()
+
+
+@contextmanager
+def llm_usage():
+    """Collect the tokens of the LLM calls made inside the block.
+
+    Yields a dict of prompt_tokens, completion_tokens and calls. Shared LLMs
+    only keep lifetime totals, so this is how one stage learns what its own
+    call used; calls on threads started with a copy of the context (hedges)
+    count too.
+    """
+    usage = {"prompt_tokens": 0, "completion_tokens": 0, "calls": 0}
+    token = _llm_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _llm_usage.reset(token)
+
+
+def add_llm_usage(prompt_tokens: int, completion_tokens: int):
+    """Add one completion's tokens to the enclosing `llm_usage()` block, if any."""
+    usage = _llm_usage.get()
+    if usage is None:
+        return
+    with _llm_usage_lock:
+        usage["prompt_tokens"] += prompt_tokens
+        usage["completion_tokens"] += completion_tokens
+        usage["calls"] += 1
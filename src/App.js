@@ -29,32 +29,25 @@ function App() {
     setLoadingStep('Initializing AI agents...');
 
     try {
-      const steps = [
-        'Initializing AI agents...',
-        'Stage 1/4: Parsing and cleaning resume...',
-        'Stage 2/4: ATS optimization...',
-        'Stage 3/4: Bullet point refinement...',
-        'Stage 4/4: Final ATS evaluation...',
-        'Complete!'
-      ];
-      
-      let currentStep = 0;
-      const stepInterval = setInterval(() => {
-        if (currentStep < steps.length - 1) {
-          setLoadingStep(steps[currentStep]);
-          currentStep++;
-        } else {
-          clearInterval(stepInterval);
-        }
-      }, 15000); // Update every 15 seconds
-      
-      setLoadingStep(steps[0]);
-      const response = await processResume(file, jobTitle, jobDescription);
-      clearInterval(stepInterval);
-      setResults(response.data.results);
+      const stageLabels = {
+        parse: 'Stage 2/4: ATS optimization...',
+        rewrite: 'Stage 3/4: Bullet point refinement...',
+        refine: 'Stage 4/4: Final ATS evaluation...',
+        evaluate: 'Finishing up...'
+      };
+
+      setLoadingStep('Stage 1/4: Parsing and cleaning resume...');
+      const job = await processResume(file, jobTitle, jobDescription, (event) => {
+        // Render each stage as soon as it finishes
+        setResults((previous) => ({ ...previous, [event.field]: event.output }));
+        setLoadingStep(stageLabels[event.stage] || '');
+      });
+      // resultId lets downloads fetch the stored result instead of posting the text back
+      setResults({ ...job.results, resultId: job.result_id });
       setLoadingStep('Complete!');
     } catch (err) {
-      setError(err.response?.data?.detail || 'An error occurred while processing your resume.');
+      setResults(null);
+      setError(err.response?.data?.detail || err.message || 'An error occurred while processing your resume.');
     } finally {
       setLoading(false);
       setLoadingStep('');
@@ -129,7 +122,12 @@ function App() {
               </div>
             </div>
           ) : (
-            <ResultsDisplay results={results} onReset={handleReset} />
+            <ResultsDisplay
+              results={results}
+              processing={loading}
+              processingStep={loadingStep}
+              onReset={handleReset}
+            />
           )}
         </div>
       </div>
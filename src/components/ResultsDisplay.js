@@ -1,8 +1,9 @@
 import React, { useState } from 'react';
-import { RotateCcw, FileText, CheckCircle, Star, AlertCircle, File } from 'lucide-react';
+import { RotateCcw, FileText, CheckCircle, Star, AlertCircle, File, Download } from 'lucide-react';
 import { downloadFile } from '../services/api';
+import LoadingSpinner from './LoadingSpinner';
 
-const ResultsDisplay = ({ results, onReset }) => {
+const ResultsDisplay = ({ results, processing = false, processingStep = '', onReset }) => {
   const [activeTab, setActiveTab] = useState(0);
 
   const tabs = [
@@ -12,10 +13,10 @@ const ResultsDisplay = ({ results, onReset }) => {
     { id: 3, name: 'ATS Evaluation', icon: AlertCircle }
   ];
 
-  const handleDownload = async (content, filename, format = 'txt') => {
+  const handleDownload = async (content, filename, format = 'txt', field = 'final') => {
     try {
       console.log(`Starting download: ${filename} (${format})`);
-      await downloadFile(content, filename, format);
+      await downloadFile(content, filename, format, results.resultId, field);
       console.log('Download completed successfully');
     } catch (error) {
       console.error('Download failed:', error);
@@ -23,6 +24,14 @@ const ResultsDisplay = ({ results, onReset }) => {
     }
   };
 
+  // Placeholder for a stage whose output has not streamed in yet
+  const renderPending = () => (
+    <div className="flex items-center gap-3 bg-gray-50 p-4 rounded-lg text-gray-600">
+      <LoadingSpinner size="sm" />
+      {processingStep || 'Waiting for this stage to finish...'}
+    </div>
+  );
+
   const renderEvaluation = (evaluation) => {
     // Try to parse evaluation if it's a string
     let parsedEvaluation = evaluation;
@@ -66,6 +75,11 @@ const ResultsDisplay = ({ results, onReset }) => {
                   {parsedEvaluation.overall_score}/100
                 </div>
               </div>
+              {parsedEvaluation.baseline_score != null && parsedEvaluation.score_delta != null && (
+                <p className="mt-2 text-sm text-gray-600">
+                  Original resume: {parsedEvaluation.baseline_score}/100 ({parsedEvaluation.score_delta >= 0 ? '+' : ''}{parsedEvaluation.score_delta})
+                </p>
+              )}
             </div>
           )}
 
@@ -135,9 +149,12 @@ const ResultsDisplay = ({ results, onReset }) => {
     <div className="bg-white rounded-lg shadow-lg">
       {/* Header */}
       <div className="flex items-center justify-between p-6 border-b border-gray-200">
-        <h2 className="text-2xl font-bold text-gray-900">Processing Results</h2>
+        <h2 className="text-2xl font-bold text-gray-900">
+          {processing ? 'Processing...' : 'Processing Results'}
+        </h2>
         <button
           onClick={onReset}
+          disabled={processing}
           className="flex items-center gap-2 px-4 py-2 text-gray-600 hover:text-gray-800 transition-colors duration-200"
         >
           <RotateCcw className="h-4 w-4" />
@@ -171,79 +188,94 @@ const ResultsDisplay = ({ results, onReset }) => {
       {/* Tab Content */}
       <div className="p-6">
         {activeTab === 0 && (
-          <div>
-            <div className="flex items-center justify-between mb-4">
-              <h3 className="text-xl font-semibold text-gray-900">Cleaned Resume</h3>
-              <button
-                onClick={() => handleDownload(results.cleaned, 'cleaned_resume.pdf', 'pdf')}
-                className="flex items-center gap-2 px-6 py-3 bg-red-600 text-white rounded-lg hover:bg-red-700 transition-colors duration-200 font-medium"
-              >
-                <File className="h-5 w-5" />
-                Download PDF
-              </button>
-            </div>
-            <div className="bg-gray-50 p-4 rounded-lg">
-              <pre className="whitespace-pre-wrap text-sm text-gray-700">
-                {results.cleaned}
-              </pre>
+          results.cleaned === undefined ? renderPending() : (
+            <div>
+              <div className="flex items-center justify-between mb-4">
+                <h3 className="text-xl font-semibold text-gray-900">Cleaned Resume</h3>
+                <button
+                  onClick={() => handleDownload(results.cleaned, 'cleaned_resume.pdf', 'pdf', 'cleaned')}
+                  className="flex items-center gap-2 px-6 py-3 bg-red-600 text-white rounded-lg hover:bg-red-700 transition-colors duration-200 font-medium"
+                >
+                  <File className="h-5 w-5" />
+                  Download PDF
+                </button>
+              </div>
+              <div className="bg-gray-50 p-4 rounded-lg">
+                <pre className="whitespace-pre-wrap text-sm text-gray-700">
+                  {results.cleaned}
+                </pre>
+              </div>
             </div>
-          </div>
+          )
         )}
 
         {activeTab === 1 && (
-          <div>
-            <div className="flex items-center justify-between mb-4">
-              <h3 className="text-xl font-semibold text-gray-900">ATS Optimized Resume</h3>
-              <button
-                onClick={() => handleDownload(results.rewritten, 'rewritten_resume.pdf', 'pdf')}
-                className="flex items-center gap-2 px-6 py-3 bg-red-600 text-white rounded-lg hover:bg-red-700 transition-colors duration-200 font-medium"
-              >
-                <File className="h-5 w-5" />
-                Download PDF
-              </button>
-            </div>
-            <div className="bg-gray-50 p-4 rounded-lg">
-              <pre className="whitespace-pre-wrap text-sm text-gray-700">
-                {results.rewritten}
-              </pre>
-            </div>
-          </div>
-        )}
-
-        {activeTab === 2 && (
-          <div>
-            <div className="flex items-center justify-between mb-4">
-              <h3 className="text-xl font-semibold text-gray-900">Final Resume</h3>
-              <div className="flex gap-2">
+          results.rewritten === undefined ? renderPending() : (
+            <div>
+              <div className="flex items-center justify-between mb-4">
+                <h3 className="text-xl font-semibold text-gray-900">ATS Optimized Resume</h3>
                 <button
-                  onClick={() => handleDownload(results.final, 'final_resume.docx', 'docx')}
-                  className="flex items-center gap-2 px-6 py-3 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors duration-200 font-medium"
-                >
-                  <FileText className="h-5 w-5" />
-                  Download DOCX
-                </button>
-                <button
-                  onClick={() => handleDownload(results.final, 'final_resume.pdf', 'pdf')}
+                  onClick={() => handleDownload(results.rewritten, 'rewritten_resume.pdf', 'pdf', 'rewritten')}
                   className="flex items-center gap-2 px-6 py-3 bg-red-600 text-white rounded-lg hover:bg-red-700 transition-colors duration-200 font-medium"
                 >
                   <File className="h-5 w-5" />
                   Download PDF
                 </button>
               </div>
+              <div className="bg-gray-50 p-4 rounded-lg">
+                <pre className="whitespace-pre-wrap text-sm text-gray-700">
+                  {results.rewritten}
+                </pre>
+              </div>
             </div>
-            <div className="bg-gray-50 p-4 rounded-lg">
-              <pre className="whitespace-pre-wrap text-sm text-gray-700">
-                {results.final}
-              </pre>
+          )
+        )}
+
+        {activeTab === 2 && (
+          results.final === undefined ? renderPending() : (
+            <div>
+              <div className="flex items-center justify-between mb-4">
+                <h3 className="text-xl font-semibold text-gray-900">Final Resume</h3>
+                <div className="flex gap-2">
+                  <button
+                    onClick={() => handleDownload(results.final, 'final_resume.docx', 'docx')}
+                    className="flex items-center gap-2 px-6 py-3 bg-blue-600 text-white rounded-lg hover:bg-blue-700 transition-colors duration-200 font-medium"
+                  >
+                    <FileText className="h-5 w-5" />
+                    Download DOCX
+                  </button>
+                  <button
+                    onClick={() => handleDownload(results.final, 'final_resume.pdf', 'pdf')}
+                    className="flex items-center gap-2 px-6 py-3 bg-red-600 text-white rounded-lg hover:bg-red-700 transition-colors duration-200 font-medium"
+                  >
+                    <File className="h-5 w-5" />
+                    Download PDF
+                  </button>
+                  <button
+                    onClick={() => handleDownload(results.final, 'final_resume.zip', 'zip')}
+                    className="flex items-center gap-2 px-6 py-3 bg-gray-700 text-white rounded-lg hover:bg-gray-800 transition-colors duration-200 font-medium"
+                  >
+                    <Download className="h-5 w-5" />
+                    All Formats (.zip)
+                  </button>
+                </div>
+              </div>
+              <div className="bg-gray-50 p-4 rounded-lg">
+                <pre className="whitespace-pre-wrap text-sm text-gray-700">
+                  {results.final}
+                </pre>
+              </div>
             </div>
-          </div>
+          )
         )}
 
         {activeTab === 3 && (
-          <div>
-            <h3 className="text-xl font-semibold text-gray-900 mb-4">ATS Evaluation & Suggestions</h3>
-            {renderEvaluation(results.evaluation)}
-          </div>
+          results.evaluation === undefined ? renderPending() : (
+            <div>
+              <h3 className="text-xl font-semibold text-gray-900 mb-4">ATS Evaluation & Suggestions</h3>
+              {renderEvaluation(results.evaluation)}
+            </div>
+          )
         )}
       </div>
     </div>
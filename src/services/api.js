@@ -7,7 +7,19 @@ const api = axios.create({
   timeout: 300000, // 5 minutes timeout for AI processing
 });
 
-export const processResume = async (file, jobTitle, jobDescription) => {
+const JOB_POLL_INTERVAL = 2000;
+
+export const getJob = async (jobId) => {
+  const response = await api.get(`/jobs/${jobId}`);
+  return response.data;
+};
+
+export const cancelJob = async (jobId) => {
+  const response = await api.delete(`/jobs/${jobId}`);
+  return response.data;
+};
+
+export const submitResume = async (file, jobTitle, jobDescription) => {
   const formData = new FormData();
   formData.append('file', file);
   formData.append('job_title', jobTitle);
@@ -19,40 +31,90 @@ export const processResume = async (file, jobTitle, jobDescription) => {
     },
   });
 
-  return response;
+  return response.data;
+};
+
+const pollJob = async (jobId) => {
+  for (;;) {
+    const job = await getJob(jobId);
+    if (job.status === 'completed') {
+      return job;
+    }
+    if (job.status === 'failed' || job.status === 'cancelled') {
+      throw new Error(job.error || `Job ${job.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL));
+  }
 };
 
-export const downloadFile = async (content, filename, format = 'txt') => {
+// Subscribe to the job's server-sent events; onStage receives each finished stage as it lands
+export const streamJob = (jobId, onStage) => new Promise((resolve, reject) => {
+  const source = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+
+  source.addEventListener('stage', (message) => {
+    onStage(JSON.parse(message.data));
+  });
+
+  source.addEventListener('done', (message) => {
+    source.close();
+    const done = JSON.parse(message.data);
+    if (done.status !== 'completed') {
+      reject(new Error(done.error || `Job ${done.status}`));
+      return;
+    }
+    getJob(jobId).then(resolve, reject);
+  });
+
+  source.onerror = () => {
+    // Connection dropped (proxy timeout, server restart): fall back to polling
+    source.close();
+    pollJob(jobId).then(resolve, reject);
+  };
+});
+
+// Enqueue the resume and wait for the pipeline, streaming stage results when possible
+export const processResume = async (file, jobTitle, jobDescription, onStage) => {
+  const { job_id: jobId } = await submitResume(file, jobTitle, jobDescription);
+
+  if (onStage && typeof EventSource !== 'undefined') {
+    return streamJob(jobId, onStage);
+  }
+  return pollJob(jobId);
+};
+
+export const downloadFile = async (content, filename, format = 'txt', resultId = null, field = 'final') => {
   try {
     console.log(`API: Preparing download for ${filename} (${format})`);
     console.log(`API: Base URL: ${API_BASE_URL}`);
-    
-    const formData = new FormData();
-    formData.append('content', content);
-    formData.append('filename', filename);
-
-    let endpoint;
-    switch (format) {
-      case 'docx':
-        endpoint = '/download-docx';
-        break;
-      case 'pdf':
-        endpoint = '/download-pdf';
-        break;
-      default:
-        endpoint = '/download-txt';
+
+    // 'zip' bundles PDF, DOCX and TXT rendered in one pass
+    const formats = format === 'zip' ? 'pdf,docx,txt' : format;
+    let response;
+    if (resultId) {
+      // Stored result: render by id without sending the text back
+      console.log(`API: Downloading stored result ${resultId} (${field})`);
+      response = await api.get(`/results/${resultId}/download`, {
+        params: { field, formats, filename, archive: format === 'zip' },
+        responseType: 'blob',
+      });
+    } else {
+      const formData = new FormData();
+      formData.append('content', content);
+      formData.append('filename', filename);
+      formData.append('formats', formats);
+      if (format === 'zip') {
+        formData.append('archive', 'true');
+      }
+      console.log(`API: Full URL: ${API_BASE_URL}/export`);
+      console.log(`API: Content length: ${content.length} characters`);
+
+      response = await api.post('/export', formData, {
+        headers: {
+          'Content-Type': 'multipart/form-data',
+        },
+        responseType: 'blob',
+      });
     }
-    
-    const fullUrl = `${API_BASE_URL}${endpoint}`;
-    console.log(`API: Full URL: ${fullUrl}`);
-    console.log(`API: Content length: ${content.length} characters`);
-    
-    const response = await api.post(endpoint, formData, {
-      headers: {
-        'Content-Type': 'multipart/form-data',
-      },
-      responseType: 'blob',
-    });
 
     console.log(`API: Response received, size: ${response.data.size} bytes`);
     console.log(`API: Response status: ${response.status}`);
@@ -0,0 +1,63 @@
+from crew_app.ats_scorer import extract_keywords, score_resume, tokenize
+
+JOB_TITLE = "Senior Python Engineer"
+JOB_DESCRIPTION = (
+    "We are hiring a senior Python engineer to build data pipelines on AWS. "
+    "You will work with Kubernetes, PostgreSQL and CI/CD. Machine learning experience is a plus; "
+    "machine learning models ship to production weekly."
+)
+
+STRONG_RESUME = """Jane Doe
+SUMMARY
+Senior Python engineer building data pipelines on AWS.
+EXPERIENCE
+• Built Python data pipelines on AWS processing 2TB per day
+• Led migration to Kubernetes, cutting deploy time by 60%
+• Reduced PostgreSQL query latency by 35%
+• Shipped 12 machine learning models to production with CI/CD
+EDUCATION
+BSc Computer Science
+SKILLS
+Python, AWS, Kubernetes, PostgreSQL, CI/CD, machine learning
+"""
+
+WEAK_RESUME = """Jane Doe
+Worked on various websites using PHP.
+Responsible for the office printer.
+"""
+
+
+def test_tokenize_keeps_tech_spellings():
+    assert tokenize("C++, C#, Node.js and CI/CD.") == ["c++", "c#", "node.js", "and", "ci/cd"]
+
+
+def test_keywords_weight_title_terms_and_repeated_phrases():
+    keywords = extract_keywords(JOB_TITLE, JOB_DESCRIPTION)
+    assert {"python", "kubernetes", "postgresql", "ci/cd", "machine learning"} <= set(keywords)
+    # Stopwords and one-off bigrams are not keywords
+    assert "the" not in keywords and "data pipelines" not in keywords
+    # Title terms count extra, and generic job-ad words are damped
+    assert keywords["python"] > keywords["kubernetes"]
+    assert keywords["experience"] < keywords["kubernetes"]
+
+
+def test_strong_resume_scores_high_on_every_dimension():
+    result = score_resume(STRONG_RESUME, JOB_TITLE, JOB_DESCRIPTION)
+    assert result["evaluator"] == "local"
+    assert result["overall_score"] >= 80
+    breakdown = result["breakdown"]
+    assert breakdown["keywords"] >= 4
+    assert (breakdown["structure"], breakdown["metrics"], breakdown["verbs"], breakdown["format"]) == (5, 5, 5, 5)
+    assert "python" not in result["missing_keywords"]
+
+
+def test_weak_resume_gets_low_bands_and_quick_wins():
+    result = score_resume(WEAK_RESUME, JOB_TITLE, JOB_DESCRIPTION)
+    assert result["overall_score"] < 40
+    breakdown = result["breakdown"]
+    assert breakdown["structure"] == 1 and breakdown["metrics"] == 1 and breakdown["verbs"] == 1
+    assert breakdown["keywords"] <= 2
+    # A missing word is reported once, inside the phrase that contains it
+    assert "senior python" in result["missing_keywords"] and "python" not in result["missing_keywords"]
+    assert any("Add clearly labelled sections" in win for win in result["quick_wins"])
+    assert any("bullet points" in win for win in result["quick_wins"])
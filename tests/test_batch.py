@@ -0,0 +1,85 @@
+import threading
+import time
+
+import pytest
+
+from crew_app import batch
+from crew_app.jobs import CANCELLED, COMPLETED, JobManager
+
+RESUMES = [("a.txt", "resume a"), ("b.txt", "resume b")]
+JOBS = [{"job_title": "Engineer", "job_description": "Python"}, {"job_title": "Analyst", "job_description": "SQL"}]
+
+
+class StubPipeline:
+    """Stands in for the crew stages: scores a pair after `delay` seconds and tracks concurrency."""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.evaluated = 0
+
+    def clean(self, raw_text):
+        return raw_text.upper()
+
+    def evaluate(self, resume, job_title, job_description, evaluator=None, cancel_event=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+            self.evaluated += 1
+        return {"overall_score": len(resume) + len(job_title)}
+
+
+@pytest.fixture
+def pipeline(monkeypatch):
+    stub = StubPipeline()
+    monkeypatch.setattr(batch, "clean_resume", stub.clean)
+    monkeypatch.setattr(batch, "evaluate_resume", stub.evaluate)
+    monkeypatch.setattr(batch, "parse_evaluation", lambda evaluation: evaluation)
+    return stub
+
+
+def test_batch_scores_and_ranks_every_pair(pipeline):
+    events = list(batch.run_batch(RESUMES, JOBS, optimize=False))
+    assert [e["type"] for e in events].count("cleaned") == 2
+    assert [e["type"] for e in events].count("result") == 4
+    summary = events[-1]
+    assert summary["type"] == "summary"
+    assert summary["matrix"] == [[16, 15], [16, 15]]
+    assert summary["ranked_jobs"][0] == [0, 1]
+
+
+def test_concurrent_batches_share_one_bounded_pool(pipeline, monkeypatch):
+    monkeypatch.setattr(batch, "_pair_executor", batch.ThreadPoolExecutor(max_workers=2))
+    manager = JobManager(batch.run_batch_job, max_workers=3)
+    try:
+        jobs = [manager.submit(resumes=RESUMES * 2, jobs=JOBS, optimize=False) for _ in range(3)]
+        for job in jobs:
+            job.future.result(10)
+    finally:
+        manager.shutdown()
+    assert [job.status for job in jobs] == [COMPLETED] * 3
+    assert pipeline.evaluated == 3 * 8
+    assert pipeline.max_active == 2
+
+
+def test_cancel_stops_pairs_not_yet_started(pipeline, monkeypatch):
+    pipeline.delay = 0.2
+    monkeypatch.setattr(batch, "_pair_executor", batch.ThreadPoolExecutor(max_workers=1))
+    manager = JobManager(batch.run_batch_job)
+    try:
+        job = manager.submit(resumes=RESUMES * 4, jobs=JOBS, optimize=False)
+        while not any(event["type"] == "cleaned" for event in job.events):
+            time.sleep(0.01)
+        manager.cancel(job.id)
+        job.future.result(10)
+    finally:
+        manager.shutdown()
+    assert job.status == CANCELLED
+    # At most the pair already running finishes; the other 15 never start
+    time.sleep(0.3)
+    assert pipeline.evaluated <= 1
@@ -0,0 +1,130 @@
+import os
+from types import SimpleNamespace
+
+from crew_app.cache import RenderCache, StageCache, render_key, stage_key
+from crew_app.shared_state import MemoryKV
+
+
+def test_stage_key_depends_on_stage_agent_and_prompt():
+    agent = SimpleNamespace(role="Writer", goal="g", backstory="b", llm=SimpleNamespace(model="m", temperature=0.2))
+    hotter = SimpleNamespace(role="Writer", goal="g", backstory="b", llm=SimpleNamespace(model="m", temperature=0.7))
+    key = stage_key("rewrite", agent, "prompt")
+    assert key == stage_key("rewrite", agent, "prompt")
+    assert key != stage_key("refine", agent, "prompt")
+    assert key != stage_key("rewrite", agent, "other prompt")
+    assert key != stage_key("rewrite", hotter, "prompt")
+
+
+def test_stage_cache_hit_and_miss():
+    cache = StageCache()
+    assert cache.get("a") is None
+    cache.set("a", "result")
+    assert cache.get("a") == "result"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_stage_cache_expires_entries():
+    cache = StageCache(ttl_seconds=0)
+    cache.set("a", "result")
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_stage_cache_evicts_least_recently_used():
+    cache = StageCache(max_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["entries"] == 2
+
+
+def test_stage_cache_disk_tier_survives_restart(tmp_path):
+    db_path = os.path.join(tmp_path, "stages.db")
+    StageCache(db_path=db_path).set("a", "result")
+    cache = StageCache(db_path=db_path)
+    assert cache.get("a") == "result"
+    assert cache.get("a") == "result"
+    stats = cache.stats()
+    assert (stats["disk_hits"], stats["hits"]) == (1, 1)
+
+
+def test_stage_cache_disk_tier_evicts_least_recently_used(tmp_path):
+    db_path = os.path.join(tmp_path, "stages.db")
+    cache = StageCache(max_entries=0, db_path=db_path, max_db_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    assert cache.get("a") == "1"
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("1", "3")
+
+
+def test_stage_cache_shared_tier_serves_other_workers():
+    shared = MemoryKV()
+    StageCache(shared=shared).set("a", "result")
+    other = StageCache(shared=shared)
+    assert other.get("a") == "result"
+    assert other.get("a") == "result"
+    stats = other.stats()
+    assert (stats["shared_hits"], stats["hits"], stats["misses"]) == (1, 1, 0)
+
+
+def test_render_key_depends_on_format_and_content():
+    assert render_key("pdf", "text") == render_key("pdf", "text")
+    assert render_key("pdf", "text") != render_key("docx", "text")
+    assert render_key("pdf", "text") != render_key("pdf", "other text")
+
+
+def test_render_cache_hit_and_miss():
+    cache = RenderCache()
+    assert cache.get("a") is None
+    cache.set("a", b"%PDF")
+    assert cache.get("a") == b"%PDF"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["bytes"]) == (1, 1, 4)
+
+
+def test_render_cache_evicts_by_entry_count():
+    cache = RenderCache(max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (b"1", b"3")
+
+
+def test_render_cache_evicts_by_bytes():
+    cache = RenderCache(max_bytes=10)
+    cache.set("a", b"x" * 4)
+    cache.set("b", b"x" * 4)
+    cache.set("c", b"x" * 4)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+    # Replacing an entry does not count its old size twice
+    cache.set("c", b"x" * 2)
+    assert cache.stats()["bytes"] == 6
+
+
+def test_render_cache_skips_oversized_values():
+    shared = MemoryKV()
+    cache = RenderCache(max_bytes=4, shared=shared)
+    cache.set("a", b"x" * 5)
+    assert cache.get("a") is None
+    assert shared.get("render:a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_render_cache_shared_tier_serves_other_workers():
+    shared = MemoryKV()
+    RenderCache(shared=shared).set("a", b"%PDF")
+    other = RenderCache(shared=shared)
+    assert other.get("a") == b"%PDF"
+    assert other.get("a") == b"%PDF"
+    stats = other.stats()
+    assert (stats["shared_hits"], stats["hits"], stats["misses"]) == (1, 1, 0)
@@ -0,0 +1,47 @@
+from crew_app.document_model import parse_document
+from crew_app.file_tools.file_loader import detect_and_extract
+from crew_app.utils import DOCUMENT_RENDERERS
+
+RESUME = """JANE DOE
+jane@example.com | +1 555 0100
+SUMMARY
+Backend engineer with eight years of Python experience.
+EXPERIENCE
+Senior Engineer
+Acme Corp | Remote
+Jan 2020 - Present
+• Built billing APIs serving 3M requests per day
+- Cut infrastructure spend by 25%
+SKILLS
+Python, PostgreSQL, Kubernetes
+"""
+
+
+def test_document_sections_and_entries():
+    document = parse_document(RESUME)
+    assert document.name == "JANE DOE"
+    assert document.contact == ["jane@example.com | +1 555 0100"]
+    sections = document.sections
+    assert [s["heading"] for s in sections] == ["SUMMARY", "EXPERIENCE", "SKILLS"]
+    entry = sections[1]["entries"][0]
+    assert (entry["title"], entry["company"], entry["date"]) == ("Senior Engineer", "Acme Corp | Remote", "Jan 2020 - Present")
+    assert entry["bullets"] == ["Built billing APIs serving 3M requests per day", "Cut infrastructure spend by 25%"]
+
+
+def test_txt_export_is_byte_identical():
+    assert DOCUMENT_RENDERERS["txt"](parse_document(RESUME)) == RESUME.encode("utf-8")
+    ext, text = detect_and_extract("resume.txt", DOCUMENT_RENDERERS["txt"](parse_document(RESUME)))
+    assert (ext, text) == ("txt", RESUME)
+
+
+def test_docx_and_pdf_exports_round_trip():
+    document = parse_document(RESUME)
+    expected = [line for line in document.to_text().splitlines() if line]
+    for fmt in ("docx", "pdf"):
+        ext, text = detect_and_extract(f"resume.{fmt}", DOCUMENT_RENDERERS[fmt](document))
+        assert ext == fmt
+        extracted = " ".join(text.split())
+        for line in expected:
+            # Bullets are list-styled in DOCX, so only their text is extracted there
+            body = line[2:] if line.startswith("• ") else line
+            assert " ".join(body.split()) in extracted, (fmt, line)
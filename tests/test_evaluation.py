@@ -0,0 +1,80 @@
+import json
+
+import pytest
+
+from crew_app import crew
+from crew_app.evaluation import extract_json, unparsed_evaluation, validate_evaluation
+
+VALID = {"overall_score": 82, "breakdown": {"keywords": 4}, "missing_keywords": ["aws"], "quick_wins": ["Add metrics"]}
+
+
+def test_extract_json_repairs_common_llm_output():
+    assert extract_json('Here you go:\n```json\n{"overall_score": 82,}\n```') == {"overall_score": 82}
+    assert extract_json("Result: {'overall_score': 82, 'summary': \"The candidate's fit is good\", 'ok': true}") == {
+        "overall_score": 82, "summary": "The candidate's fit is good", "ok": True,
+    }
+    assert extract_json("no json here") is None
+
+
+def test_validate_normalises_scores_and_lists():
+    parsed = validate_evaluation(json.dumps({"overall_score": "4/5", "missing_keywords": "aws, docker", "quick_wins": None}))
+    assert parsed["overall_score"] == 80
+    assert parsed["missing_keywords"] == ["aws", "docker"]
+    assert parsed["quick_wins"] == []
+    assert parsed["evaluator"] == "llm"
+    assert validate_evaluation('{"overall_score": "150%"}')["overall_score"] == 100
+
+
+def test_validate_rejects_evaluations_outside_the_schema():
+    assert validate_evaluation('{"breakdown": {}}') is None
+    assert validate_evaluation('{"overall_score": "excellent"}') is None
+
+
+def test_unparsed_evaluation_keeps_the_same_shape():
+    fallback = unparsed_evaluation("The resume is strong")
+    assert set(fallback) == set(validate_evaluation(json.dumps(VALID)))
+    assert (fallback["overall_score"], fallback["summary"], fallback["evaluator"]) == (None, "The resume is strong", "unparsed")
+
+
+@pytest.fixture
+def llm_evaluator(monkeypatch):
+    """Replaces the evaluator agent's LLM calls with canned outputs per stage."""
+    outputs = {}
+    calls = []
+
+    def run_stage(stage, agent, task):
+        calls.append(stage)
+        return outputs[stage]
+
+    monkeypatch.setattr(crew, "get_agent", lambda name: object())
+    monkeypatch.setattr(crew, "evaluate_ats_task", lambda agent, *args: "evaluate")
+    monkeypatch.setattr(crew, "repair_evaluation_task", lambda agent, text: text)
+    monkeypatch.setattr(crew, "_run_stage", run_stage)
+    return outputs, calls
+
+
+def test_valid_llm_evaluation_needs_no_repair(llm_evaluator):
+    outputs, calls = llm_evaluator
+    outputs["evaluate"] = json.dumps(VALID)
+    result = json.loads(crew.evaluate_resume("resume", "Engineer", "Python", evaluator="llm"))
+    assert result["overall_score"] == 82
+    assert calls == ["evaluate"]
+
+
+def test_malformed_llm_evaluation_is_repaired(llm_evaluator):
+    outputs, calls = llm_evaluator
+    outputs["evaluate"] = "Overall the resume scores well, about eighty, but lacks AWS."
+    outputs["evaluate_repair"] = "```json\n" + json.dumps(VALID) + "\n```"
+    result = json.loads(crew.evaluate_resume("resume", "Engineer", "Python", evaluator="llm"))
+    assert result["overall_score"] == 82 and result["evaluator"] == "llm"
+    assert calls == ["evaluate", "evaluate_repair"]
+
+
+def test_unrepairable_llm_evaluation_falls_back_to_local_scorer(llm_evaluator):
+    outputs, calls = llm_evaluator
+    outputs["evaluate"] = "not json"
+    outputs["evaluate_repair"] = "still not json"
+    result = json.loads(crew.evaluate_resume("SKILLS\nPython", "Engineer", "Python", evaluator="llm"))
+    assert result["evaluator"] == "local"
+    assert isinstance(result["overall_score"], int)
+    assert calls == ["evaluate", "evaluate_repair"]
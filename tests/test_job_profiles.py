@@ -0,0 +1,62 @@
+import pytest
+
+from crew_app import job_profiles
+from crew_app.cache import StageCache
+from crew_app.job_profiles import get_profile, job_requirements, lookup_profile, profile_id
+
+JOB_TITLE = "Data Engineer"
+JOB_DESCRIPTION = (
+    "We are looking for a Data Engineer with 5+ years of experience. "
+    "You will build pipelines in Python, Airflow and PostgreSQL on AWS. "
+    "Experience with Kafka is a plus. "
+    "We offer competitive benefits and an equal opportunity workplace."
+)
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """A fresh profile cache, counting how often a profile is actually built."""
+    monkeypatch.setattr(job_profiles, "job_profile_cache", StageCache())
+    calls = []
+    build = job_profiles.build_profile
+
+    def counting_build(job_title, job_description):
+        calls.append(job_title)
+        return build(job_title, job_description)
+
+    monkeypatch.setattr(job_profiles, "build_profile", counting_build)
+    return calls
+
+
+def test_profile_extracts_requirements():
+    profile = job_profiles.build_profile(JOB_TITLE, JOB_DESCRIPTION)
+    assert profile["titles"][0] == "Data Engineer"
+    assert {"python", "airflow", "postgresql", "aws"} <= set(profile["required"])
+    assert "kafka" in profile["preferred"]
+    assert profile["min_years"] == 5
+    # Boilerplate sentences contribute nothing
+    assert "benefits" not in profile["required"] + profile["preferred"]
+
+
+def test_repeat_postings_hit_the_cache(builds):
+    first = get_profile(JOB_TITLE, JOB_DESCRIPTION)
+    # Re-pasted copies differ only in whitespace and case
+    again = get_profile(JOB_TITLE.upper(), "  " + JOB_DESCRIPTION.replace(" ", "\n "))
+    assert builds == [JOB_TITLE]
+    assert again["required"] == first["required"]
+    stats = job_profiles.job_profile_cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_lookup_by_profile_id(builds):
+    profile = get_profile(JOB_TITLE, JOB_DESCRIPTION)
+    assert lookup_profile(profile_id(JOB_TITLE, JOB_DESCRIPTION))["required"] == profile["required"]
+    assert lookup_profile("unknown") is None
+
+
+def test_prompt_requirements_reuse_the_cached_profile(builds):
+    text = job_requirements(JOB_TITLE, JOB_DESCRIPTION)
+    assert text.startswith("Role: Data Engineer") and "Required:" in text
+    assert job_requirements(JOB_TITLE, JOB_DESCRIPTION) == text
+    assert len(builds) == 1
+    assert job_requirements(JOB_TITLE, "") is None
@@ -0,0 +1,169 @@
+import json
+import threading
+import time
+
+import pytest
+
+from crew_app.jobs import CANCELLED, COMPLETED, FAILED, QUEUED, RUNNING, JobManager, QueueFullError, ShuttingDownError
+from crew_app.result_store import MemoryResultStore
+from crew_app.shared_state import MemoryKV
+
+
+class StubRunner:
+    """Stands in for run_pipeline: reports one stage, then blocks until released."""
+
+    def __init__(self, block: bool = False):
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+        self.started = threading.Event()
+        self.calls = []
+
+    def __call__(self, cancel_event, on_stage, **params):
+        self.calls.append(params)
+        self.started.set()
+        on_stage({"stage": "parse", "status": "completed"})
+        while not self.release.wait(0.01):
+            if cancel_event.is_set():
+                raise RuntimeError("cancelled")
+        if params.get("fail"):
+            raise ValueError("pipeline failed")
+        return {"optimized": params.get("resume", "")}
+
+
+def wait_for(predicate, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def managers():
+    created = []
+
+    def make(runner, **kwargs):
+        manager = JobManager(runner, **kwargs)
+        created.append(manager)
+        return manager
+
+    yield make
+    for manager in created:
+        manager.shutdown(wait=True)
+
+
+def test_submit_runs_job_to_completion(managers):
+    runner = StubRunner()
+    manager = managers(runner)
+    job = manager.submit(resume="text")
+    wait_for(lambda: job.finished)
+    assert job.status == COMPLETED
+    assert job.result == {"optimized": "text"}
+    assert job.events == [{"stage": "parse", "status": "completed"}]
+    assert runner.calls == [{"resume": "text"}]
+    assert manager.get(job.id) is job
+    assert job.to_dict()["results"] == {"optimized": "text"}
+
+
+def test_failed_job_reports_error(managers):
+    manager = managers(StubRunner())
+    job = manager.submit(fail=True)
+    wait_for(lambda: job.finished)
+    assert job.status == FAILED
+    assert job.error == "pipeline failed"
+
+
+def test_completed_result_is_stored(managers):
+    store = MemoryResultStore()
+    manager = managers(StubRunner(), result_store=store)
+    job = manager.submit(resume="text")
+    wait_for(lambda: job.finished)
+    assert job.result_id == job.id
+    assert store.get(job.id)["optimized"] == "text"
+
+
+def test_cancel_queued_job_never_starts(managers):
+    runner = StubRunner(block=True)
+    manager = managers(runner, max_workers=1)
+    running = manager.submit(resume="first")
+    runner.started.wait(5)
+    queued = manager.submit(resume="second")
+    assert queued.status == QUEUED
+    manager.cancel(queued.id)
+    assert queued.status == CANCELLED
+    runner.release.set()
+    wait_for(lambda: running.finished)
+    assert running.status == COMPLETED
+    assert runner.calls == [{"resume": "first"}]
+
+
+def test_cancel_running_job_stops_it(managers):
+    runner = StubRunner(block=True)
+    manager = managers(runner)
+    job = manager.submit()
+    runner.started.wait(5)
+    assert job.status == RUNNING
+    manager.cancel(job.id)
+    wait_for(lambda: job.finished)
+    assert job.status == CANCELLED
+    assert job.error is None
+
+
+def test_queue_full_rejects_submit(managers):
+    runner = StubRunner(block=True)
+    manager = managers(runner, max_workers=1, max_queue=2)
+    manager.submit()
+    runner.started.wait(5)
+    manager.submit()
+    manager.submit()
+    with pytest.raises(QueueFullError):
+        manager.submit()
+    assert manager.stats()["queued"] == 2
+    runner.release.set()
+
+
+def test_drain_finishes_jobs_and_refuses_new_ones(managers):
+    runner = StubRunner(block=True)
+    manager = managers(runner, max_workers=1)
+    jobs = [manager.submit(resume=str(i)) for i in range(3)]
+    threading.Timer(0.1, runner.release.set).start()
+    assert manager.drain(timeout=5) == 0
+    assert [job.status for job in jobs] == [COMPLETED] * 3
+    with pytest.raises(ShuttingDownError):
+        manager.submit()
+
+
+def test_drain_timeout_cancels_unfinished_jobs(managers):
+    runner = StubRunner(block=True)
+    manager = managers(runner, max_workers=1)
+    running = manager.submit()
+    queued = manager.submit()
+    runner.started.wait(5)
+    assert manager.drain(timeout=0.1) == 2
+    assert queued.status == CANCELLED
+    assert "resubmit" in queued.error
+    wait_for(lambda: running.finished)
+    assert running.status == CANCELLED
+
+
+def test_shared_state_lets_other_workers_follow_and_cancel(managers):
+    state = MemoryKV()
+    runner = StubRunner(block=True)
+    owner = managers(runner, state=state)
+    other = managers(StubRunner(), state=state)
+    job = owner.submit()
+    runner.started.wait(5)
+    wait_for(lambda: len(state.lrange(f"job:{job.id}:events", 0, -1)) == 1)
+
+    shared = other.get(job.id)
+    assert shared is not job
+    assert shared.status == RUNNING
+    assert shared.events_since(0) == [{"stage": "parse", "status": "completed"}]
+
+    other.cancel(job.id)
+    # The owner picks the request up at its next stage boundary
+    owner._add_event(job, {"stage": "rewrite", "status": "completed"})
+    wait_for(lambda: job.finished)
+    assert job.status == CANCELLED
+    assert json.loads(state.get(f"job:{job.id}"))["status"] == CANCELLED
@@ -0,0 +1,201 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+import pytest
+from crewai import LLM
+from crewai.llms.base_llm import BaseLLM
+
+from benchmarks.fake_llm_server import FakeLLM, start_server
+from crew_app import llm_scheduler
+from crew_app.llm_scheduler import LLMRequestFailed, LLMScheduler, ScheduledLLM, backoff_delay, llm_priority, retry_after, retry_reason
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code: int, headers: dict = None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeBackendLLM(BaseLLM):
+    """Fails with the queued errors first, then answers."""
+
+    llm_type: str = "fake"
+    errors: Any = None
+    calls: int = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, response_model=None):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return "answer"
+
+
+@pytest.fixture
+def delays(monkeypatch):
+    """Record the backoff the scheduler picks instead of sleeping for it."""
+    picked = []
+
+    def fake_backoff(attempt, hint=None):
+        picked.append((attempt, hint))
+        return 0.01
+
+    monkeypatch.setattr(llm_scheduler, "backoff_delay", fake_backoff)
+    return picked
+
+
+def scheduled_llm(errors=(), **options) -> ScheduledLLM:
+    inner = FakeBackendLLM(model="fake-model", errors=list(errors))
+    return ScheduledLLM(model="fake-model", inner=inner, scheduler=LLMScheduler(rpm=0, tpm=0, max_concurrency=4, **options), key="fake")
+
+
+def test_retries_retryable_errors_then_succeeds(delays):
+    llm = scheduled_llm([ProviderError(500), ProviderError(429, {"retry-after": "0.02"})], max_retries=3)
+    assert llm.call("prompt") == "answer"
+    assert llm.inner.calls == 3
+    assert delays == [(0, None), (1, 0.02)]
+    stats = llm.scheduler.stats()["keys"]["fake"]
+    assert stats["retries"] == 2
+    assert stats["rate_limited"] == 1
+    assert stats["in_flight"] == 0
+
+
+def test_gives_up_after_max_retries(delays):
+    llm = scheduled_llm([ProviderError(503)] * 5, max_retries=2)
+    with pytest.raises(LLMRequestFailed, match="after 3 attempts"):
+        llm.call("prompt")
+    assert llm.inner.calls == 3
+    assert len(delays) == 2
+
+
+def test_non_retryable_error_is_raised_at_once(delays):
+    llm = scheduled_llm([ProviderError(400)], max_retries=3)
+    with pytest.raises(ProviderError):
+        llm.call("prompt")
+    assert llm.inner.calls == 1
+    assert delays == []
+
+
+def test_retry_reason_and_retry_after():
+    assert retry_reason(ProviderError(429)) == "rate_limit"
+    assert retry_reason(ProviderError(502)) == "server_error"
+    assert retry_reason(ProviderError(404)) is None
+    assert retry_reason(TimeoutError()) == "timeout"
+    try:
+        try:
+            raise ProviderError(429)
+        except ProviderError as e:
+            raise RuntimeError("wrapped") from e
+    except RuntimeError as wrapped:
+        assert retry_reason(wrapped) == "rate_limit"
+    assert retry_after(ProviderError(429, {"retry-after": "1.5"})) == 1.5
+    assert retry_after(ProviderError(429)) is None
+
+
+def test_backoff_delay_is_bounded_and_honours_retry_after():
+    for attempt in range(8):
+        assert 0 <= backoff_delay(attempt, base=0.5, cap=4) <= min(4, 0.5 * 2 ** attempt)
+    assert backoff_delay(0, base=0.5, cap=4, hint=3.0) >= 3.0
+
+
+def test_interactive_requests_are_admitted_before_batch():
+    limiter = LLMScheduler(rpm=0, tpm=0, max_concurrency=1).limiter("fake")
+    limiter.acquire(0, 1)
+    order = []
+
+    def waiter(name, priority):
+        limiter.acquire(priority, 1, timeout=5)
+        order.append(name)
+        limiter.release(1, 1)
+
+    threads = []
+    for name, priority in [("batch-1", 1), ("batch-2", 1), ("interactive", 0)]:
+        thread = threading.Thread(target=waiter, args=(name, priority))
+        thread.start()
+        threads.append(thread)
+        while limiter.stats()["queued"] < len(threads):
+            time.sleep(0.005)
+    limiter.release(1, 1)
+    for thread in threads:
+        thread.join(5)
+    assert order == ["interactive", "batch-1", "batch-2"]
+
+
+def test_llm_priority_applies_to_calls_in_the_block(monkeypatch):
+    seen = []
+    llm = scheduled_llm()
+    acquire = llm.scheduler.limiter("fake").acquire
+    monkeypatch.setattr(llm.scheduler.limiter("fake"), "acquire", lambda priority, *args: seen.append(priority) or acquire(priority, *args))
+    llm.call("prompt")
+    with llm_priority("batch"):
+        llm.call("prompt")
+    assert seen == [0, 1]
+    with pytest.raises(ValueError):
+        with llm_priority("urgent"):
+            pass
+
+
+def test_recovers_from_server_rate_limits():
+    # One request's worth of burst, so concurrent calls draw 429s with a Retry-After
+    fake = FakeLLM(rpm=600, burst=0.1, latency=0.0, jitter=0.0, seed=1)
+    server = start_server(fake)
+    try:
+        inner = LLM(model="fake-model", base_url=f"http://127.0.0.1:{server.server_address[1]}/v1", api_key="not-needed", provider="openai", max_retries=0)
+        llm = ScheduledLLM(model="fake-model", inner=inner, scheduler=LLMScheduler(rpm=0, tpm=0, max_concurrency=8, max_retries=6), key="fake")
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            answers = list(pool.map(lambda _: llm.call([{"role": "user", "content": "Say done."}]), range(4)))
+    finally:
+        server.shutdown()
+    assert all(answers)
+    assert fake.stats()["ok"] == 4
+    assert fake.stats()["rate_limited"] > 0
+    assert llm.scheduler.stats()["keys"]["fake"]["rate_limited"] == fake.stats()["rate_limited"]
+
+
+class SlowFirstLLM(BaseLLM):
+    """The first call hangs for `delay` seconds; later calls answer at once."""
+
+    llm_type: str = "fake"
+    delay: float = 1.0
+    calls: int = 0
+
+    def call(self, messages, tools=None, callbacks=None, available_functions=None, from_task=None, from_agent=None, response_model=None):
+        self.calls += 1
+        if self.calls == 1:
+            time.sleep(self.delay)
+            return "slow answer"
+        return "fast answer"
+
+
+def test_zero_max_concurrency_means_no_cap():
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_concurrency=0, queue_timeout=2)
+    llm = ScheduledLLM(model="fake-model", inner=FakeBackendLLM(model="fake-model", errors=[]), scheduler=scheduler, key="fake")
+    limiter = scheduler.limiter("fake")
+    for _ in range(5):
+        limiter.acquire(0, 1, timeout=1)
+    assert llm.call("prompt") == "answer"
+    assert limiter.stats()["in_flight"] == 5
+
+
+def test_hedge_answers_a_slow_call():
+    llm = ScheduledLLM(model="fake-model", inner=SlowFirstLLM(model="fake-model"), scheduler=LLMScheduler(rpm=0, tpm=0, max_concurrency=4, hedge_after=0.1), key="fake")
+    started = time.perf_counter()
+    assert llm.call("prompt") == "fast answer"
+    assert time.perf_counter() - started < 0.9
+    stats = llm.scheduler.stats()["keys"]["fake"]
+    assert (stats["hedges"], stats["hedge_wins"]) == (1, 1)
+
+
+def test_hedge_skipped_without_spare_capacity():
+    scheduler = LLMScheduler(rpm=0, tpm=0, max_concurrency=1, hedge_after=0.1)
+    llm = ScheduledLLM(model="fake-model", inner=SlowFirstLLM(model="fake-model", delay=0.3), scheduler=scheduler, key="fake")
+    assert llm.call("prompt") == "slow answer"
+    assert scheduler.stats()["keys"]["fake"]["hedges"] == 0
+
+
+def test_hedging_works_without_a_concurrency_cap():
+    llm = ScheduledLLM(model="fake-model", inner=SlowFirstLLM(model="fake-model"), scheduler=LLMScheduler(rpm=0, tpm=0, max_concurrency=0, hedge_after=0.1), key="fake")
+    assert llm.call("prompt") == "fast answer"
+    assert llm.scheduler.stats()["keys"]["fake"]["hedge_wins"] == 1
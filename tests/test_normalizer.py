@@ -0,0 +1,48 @@
+from crew_app.file_tools.normalizer import normalize_resume
+
+
+def test_split_words_are_joined():
+    assert normalize_resume("• Led develop-\nment of the billing API") == "• Led development of the billing API"
+
+
+def test_wrapped_compounds_keep_their_hyphen():
+    assert normalize_resume("• Built full-\nstack apps") == "• Built full-stack apps"
+    assert normalize_resume("• Owned end-to-\nend delivery") == "• Owned end-to-end delivery"
+    # Capitalised parts are names, not split words
+    assert normalize_resume("Shipped a Type-\nscript SDK") == "Shipped a Type-script SDK"
+
+
+def test_bullet_glyphs_become_one_marker():
+    text = "● Led a team\n▪ Cut costs\n\x7f Shipped v2\n- Wrote docs\n– Ran on-call\n* Mentored"
+    assert normalize_resume(text) == "\n".join(
+        ["• Led a team", "• Cut costs", "• Shipped v2", "• Wrote docs", "• Ran on-call", "• Mentored"]
+    )
+
+
+def test_prose_is_not_mistaken_for_bullets():
+    text = "o Neill & Partners\n> 10 years of experience\n-5% churn\n*nix tooling"
+    assert normalize_resume(text) == text
+
+
+def test_ligatures_and_invisible_characters_are_repaired():
+    text = "O\ufb03ce work\ufb02ow\u00a0e\ufb00ort\u200b and co\u00adoperation"
+    assert normalize_resume(text) == "Office workflow effort and cooperation"
+
+
+def test_running_headers_and_page_numbers_are_dropped():
+    pages = [
+        "JANE DOE\nEXPERIENCE\nSenior Engineer\nAcme Corp\n• Built billing APIs\n• Led hiring\nPage 1 of 2",
+        "JANE DOE\nEDUCATION\nBSc Computer Science\nState University, 2011 - 2015\nSKILLS\nPython\nPage 2 of 2",
+    ]
+    assert normalize_resume("\n\f\n".join(pages)).splitlines() == [
+        "JANE DOE", "EXPERIENCE", "Senior Engineer", "Acme Corp", "• Built billing APIs", "• Led hiring",
+        "EDUCATION", "BSc Computer Science", "State University, 2011 - 2015", "SKILLS", "Python",
+    ]
+
+
+def test_letter_spaced_headings_are_collapsed():
+    assert normalize_resume("W O R K  E X P E R I E N C E") == "WORK EXPERIENCE"
+
+
+def test_wrapped_bullet_text_is_joined():
+    assert normalize_resume("• Reduced latency across\nthree services\n• Led hiring") == "• Reduced latency across three services\n• Led hiring"
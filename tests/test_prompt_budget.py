@@ -0,0 +1,113 @@
+from crew_app import tasks
+from crew_app.prompt_budget import DEFAULT_BUDGETS, budget_inputs, count_tokens, fit_resume
+
+JOB_TITLE = "Senior Backend Engineer"
+JOB_DESCRIPTION = (
+    "We are hiring a Senior Backend Engineer. You must have 5+ years of experience with Python and "
+    "PostgreSQL. Experience with Kubernetes, Kafka and AWS is required. Strong knowledge of distributed "
+    "systems and observability. We offer great benefits, paid time off and a 401k match. "
+    "We are an equal opportunity employer. " * 4
+)
+HEADER = "Jordan Rivera - Senior Backend Engineer - jordan.rivera@example.com - (555) 010-2040"
+
+EMPLOYERS = ["Northwind Logistics", "Contoso Payments", "Fabrikam Health", "Tailspin Travel"]
+ACTIVITIES = [
+    "Designed a Python service ingesting {n} million events per day into PostgreSQL with Kafka",
+    "Cut p99 API latency by {n}% by adding Redis caching and rewriting hot SQL queries",
+    "Migrated {n} services from EC2 to Kubernetes on AWS with zero downtime",
+    "Led a team of {n} engineers through quarterly planning, code review and on-call rotation",
+    "Built Grafana and Prometheus dashboards covering {n} critical user journeys",
+    "Automated deployments with GitHub Actions and Terraform, shipping {n} releases a week",
+    "Mentored {n} junior engineers on testing, profiling and incident response practices",
+    "Reduced cloud spend by {n}% by right-sizing clusters and moving batch jobs to spot instances",
+    "Introduced contract tests between {n} microservices, halving integration incidents",
+    "Partnered with product to launch {n} customer-facing features on schedule",
+]
+
+
+def two_page_resume() -> str:
+    """About 1,500 tokens: ten bullets for each of four jobs, with a page header and footers."""
+    lines = [HEADER, "Backend engineer with ten years of experience building reliable data platforms.", "", "EXPERIENCE"]
+    for e, employer in enumerate(EMPLOYERS):
+        lines.append(f"Senior Engineer, {employer}, {2022 - 3 * e}-{2025 - 3 * e}")
+        lines.extend(f"• {activity.format(n=4 + e * 10 + a)} at {employer}" for a, activity in enumerate(ACTIVITIES))
+        if e == 1:
+            # Page break as extracted from a PDF: footer, then the header repeated
+            lines.extend(["Page 1 of 2", HEADER])
+        lines.append("")
+    lines += [
+        "SKILLS",
+        "Python, Go, PostgreSQL, Redis, Kafka, Kubernetes, Terraform, AWS, Grafana, Prometheus",
+        "",
+        "EDUCATION",
+        "B.Sc. Computer Science, State University, 2013",
+        "Page 2 of 2",
+    ]
+    return "\n".join(lines)
+
+
+def body_lines(resume: str) -> list:
+    """Every line that is resume content rather than page furniture."""
+    seen = set()
+    body = []
+    for line in resume.split("\n"):
+        if line and not line.startswith("Page ") and line not in seen:
+            seen.add(line)
+            body.append(line)
+    return body
+
+
+def test_two_page_resume_fits_whole_resume_stages_in_one_prompt():
+    resume = two_page_resume()
+    assert 1200 < count_tokens(resume) < 2000
+    for stage in ("parse", "rewrite", "refine", "rewrite_refine", "evaluate"):
+        chunks, jd = budget_inputs(stage, resume, JOB_TITLE, JOB_DESCRIPTION)
+        assert len(chunks) == 1, stage
+        assert all(line in chunks[0] for line in body_lines(resume)), stage
+        assert "Page 1 of 2" not in chunks[0]
+        assert chunks[0].count(HEADER) == 1
+
+
+def test_two_page_resume_survives_every_stage_prompt():
+    resume = two_page_resume()
+    prompts = {
+        "parse": tasks.parse_resume_task(None, resume),
+        "rewrite": tasks.rewrite_for_ats_task(None, resume, JOB_TITLE, JOB_DESCRIPTION),
+        "refine": tasks.refine_bullets_task(None, resume),
+        "rewrite_refine": tasks.rewrite_and_refine_task(None, resume, JOB_TITLE, JOB_DESCRIPTION),
+        "rewrite_section": tasks.rewrite_section_task(None, resume, "EXPERIENCE", JOB_TITLE, JOB_DESCRIPTION),
+        "refine_section": tasks.refine_section_task(None, resume, "EXPERIENCE"),
+        "evaluate": [tasks.evaluate_ats_task(None, resume, JOB_TITLE, JOB_DESCRIPTION)],
+    }
+    for stage, stage_tasks in prompts.items():
+        sent = "\n".join(task.description for task in stage_tasks)
+        missing = [line for line in body_lines(resume) if line not in sent]
+        assert missing == [], stage
+
+
+def test_job_description_is_shortened_instead_of_the_resume():
+    resume = two_page_resume()
+    filler = " ".join(f"Benefits include perk{i} and allowance{i}." for i in range(300))
+    chunks, jd = budget_inputs("rewrite", resume, JOB_TITLE, JOB_DESCRIPTION + filler)
+    assert count_tokens(jd) <= DEFAULT_BUDGETS["rewrite"] * 0.25
+    assert "Python and PostgreSQL" in jd
+    assert all(line in "\n".join(chunks) for line in body_lines(resume))
+
+
+def test_oversized_resume_is_chunked_at_sections_without_dropping_lines():
+    resume = two_page_resume()
+    chunks = fit_resume(resume, 400)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 400 for chunk in chunks)
+    joined = "\n".join(chunks)
+    assert all(line in joined for line in body_lines(resume))
+    # Short sections travel whole, with their heading
+    assert any(chunk.startswith("SKILLS") or "\nSKILLS\nPython" in chunk for chunk in chunks)
+
+
+def test_line_longer_than_the_budget_is_split_not_cut():
+    sentence = "Delivered the migration of the billing platform to event sourcing with Kafka."
+    chunks = fit_resume(" ".join([sentence] * 12), 60)
+    assert len(chunks) > 1
+    assert all(count_tokens(chunk) <= 60 for chunk in chunks)
+    assert " ".join(chunks).split() == " ".join([sentence] * 12).split()
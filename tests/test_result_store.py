@@ -0,0 +1,86 @@
+import pytest
+
+from crew_app import result_store
+from crew_app.result_store import MemoryResultStore, SQLiteResultStore, create_result_store
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(result_store.time, "time", clock)
+    return clock
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def make_store(request, tmp_path):
+    stores = []
+
+    def make(**kwargs):
+        if request.param == "memory":
+            store = MemoryResultStore(**kwargs)
+        else:
+            store = SQLiteResultStore(path=str(tmp_path / "results.db"), **kwargs)
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        store.close()
+
+
+def test_put_and_get(make_store, clock):
+    store = make_store(ttl_seconds=60)
+    store.put("job-1", {"final": "text"})
+    record = store.get("job-1")
+    assert record["final"] == "text"
+    assert (record["result_id"], record["created_at"], record["expires_at"]) == ("job-1", 1000.0, 1060.0)
+    assert store.get("missing") is None
+
+
+def test_entries_expire_after_ttl(make_store, clock):
+    store = make_store(ttl_seconds=60)
+    store.put("job-1", {"final": "text"})
+    clock.now += 59
+    assert store.get("job-1") is not None
+    clock.now += 1
+    assert store.get("job-1") is None
+
+
+def test_expired_entries_are_evicted_on_put(make_store, clock):
+    store = make_store(ttl_seconds=60)
+    store.put("old", {"final": "a"})
+    clock.now += 120
+    store.put("new", {"final": "b"})
+    assert store.stats()["entries"] == 1
+    assert store.get("new")["final"] == "b"
+
+
+def test_oldest_entries_are_evicted_over_max_bytes(make_store, clock):
+    store = make_store(ttl_seconds=60, max_bytes=100)
+    for i in range(3):
+        store.put(f"job-{i}", {"final": "x" * 30})
+        clock.now += 1
+    assert store.get("job-0") is None
+    assert store.get("job-2") is not None
+    assert store.stats()["bytes"] <= 100
+
+
+def test_delete(make_store, clock):
+    store = make_store()
+    store.put("job-1", {"final": "text"})
+    assert store.delete("job-1") is True
+    assert store.delete("job-1") is False
+    assert store.get("job-1") is None
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_result_store("redis")
@@ -0,0 +1,34 @@
+from crew_app.search_index import ResumeIndex
+
+RESUMES = {
+    "py": "Python engineer building Django and PostgreSQL services",
+    "java": "Java engineer building Spring services on Oracle",
+    "data": "Data engineer with Python, Airflow and PostgreSQL pipelines",
+}
+
+
+def _ids(results):
+    return [result["id"] for result in results]
+
+
+def test_search_ranks_compacted_and_pending_documents(tmp_path):
+    index = ResumeIndex(str(tmp_path), compact_threshold=1000)
+    for doc_id, text in RESUMES.items():
+        index.add(text, doc_id=doc_id)
+    pending = _ids(index.search("Python Developer", "Python and PostgreSQL"))
+    index.compact()
+    assert _ids(index.search("Python Developer", "Python and PostgreSQL")) == pending
+    assert set(pending) == {"py", "data"}
+
+
+def test_deleted_and_replaced_documents_leave_the_compacted_postings(tmp_path):
+    index = ResumeIndex(str(tmp_path), compact_threshold=1000)
+    for doc_id, text in RESUMES.items():
+        index.add(text, doc_id=doc_id)
+    index.compact()
+    index.delete("data")
+    # Re-adding an id replaces its postings: "py" no longer mentions Python
+    index.add("Go engineer building Kubernetes operators", doc_id="py")
+    assert _ids(index.search("Python Developer", "Python and PostgreSQL")) == []
+    assert _ids(index.search("Go Developer", "Kubernetes")) == ["py"]
+    assert index.stats()["documents"] == 2